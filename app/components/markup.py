@@ -0,0 +1,18 @@
+"""
+Eigenes HTML ausgeben (Karten, Titel, Stylesheets)
+
+Alle Seiten geben ihr HTML über render_html aus statt direkt über
+st.markdown(..., unsafe_allow_html=True). Der Profiler misst jeden Aufruf
+als Abschnitt "markdown" (siehe core.profiler).
+
+Created by l1rox3 • 2025
+"""
+
+import streamlit as st
+
+from core.profiler import profiled
+
+
+@profiled("markdown")
+def render_html(body: str) -> None:
+    st.markdown(body, unsafe_allow_html=True)
@@ -0,0 +1,40 @@
+"""
+Profiler-Overlay: Abschnitte des laufenden Reruns unten rechts einblenden
+
+Nur für Sessions, in denen ein Admin das Overlay im Admin-Panel (Tab Diagnose)
+eingeschaltet hat. Wird als Letztes im Skript aufgerufen und zeigt, was der
+Profiler bis dahin gemessen hat (siehe core.profiler).
+
+Created by l1rox3 • 2025
+"""
+
+import html
+
+import streamlit as st
+
+from components.markup import render_html
+from core.profiler import current
+
+
+def show_profiler_overlay() -> None:
+    if not st.session_state.get("profiler_overlay"):
+        return
+    profile = current()
+    if profile is None:
+        return
+    rows = "".join(
+        f"<tr><td>{html.escape(name)}</td><td style='text-align:right'>{ms:.1f} ms</td>"
+        f"<td style='text-align:right; opacity:0.6'>{calls}×</td></tr>"
+        for name, (ms, calls) in sorted(profile.sections.items(), key=lambda item: -item[1][0])
+    )
+    render_html(f"""
+    <div style="position: fixed; right: 1rem; bottom: 1rem; z-index: 999999;
+                background: rgba(15, 15, 25, 0.92); color: #e5e7eb; border: 1px solid #3b82f6;
+                border-radius: 10px; padding: 0.6rem 0.8rem; font: 12px/1.4 monospace;
+                box-shadow: 0 4px 20px rgba(0,0,0,0.4); pointer-events: none;">
+        <div style="font-weight: 700; margin-bottom: 0.3rem;">
+            ⏱️ {html.escape(profile.page)} · {profile.elapsed_ms:.0f} ms
+        </div>
+        <table style="border-collapse: collapse;">{rows}</table>
+    </div>
+    """)
@@ -0,0 +1,44 @@
+"""
+Client-Modus fürs Quiz (Custom Component)
+
+Das kompilierte Quiz wird einmal an den Browser geschickt (ohne die richtigen
+Antworten). Das Beantworten, Mischen und Zeitmessen passiert komplett im
+Browser; am Ende kommt der ganze Durchlauf mit einem einzigen Aufruf zurück und
+wird auf dem Server in einem Durchgang geprüft und bewertet
+(CompiledQuiz.grade_submission). Pro Frage gibt es also keinen Rerun mehr.
+
+Das Frontend ist eine statische HTML-Datei ohne Build-Schritt.
+
+Created by l1rox3 • 2025
+"""
+
+import os
+from typing import Dict, List, Optional
+
+import streamlit.components.v1 as components
+
+from core.compiled import CompiledQuiz
+
+_FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "quiz_client_frontend")
+_component = components.declare_component("quiz_client", path=_FRONTEND_DIR)
+
+
+def quiz_client(quiz: CompiledQuiz, qids: List[int], seed: int, run_id: str, theme: Dict[str, str],
+                key: Optional[str] = None) -> Optional[Dict]:
+    """
+    Zeigt die Fragen qids im Browser an (Options-Reihenfolge wie im Server-Modus aus dem Seed).
+
+    Returns:
+        None, solange der Durchlauf läuft; danach
+        {"run_id": ..., "answers": [{"q": frage_id, "s": options_index, "t": sekunden}, ...]}
+    """
+    payload = quiz.client_payload(qids)
+    for question in payload["questions"]:
+        question["order"] = quiz.option_order(seed, question["id"])
+    return _component(
+        quiz=payload,
+        run_id=run_id,
+        theme={k: theme[k] for k in ("surface", "border", "text", "text_secondary", "accent", "card_gradient")},
+        key=key or f"quiz_client_{run_id}",
+        default=None,
+    )
@@ -0,0 +1,25 @@
+"""
+Stylesheet einer Seite einbinden (siehe core.styles)
+
+Mit server.enableStaticServing (.streamlit/config.toml) geht pro Rerun nur ein
+<link> auf die gehashte Datei unter app/static/css an den Browser. Ohne
+Static Serving, oder wenn static/css nicht beschreibbar ist, wird das
+einmal kompilierte CSS wie bisher als <style> mitgeschickt.
+
+Created by l1rox3 • 2025
+"""
+
+from typing import Dict
+
+import streamlit as st
+
+from components.markup import render_html
+from core.styles import compile_stylesheet, publish
+
+
+def use_stylesheet(kind: str, theme: Dict[str, str]) -> None:
+    sheet = compile_stylesheet(kind, theme)
+    if st.get_option("server.enableStaticServing") and publish(sheet):
+        render_html(f'<link rel="stylesheet" href="{sheet.url}">')
+    else:
+        render_html(f"<style>\n{sheet.css}\n</style>")
@@ -0,0 +1,212 @@
+"""
+Adaptives Testen (Elo / 1PL-IRT)
+
+Jede Frage hat eine Schwierigkeit b, jeder Durchlauf eine Fähigkeitsschätzung
+theta. Die Wahrscheinlichkeit einer richtigen Antwort ist sigmoid(theta - b),
+die Information einer Frage p * (1 - p) ist am größten, wenn b nahe an theta
+liegt. Die nächste Frage ist deshalb die unbeantwortete Frage mit der
+Schwierigkeit am nächsten an theta: pro Quiz gibt es eine nach b sortierte
+Liste, die Auswahl ist ein bisect plus ein paar Schritte nach links/rechts.
+
+Die Schwierigkeiten werden mit jedem gespeicherten Ergebnis per Elo-Update
+nachkalibriert und in ./data/stats/items.json gehalten - pro stabilem
+Frage-Schlüssel (CompiledQuiz.keys), nicht pro Position: ein Ergebnis wird
+über die Fassung zugeordnet, mit der es gespielt wurde, und gelöschte oder
+umsortierte Fragen nehmen ihre Schwierigkeit nicht an eine andere Frage mit.
+Der sortierte Index gilt für eine Fassung und wird beim Wechsel neu gebaut.
+
+Created by l1rox3 • 2025
+"""
+
+import bisect
+import json
+import logging
+import math
+import os
+import random
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from core.catalog import get_catalog
+from core.compiled import CompiledQuiz
+from core.results import get_results_store, quiz_id_of
+
+LOG = logging.getLogger("quiz.adaptive")
+
+ITEMS_FILE = "./data/stats/items.json"
+K_ABILITY = 0.6          # Schrittweite für theta innerhalb eines Durchlaufs
+K_ITEM = 0.4             # Anfangs-Schrittweite für b, sinkt mit der Zahl der Antworten
+K_ITEM_MIN = 0.02
+CANDIDATES = 3           # unter den nächsten n Fragen wird per Seed gewählt (Exposure)
+ADAPTIVE_LENGTH = 15     # Fragen pro adaptivem Durchlauf, wenn das Quiz nichts vorgibt
+
+
+def probability(theta: float, b: float) -> float:
+    return 1.0 / (1.0 + math.exp(b - theta))
+
+
+def update_ability(theta: float, b: float, correct: bool) -> float:
+    """Neue Fähigkeitsschätzung nach einer Antwort"""
+    return theta + K_ABILITY * (float(correct) - probability(theta, b))
+
+
+class ItemBank:
+    """Schwierigkeiten pro Quiz und Frage, mit sortiertem Index für die Auswahl"""
+
+    def __init__(self, path: str = ITEMS_FILE):
+        self.path = path
+        self._params: Dict[str, Dict[str, List[float]]] = {}      # quiz -> schlüssel -> [b, n]
+        # quiz -> (Fassung, Index nach (b, qid) für deren Positionen)
+        self._index: Dict[str, Tuple[CompiledQuiz, List[Tuple[float, int]]]] = {}
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    # ---------- Laden / Speichern ----------
+    def load(self) -> bool:
+        with self._lock:
+            self._loaded = True
+            if not os.path.exists(self.path):
+                return False
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                LOG.error("Fehler beim Laden von %s: %s", self.path, e)
+                return False
+            if data.get("version") != 2:
+                # Version 1 war nach Positionen geschlüsselt: aus den Ergebnissen neu kalibrieren
+                LOG.info("%s hat ein altes Format und wird neu aufgebaut", self.path)
+                return False
+            self._params = {
+                quiz: {key: [float(b), int(n)] for key, (b, n) in items.items()}
+                for quiz, items in data.get("quizzes", {}).items()
+            }
+            self._index = {}
+            return True
+
+    def save(self) -> None:
+        with self._lock:
+            data = {
+                "version": 2,
+                "quizzes": {
+                    quiz: {key: [round(b, 4), n] for key, (b, n) in items.items()}
+                    for quiz, items in self._params.items()
+                },
+            }
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_file = f"{self.path}.tmp"
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(temp_file, self.path)
+
+    def ensure_loaded(self, results: Optional[Iterable[Dict]] = None) -> None:
+        """Lädt die Datei einmal; fehlt sie, wird aus den Ergebnissen kalibriert"""
+        with self._lock:
+            if self._loaded:
+                return
+            if not self.load() and results is not None:
+                self.rebuild(results)
+                LOG.info("Frage-Schwierigkeiten aus vorhandenen Ergebnissen kalibriert")
+
+    def rebuild(self, results: Iterable[Dict]) -> None:
+        with self._lock:
+            self._params = {}
+            self._index = {}
+            for result in results:
+                self._record(result)
+            self._loaded = True
+            self.save()
+
+    # ---------- Kalibrierung ----------
+    def _record(self, result: Dict) -> None:
+        quiz_id = quiz_id_of(result)
+        keys = get_catalog().question_keys(quiz_id, result.get("quiz_version"))
+        if keys is None:
+            return
+        params = self._params.setdefault(quiz_id, {})
+        indexed = self._index.get(quiz_id)
+        theta = 0.0
+        for answer in result.get("answers", []):
+            # Ältere Ergebnisse ohne Frage-ID lassen sich nicht zuordnen
+            if "q" not in answer or not 0 <= answer["q"] < len(keys):
+                continue
+            key, correct = keys[answer["q"]], bool(answer.get("c"))
+            b, n = params.get(key, (0.0, 0))
+            surprise = float(correct) - probability(theta, b)
+            theta += K_ABILITY * surprise
+            new_b = b - max(K_ITEM / (1 + 0.05 * n), K_ITEM_MIN) * surprise
+            params[key] = [new_b, n + 1]
+            # Index der aktuellen Fassung nachführen (falls die Frage dort vorkommt)
+            qid = indexed[0].position(key) if indexed is not None else None
+            if qid is not None:
+                index = indexed[1]
+                pos = bisect.bisect_left(index, (b, qid))
+                if pos < len(index) and index[pos] == (b, qid):
+                    del index[pos]
+                bisect.insort(index, (new_b, qid))
+
+    def record(self, result: Dict, persist: bool = True) -> None:
+        """Nimmt ein gespeichertes Ergebnis auf (aus save_result)"""
+        with self._lock:
+            self._record(result)
+            if persist:
+                try:
+                    self.save()
+                except OSError as e:
+                    LOG.error("Frage-Schwierigkeiten konnten nicht gespeichert werden: %s", e)
+
+    # ---------- Auswahl ----------
+    def _sorted(self, quiz: CompiledQuiz) -> List[Tuple[float, int]]:
+        indexed = self._index.get(quiz.quiz_id)
+        if indexed is None or indexed[0].version != quiz.version:
+            params = self._params.get(quiz.quiz_id, {})
+            index = sorted((params[key][0] if key in params else 0.0, qid) for qid, key in enumerate(quiz.keys))
+            indexed = self._index[quiz.quiz_id] = (quiz, index)
+        return indexed[1]
+
+    def difficulty(self, quiz: CompiledQuiz, qid: int) -> float:
+        with self._lock:
+            item = self._params.get(quiz.quiz_id, {}).get(quiz.keys[qid])
+            return item[0] if item else 0.0
+
+    def next_item(self, quiz: CompiledQuiz, theta: float, asked: Set[int],
+                  rng: Optional[random.Random] = None) -> Optional[int]:
+        """
+        Unbeantwortete Frage mit der höchsten Information für theta.
+
+        Läuft vom bisect-Punkt nach außen, bis CANDIDATES unbeantwortete Fragen
+        gefunden sind, und wählt eine davon (verhindert, dass alle dieselbe
+        Reihenfolge sehen). Kosten: O(log n + Anzahl beantworteter Fragen).
+        """
+        with self._lock:
+            index = self._sorted(quiz)
+            right = bisect.bisect_left(index, (theta, -1))
+            left = right - 1
+            found: List[int] = []
+            while len(found) < CANDIDATES and (left >= 0 or right < len(index)):
+                go_left = right >= len(index) or (left >= 0 and theta - index[left][0] <= index[right][0] - theta)
+                if go_left:
+                    qid = index[left][1]
+                    left -= 1
+                else:
+                    qid = index[right][1]
+                    right += 1
+                if qid not in asked:
+                    found.append(qid)
+        if not found:
+            return None
+        return (rng or random).choice(found)
+
+
+_bank: Optional[ItemBank] = None
+_bank_lock = threading.Lock()
+
+
+def get_item_bank() -> ItemBank:
+    """Gibt die prozessweite ItemBank zurück (lädt bzw. kalibriert sie beim ersten Zugriff)"""
+    global _bank
+    with _bank_lock:
+        if _bank is None:
+            _bank = ItemBank()
+            _bank.ensure_loaded(get_results_store().all())
+        return _bank
@@ -0,0 +1,291 @@
+"""
+Quiz-Katalog für ./data/quizzes/*.json
+
+Findet, validiert und cached alle Quiz-Dateien einmal pro Prozess. Für die
+Auswahlseite gibt es ein leichtes Manifest (Titel, Beschreibung, Anzahl
+Fragen); die vollständigen Fragen werden erst geladen und kompiliert (siehe
+core.compiled), wenn ein Quiz gespielt wird. Ändert sich die mtime einer Datei, wird nur dieser Eintrag verworfen.
+Die Prüfung auf Änderungen läuft höchstens alle CHECK_INTERVAL Sekunden, ein
+normaler Rerun verursacht also keinen Datei-Zugriff.
+
+Versionen: jede Fassung eines Quiz hat einen Inhalts-Hash als Version. Ein
+Watcher-Thread prüft das Verzeichnis im Hintergrund; ändert sich der Inhalt
+eines schon geladenen Quiz, wird die neue Fassung kompiliert und dann in einem
+Schritt ausgetauscht. Laufende Durchläufe behalten ihre Fassung (sie halten
+eine Referenz darauf, siehe get(..., version=...)); alte Fassungen liegen nur
+in einem WeakValueDictionary und verschwinden, sobald kein Durchlauf sie mehr
+hält. Jede Fassung wird zusätzlich unter ./data/quizzes/versions/<quiz>/
+abgelegt, damit Auswertungen alter Ergebnisse die passenden Fragen finden.
+
+Created by l1rox3 • 2025
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from core.compiled import CompiledQuiz, compile_quiz, content_version
+
+LOG = logging.getLogger("quiz.catalog")
+
+QUIZZES_DIR = "./data/quizzes"
+CHECK_INTERVAL = 5.0
+
+# ---------------------- VALIDIERUNG ----------------------
+def validate_quiz(data) -> List[str]:
+    """Prüft eine Quiz-Definition, gibt eine Liste von Fehlern zurück (leer = gültig)"""
+    if not isinstance(data, dict):
+        return ["Quiz muss ein JSON-Objekt sein"]
+    errors = []
+    if not isinstance(data.get("title"), str) or not data["title"].strip():
+        errors.append("'title' fehlt")
+    questions = data.get("questions")
+    if not isinstance(questions, list) or not questions:
+        return errors + ["'questions' muss eine nicht-leere Liste sein"]
+    sample_size = data.get("sample_size")
+    if sample_size is not None and (not isinstance(sample_size, int) or isinstance(sample_size, bool) or sample_size < 1):
+        errors.append("'sample_size' muss eine positive ganze Zahl sein")
+    if not isinstance(data.get("stratify_by", ""), str):
+        errors.append("'stratify_by' muss ein Feldname sein")
+    for no, q in enumerate(questions, 1):
+        if not isinstance(q, dict):
+            errors.append(f"Frage {no}: muss ein Objekt sein")
+            continue
+        if not isinstance(q.get("question"), str) or not q["question"].strip():
+            errors.append(f"Frage {no}: 'question' fehlt")
+        options = q.get("options")
+        if not isinstance(options, list) or len(options) < 2 or not all(isinstance(o, str) for o in options):
+            errors.append(f"Frage {no}: 'options' braucht mindestens 2 Texte")
+            continue
+        if len(set(options)) != len(options):
+            errors.append(f"Frage {no}: doppelte Antwortoptionen")
+        if q.get("answer") not in options:
+            errors.append(f"Frage {no}: 'answer' ist keine der Optionen")
+    ids = [q.get("id") for q in questions if isinstance(q, dict) and q.get("id") is not None]
+    if any(not isinstance(i, (str, int)) or isinstance(i, bool) for i in ids):
+        errors.append("'id' einer Frage muss Text oder Zahl sein")
+    elif len({str(i) for i in ids}) != len(ids):
+        errors.append("doppelte Frage-IDs ('id')")
+    return errors
+
+# ---------------------- KATALOG ----------------------
+@dataclass
+class QuizInfo:
+    quiz_id: str
+    title: str
+    description: str
+    question_count: int
+    path: str
+    mtime: float
+    errors: List[str] = field(default_factory=list)
+    sample_size: Optional[int] = None
+    version: str = ""
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+    @property
+    def label(self) -> str:
+        """z.B. '18 Fragen' oder '20 aus 500 Fragen'"""
+        if self.sample_size and self.sample_size < self.question_count:
+            return f"{self.sample_size} aus {self.question_count} Fragen"
+        return f"{self.question_count} Fragen"
+
+
+class QuizCatalog:
+    def __init__(self, quizzes_dir: str = QUIZZES_DIR, check_interval: float = CHECK_INTERVAL,
+                 versions_dir: Optional[str] = None):
+        self.quizzes_dir = quizzes_dir
+        self.versions_dir = versions_dir or os.path.join(quizzes_dir, "versions")
+        self.check_interval = check_interval
+        self._manifest: Dict[str, QuizInfo] = {}
+        self._quizzes: Dict[str, CompiledQuiz] = {}         # aktuelle Fassung
+        self._versions: "weakref.WeakValueDictionary[Tuple[str, str], CompiledQuiz]" = weakref.WeakValueDictionary()
+        self._last_check = 0.0
+        self._watcher: Optional[threading.Thread] = None
+        self._lock = threading.RLock()
+
+    def _read(self, path: str) -> Optional[Dict]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            LOG.error("Quiz-Datei %s konnte nicht gelesen werden: %s", path, e)
+            return None
+
+    def _compile(self, quiz_id: str, data: Dict, version: str) -> CompiledQuiz:
+        """Kompiliert eine Fassung, registriert sie und legt sie im Versions-Archiv ab"""
+        quiz = compile_quiz(quiz_id, data, version)
+        self._versions[(quiz_id, version)] = quiz
+        path = os.path.join(self.versions_dir, quiz_id, f"{version}.json")
+        if not os.path.exists(path):
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                temp_file = f"{path}.tmp"
+                with open(temp_file, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(temp_file, path)
+            except OSError as e:
+                LOG.error("Version %s von '%s' konnte nicht archiviert werden: %s", version, quiz_id, e)
+        return quiz
+
+    def _scan(self) -> None:
+        """Gleicht das Manifest mit dem Verzeichnis ab (nur geänderte Dateien werden gelesen)"""
+        seen = {}
+        try:
+            with os.scandir(self.quizzes_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".json") and entry.is_file():
+                        seen[entry.name[:-5]] = (entry.path, entry.stat().st_mtime)
+        except FileNotFoundError:
+            pass
+
+        for quiz_id in set(self._manifest) - set(seen):
+            self._manifest.pop(quiz_id)
+            self._quizzes.pop(quiz_id, None)
+
+        for quiz_id, (path, mtime) in seen.items():
+            known = self._manifest.get(quiz_id)
+            if known is not None and known.mtime == mtime:
+                continue
+            data = self._read(path)
+            errors = ["Datei nicht lesbar"] if data is None else validate_quiz(data)
+            if errors:
+                LOG.warning("Quiz '%s' ist ungültig: %s", quiz_id, "; ".join(errors))
+            data = data if isinstance(data, dict) else {}
+            version = content_version(data) if not errors else ""
+            if known is not None and known.version == version and not errors:
+                # Nur angefasst, Inhalt gleich: Fassung bleibt
+                known.mtime = mtime
+                continue
+            questions = data.get("questions")
+            self._manifest[quiz_id] = QuizInfo(
+                quiz_id=quiz_id,
+                title=str(data.get("title") or quiz_id),
+                description=str(data.get("description") or ""),
+                question_count=len(questions) if isinstance(questions, list) else 0,
+                path=path,
+                mtime=mtime,
+                errors=errors,
+                sample_size=None if errors else data.get("sample_size"),
+                version=version,
+            )
+            if errors:
+                self._quizzes.pop(quiz_id, None)
+            elif quiz_id in self._quizzes:
+                # Schon gespielt: neue Fassung vorab kompilieren und in einem Schritt tauschen
+                self._quizzes[quiz_id] = self._compile(quiz_id, data, version)
+                LOG.info("Quiz '%s' neu geladen (Version %s)", quiz_id, version)
+
+    def _maybe_check(self) -> None:
+        now = time.monotonic()
+        if now - self._last_check >= self.check_interval:
+            self._scan()
+            self._last_check = now
+
+    def _watch(self) -> None:
+        while True:
+            time.sleep(self.check_interval)
+            try:
+                with self._lock:
+                    self._maybe_check()
+            except Exception as e:
+                LOG.error("Quiz-Watcher: %s", e)
+
+    def start_watcher(self) -> None:
+        """Prüft das Verzeichnis im Hintergrund, damit Änderungen ohne Seitenaufruf übernommen werden"""
+        with self._lock:
+            if self._watcher is None:
+                self._watcher = threading.Thread(target=self._watch, name="quiz-watcher", daemon=True)
+                self._watcher.start()
+
+    def invalidate(self) -> None:
+        """Erzwingt beim nächsten Zugriff eine Prüfung"""
+        with self._lock:
+            self._last_check = 0.0
+
+    def manifest(self, include_invalid: bool = False) -> List[QuizInfo]:
+        """Alle Quizze für die Auswahlseite, sortiert nach Titel"""
+        with self._lock:
+            self._maybe_check()
+            infos = [i for i in self._manifest.values() if include_invalid or i.valid]
+        return sorted(infos, key=lambda i: i.title.lower())
+
+    def info(self, quiz_id: str) -> Optional[QuizInfo]:
+        with self._lock:
+            self._maybe_check()
+            return self._manifest.get(quiz_id)
+
+    def get(self, quiz_id: str, version: Optional[str] = None) -> Optional[CompiledQuiz]:
+        """
+        Kompiliertes Quiz (lädt die Fragen beim ersten Zugriff).
+
+        Ohne version die aktuelle Fassung; mit version genau diese Fassung
+        (aus dem Speicher oder dem Versions-Archiv), z.B. für Auswertungen
+        älterer Ergebnisse.
+        """
+        with self._lock:
+            self._maybe_check()
+            info = self._manifest.get(quiz_id)
+            current = None
+            if info is not None and info.valid:
+                current = self._quizzes.get(quiz_id)
+                if current is None:
+                    data = self._read(info.path)
+                    if data is not None and not validate_quiz(data):
+                        current = self._compile(quiz_id, data, content_version(data))
+                        self._quizzes[quiz_id] = current
+            if not version or (current is not None and current.version == version):
+                return current
+            quiz = self._versions.get((quiz_id, version))
+            if quiz is None:
+                data = self._read_version(quiz_id, version)
+                if data is not None:
+                    quiz = compile_quiz(quiz_id, data, version)
+                    self._versions[(quiz_id, version)] = quiz
+            return quiz
+
+    def question_keys(self, quiz_id: str, version: Optional[str] = None) -> Optional[Tuple[str, ...]]:
+        """
+        Stabile Frage-Schlüssel der Fassung, mit der ein Ergebnis gespielt wurde.
+
+        Ergebnisse ohne Version (ältere Dateien) werden der aktuellen Fassung
+        zugeordnet; ist eine Version nicht mehr auffindbar, gibt es None - die
+        Positionen ließen sich sonst falschen Fragen zuordnen.
+        """
+        quiz = self.get(quiz_id, version)
+        return quiz.keys if quiz is not None else None
+
+    def _read_version(self, quiz_id: str, version: str) -> Optional[Dict]:
+        path = os.path.join(self.versions_dir, quiz_id, f"{version}.json")
+        if not os.path.exists(path):
+            return None
+        return self._read(path)
+
+    def loaded_versions(self) -> List[Tuple[str, str, bool]]:
+        """(quiz_id, version, aktuell?) aller Fassungen, die gerade im Speicher sind"""
+        with self._lock:
+            return sorted(
+                (quiz_id, version, self._quizzes.get(quiz_id) is quiz)
+                for (quiz_id, version), quiz in list(self._versions.items())
+            )
+
+
+_catalog: Optional[QuizCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> QuizCatalog:
+    """Gibt den prozessweiten Katalog zurück"""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = QuizCatalog()
+            _catalog.start_watcher()
+        return _catalog
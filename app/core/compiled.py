@@ -0,0 +1,274 @@
+"""
+Kompilierte Quiz-Darstellung
+
+Ein Quiz aus ./data/quizzes wird einmal in eine kompakte Form übersetzt:
+Fragen haben ganzzahlige IDs (Position im Quiz), Optionen liegen als Tupel vor
+und die richtige Antwort ist ein Index. Bewerten ist damit ein Integer-
+Vergleich, Sessions speichern nur Index-Permutationen und gespeicherte
+Antworten bestehen aus Indizes statt aus kopierten Texten.
+
+Gespeichertes Antwortformat:
+    {"q": frage_id, "s": options_index, "c": richtig, "t": sekunden}
+
+Stichproben aus großen Fragenpools: hat ein Quiz "sample_size": k, zieht jeder
+Durchlauf k Fragen, geschichtet nach "stratify_by" (Standard "topic", z.B.
+auch "difficulty"). Welche Fragen in welcher Reihenfolge kommen und wie die
+Optionen gemischt sind, folgt deterministisch aus einem Seed pro Durchlauf -
+die Session speichert nur diesen Seed.
+
+Jede kompilierte Fassung trägt eine Version (Hash über den Inhalt, siehe
+content_version); Durchläufe und Ergebnisse merken sich diese Version.
+
+Die Position einer Frage ändert sich, wenn ein Admin Fragen löscht oder
+umsortiert. Statistiken pro Frage (Schwierigkeit, Wiederholungsplan,
+Antwortzeiten) hängen deshalb an einem stabilen Schlüssel (keys, siehe
+question_key): "id" aus der Quiz-Datei, sonst ein Hash über Frage und
+richtige Antwort.
+
+Created by l1rox3 • 2025
+"""
+
+import hashlib
+import json
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+MAX_ANSWER_SECONDS = 3600.0
+CLIENT_TIME_SLACK = 3.0          # Sekunden, die der Client weniger als der Server messen darf (Laden, Netz)
+DEFAULT_STRATIFY_BY = "topic"
+
+
+def content_version(data: Dict) -> str:
+    """Version eines Quiz: Hash über den normalisierten Inhalt (Formatierung zählt nicht)"""
+    canonical = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:12]
+
+
+def question_key(question: Dict) -> str:
+    """Stabiler Schlüssel einer Frage: ihre "id" oder ein Hash über Fragetext und richtige Antwort"""
+    if question.get("id") is not None:
+        return str(question["id"])
+    text = f"{question['question']}\x00{question['answer']}"
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+
+def _unique(keys: Sequence[str]) -> Tuple[str, ...]:
+    """Doppelte Fragen (gleicher Text, gleiche Antwort) bekommen ein ~2, ~3 ..."""
+    seen: Dict[str, int] = {}
+    out = []
+    for key in keys:
+        seen[key] = seen.get(key, 0) + 1
+        out.append(key if seen[key] == 1 else f"{key}~{seen[key]}")
+    return tuple(out)
+
+
+def new_seed() -> int:
+    """Seed für einen neuen Durchlauf"""
+    return random.SystemRandom().getrandbits(63)
+
+
+def allocate(sizes: Sequence[int], k: int) -> List[int]:
+    """Verteilt k proportional auf Schichten der Größe sizes (Largest-Remainder-Verfahren)"""
+    total = sum(sizes)
+    if k >= total:
+        return list(sizes)
+    quotas = [k * n / total for n in sizes]
+    counts = [int(q) for q in quotas]
+    by_remainder = sorted(range(len(sizes)), key=lambda i: quotas[i] - counts[i], reverse=True)
+    for i in by_remainder[:k - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+class CompiledQuiz:
+    __slots__ = ("quiz_id", "title", "description", "questions", "options", "answers", "strata", "sample_size",
+                 "version", "keys", "_positions", "__weakref__")
+
+    def __init__(self, quiz_id: str, title: str, description: str,
+                 questions: Tuple[str, ...], options: Tuple[Tuple[str, ...], ...], answers: Tuple[int, ...],
+                 strata: Optional[Tuple[Tuple[int, ...], ...]] = None, sample_size: Optional[int] = None,
+                 version: str = "", keys: Optional[Tuple[str, ...]] = None):
+        self.quiz_id = quiz_id
+        self.version = version
+        self.title = title
+        self.description = description
+        self.questions = questions
+        self.options = options
+        self.answers = answers
+        self.strata = strata or (tuple(range(len(questions))),)
+        self.sample_size = sample_size
+        self.keys = keys or _unique([
+            question_key({"question": text, "answer": opts[answer]})
+            for text, opts, answer in zip(questions, options, answers)
+        ])
+        self._positions = {key: qid for qid, key in enumerate(self.keys)}
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    @property
+    def attempt_length(self) -> int:
+        """Anzahl Fragen pro Durchlauf"""
+        if self.sample_size is None:
+            return len(self.questions)
+        return min(self.sample_size, len(self.questions))
+
+    def position(self, key: str) -> Optional[int]:
+        """Frage-ID (Position) zu einem stabilen Schlüssel, None wenn die Frage fehlt"""
+        return self._positions.get(key)
+
+    def grade(self, qid: int, choice: int) -> bool:
+        return self.answers[qid] == choice
+
+    def draw(self, seed: int) -> List[int]:
+        """
+        Frage-IDs eines Durchlaufs, deterministisch aus dem Seed.
+
+        Ohne sample_size kommen alle Fragen in Datei-Reihenfolge. Sonst wird k
+        proportional auf die Schichten verteilt und pro Schicht mit
+        random.sample über ein range gezogen (Auswahl über ein Set, O(k) statt
+        O(Poolgröße)); die gezogenen Fragen werden anschließend gemischt.
+        """
+        if self.sample_size is None or self.sample_size >= len(self.questions):
+            return list(range(len(self.questions)))
+        rng = random.Random(seed)
+        drawn: List[int] = []
+        for stratum, count in zip(self.strata, allocate([len(s) for s in self.strata], self.sample_size)):
+            drawn.extend(stratum[i] for i in rng.sample(range(len(stratum)), count))
+        rng.shuffle(drawn)
+        return drawn
+
+    def option_order(self, seed: int, qid: int) -> List[int]:
+        """Reihenfolge der Options-Indizes einer Frage, deterministisch aus Seed und Frage"""
+        order = list(range(len(self.options[qid])))
+        random.Random(f"{seed}:{qid}").shuffle(order)
+        return order
+
+    def answer_record(self, qid: int, choice: int, seconds: float) -> Dict:
+        """Kompakter Antwort-Eintrag für save_result"""
+        return {"q": qid, "s": choice, "c": self.grade(qid, choice), "t": round(seconds, 2)}
+
+    def client_payload(self, qids: Optional[Sequence[int]] = None) -> Dict:
+        """Quiz für den Browser (Client-Modus) - ohne die richtigen Antworten"""
+        qids = range(len(self.questions)) if qids is None else qids
+        return {
+            "quiz_id": self.quiz_id,
+            "title": self.title,
+            "questions": [
+                {"id": qid, "text": self.questions[qid], "options": list(self.options[qid])}
+                for qid in qids
+            ],
+        }
+
+    def grade_submission(self, submission: Dict, elapsed: Optional[float] = None,
+                         qids: Optional[Sequence[int]] = None) -> Tuple[int, List[Dict]]:
+        """
+        Prüft und bewertet einen kompletten Durchlauf aus dem Client-Modus in einem Durchgang.
+
+        Args:
+            submission: {"answers": [{"q": frage_id, "s": options_index, "t": sekunden}, ...]}
+            elapsed: serverseitig gemessene Gesamtzeit; die Client-Zeiten werden
+                höchstens auf diese Summe gekürzt und mindestens auf
+                elapsed - CLIENT_TIME_SLACK aufgefüllt (sonst gewänne ein
+                gefälschter Durchlauf mit "t": 0 jeden Gleichstand)
+            qids: die Fragen dieses Durchlaufs (Standard: alle)
+
+        Returns:
+            (punkte, antworten im gespeicherten Format)
+
+        Raises:
+            ValueError: wenn der Durchlauf unvollständig oder ungültig ist
+        """
+        expected = set(range(len(self.questions)) if qids is None else qids)
+        raw = submission.get("answers") if isinstance(submission, dict) else None
+        if not isinstance(raw, list) or len(raw) != len(expected):
+            raise ValueError("Nicht alle Fragen wurden beantwortet")
+
+        seen = set()
+        entries = []
+        for item in raw:
+            try:
+                qid, choice, seconds = int(item["q"]), int(item["s"]), float(item["t"])
+            except (KeyError, TypeError, ValueError):
+                raise ValueError("Ungültiger Antwort-Eintrag") from None
+            if qid not in expected or qid in seen:
+                raise ValueError(f"Ungültige oder doppelte Frage: {qid}")
+            if not 0 <= choice < len(self.options[qid]):
+                raise ValueError(f"Ungültige Option für Frage {qid}")
+            seen.add(qid)
+            entries.append((qid, choice, min(max(seconds, 0.0), MAX_ANSWER_SECONDS)))
+
+        total = sum(seconds for _, _, seconds in entries)
+        scale, extra = 1.0, 0.0
+        if elapsed is not None and elapsed > 0:
+            floor = max(elapsed - CLIENT_TIME_SLACK, 0.0)
+            if total > elapsed:
+                scale = elapsed / total
+            elif total < floor:
+                # Fehlende Zeit gleichmäßig auf alle Antworten verteilen
+                extra = (floor - total) / len(entries)
+        answers = [self.answer_record(qid, choice, seconds * scale + extra) for qid, choice, seconds in entries]
+        return sum(1 for answer in answers if answer["c"]), answers
+
+    def expand(self, answer: Dict) -> Dict:
+        """Kompakte Antwort -> lesbare Felder (question_id, question, selected, correct, is_correct, time)"""
+        qid, choice = answer["q"], answer["s"]
+        known = 0 <= qid < len(self.questions)
+        options = self.options[qid] if known else ()
+        return {
+            "question_id": qid,
+            "question": self.questions[qid] if known else None,
+            "selected": options[choice] if 0 <= choice < len(options) else None,
+            "correct": options[self.answers[qid]] if known else None,
+            "is_correct": answer.get("c"),
+            "time": answer.get("t"),
+        }
+
+
+def compile_quiz(quiz_id: str, data: Dict, version: Optional[str] = None) -> CompiledQuiz:
+    """Übersetzt ein (validiertes) Quiz-Dict in die kompakte Form"""
+    questions = []
+    options = []
+    answers = []
+    strata: Dict[str, List[int]] = {}
+    stratify_by = data.get("stratify_by", DEFAULT_STRATIFY_BY)
+    for qid, q in enumerate(data["questions"]):
+        opts = tuple(q["options"])
+        questions.append(q["question"])
+        options.append(opts)
+        answers.append(opts.index(q["answer"]))
+        strata.setdefault(str(q.get(stratify_by, "")), []).append(qid)
+    return CompiledQuiz(
+        quiz_id=quiz_id,
+        title=data.get("title", quiz_id),
+        description=data.get("description", ""),
+        questions=tuple(questions),
+        options=tuple(options),
+        answers=tuple(answers),
+        strata=tuple(tuple(qids) for _, qids in sorted(strata.items())),
+        sample_size=data.get("sample_size"),
+        version=version or content_version(data),
+        keys=_unique([question_key(q) for q in data["questions"]]),
+    )
+
+
+def expand_answer(answer: Dict, compiled: Optional[CompiledQuiz] = None) -> Dict:
+    """
+    Lesbare Felder für eine gespeicherte Antwort.
+
+    Ältere Ergebnisse enthalten die Texte noch direkt und werden unverändert
+    übernommen; kompakte Antworten brauchen das kompilierte Quiz.
+    """
+    if "q" not in answer:
+        return {
+            "question_id": None,
+            "question": answer.get("question"),
+            "selected": answer.get("selected"),
+            "correct": answer.get("correct"),
+            "is_correct": answer.get("is_correct"),
+            "time": answer.get("time"),
+        }
+    if compiled is None:
+        return {"question_id": answer["q"], "question": None, "selected": None, "correct": None,
+                "is_correct": answer.get("c"), "time": answer.get("t")}
+    return compiled.expand(answer)
@@ -0,0 +1,304 @@
+"""
+Streaming-Export der kompletten Ergebnis-Historie
+
+Exportiert alle Durchläufe (eine Zeile pro Run) oder alle Antworten (eine Zeile
+pro beantworteter Frage) als CSV, JSONL oder Parquet. Die Zeilen kommen aus
+einem Generator über den ResultsStore und werden in Blöcken geschrieben, es
+wird also nie die ganze Tabelle im Speicher aufgebaut.
+
+Zum Herunterladen schreibt publish() den Export blockweise nach
+app/static/exports/<token>/<datei> (Static Serving, siehe core.styles);
+Streamlit liefert die Datei von dort in Blöcken aus, ohne sie in den
+Speicher zu laden. Das Token ist zufällig und nicht erratbar, Exporte werden
+nach EXPORT_TTL gelöscht.
+
+Created by l1rox3 • 2025
+"""
+
+import csv
+import io
+import json
+import logging
+import os
+import secrets
+import shutil
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Optional
+
+from core.catalog import get_catalog
+from core.compiled import CompiledQuiz, expand_answer
+from core.results import ResultsStore, get_results_store, quiz_id_of
+from core.retention import get_archive
+from core.styles import STATIC_DIR
+
+LOG = logging.getLogger("quiz.export")
+
+FORMATS = ("csv", "jsonl", "parquet")
+LEVELS = ("runs", "answers")
+CHUNK_ROWS = 5_000
+EXPORT_DIR = os.path.join(STATIC_DIR, "exports")
+EXPORT_URL = "app/static/exports"         # relativ zur Seite, wie core.styles.STATIC_URL
+EXPORT_TTL = 3600                         # Sekunden, bis ein Export wieder gelöscht wird
+MAX_SERVED_BYTES = 200 * 1024 * 1024      # größere Dateien liefert Streamlits Static Serving nicht aus
+
+RUN_COLUMNS = [
+    "username", "quiz_id", "quiz_version", "timestamp", "score", "total", "percentage",
+    "time_taken", "avg_time_per_question", "file",
+]
+ANSWER_COLUMNS = [
+    "username", "quiz_id", "quiz_version", "timestamp", "question_no", "question_id", "question",
+    "selected", "correct", "is_correct", "time", "file",
+]
+
+# ---------------------- FILTER ----------------------
+def _result_date(result: Dict) -> Optional[date]:
+    try:
+        return datetime.fromisoformat(result.get("timestamp", "")).date()
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_results(
+    store: Optional[ResultsStore] = None,
+    quiz: Optional[str] = None,
+    user: Optional[str] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    include_archive: bool = True,
+) -> Iterator[tuple]:
+    """Liefert (dateiname, ergebnis) für alle Ergebnisse, die zu den Filtern passen (inkl. Archiv)"""
+    store = store or get_results_store()
+    for filename, result in store.items():
+        if quiz and quiz_id_of(result) != quiz:
+            continue
+        if user and result.get("username") != user:
+            continue
+        if since or until:
+            day = _result_date(result)
+            if day is None or (since and day < since) or (until and day > until):
+                continue
+        yield filename, result
+    if include_archive:
+        for result in get_archive().iter_runs(quiz=quiz, user=user, since=since, until=until):
+            yield "archiv", result
+
+# ---------------------- ZEILEN ----------------------
+def iter_run_rows(**filters) -> Iterator[Dict]:
+    """Eine Zeile pro Durchlauf"""
+    for filename, result in iter_results(**filters):
+        yield {
+            "username": result.get("username"),
+            "quiz_id": quiz_id_of(result),
+            "quiz_version": result.get("quiz_version"),
+            "timestamp": result.get("timestamp"),
+            "score": result.get("score"),
+            "total": result.get("total"),
+            "percentage": result.get("percentage"),
+            "time_taken": result.get("time_taken"),
+            "avg_time_per_question": result.get("avg_time_per_question"),
+            "file": filename,
+        }
+
+
+def iter_answer_rows(**filters) -> Iterator[Dict]:
+    """
+    Eine Zeile pro beantworteter Frage. Kompakte Antworten werden über den
+    Katalog aufgelöst, und zwar mit der Quiz-Fassung, auf der der Durchlauf lief
+    (ältere Ergebnisse ohne Version: aktuelle Fassung).
+    """
+    catalog = get_catalog()
+    compiled_by_version: Dict[tuple, Optional[CompiledQuiz]] = {}
+    for filename, result in iter_results(**filters):
+        quiz_id = quiz_id_of(result)
+        version = result.get("quiz_version")
+        key = (quiz_id, version)
+        if key not in compiled_by_version:
+            compiled_by_version[key] = catalog.get(quiz_id, version) or catalog.get(quiz_id)
+        compiled = compiled_by_version[key]
+        for no, answer in enumerate(result.get("answers", []), 1):
+            row = {
+                "username": result.get("username"),
+                "quiz_id": quiz_id,
+                "quiz_version": version,
+                "timestamp": result.get("timestamp"),
+                "question_no": no,
+                "file": filename,
+            }
+            row.update(expand_answer(answer, compiled))
+            yield row
+
+
+def iter_rows(level: str = "runs", **filters) -> Iterator[Dict]:
+    if level not in LEVELS:
+        raise ValueError(f"Unbekannte Export-Ebene: {level}")
+    return iter_run_rows(**filters) if level == "runs" else iter_answer_rows(**filters)
+
+
+def columns_for(level: str) -> List[str]:
+    return RUN_COLUMNS if level == "runs" else ANSWER_COLUMNS
+
+# ---------------------- ENCODER ----------------------
+def iter_csv_chunks(rows: Iterator[Dict], columns: List[str], chunk_rows: int = CHUNK_ROWS) -> Iterator[bytes]:
+    """Kodiert Zeilen blockweise als CSV (UTF-8 mit BOM für Excel)"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    buffer.write("\ufeff")
+    writer.writeheader()
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_jsonl_chunks(rows: Iterator[Dict], chunk_rows: int = CHUNK_ROWS) -> Iterator[bytes]:
+    """Kodiert Zeilen blockweise als JSON Lines"""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row, ensure_ascii=False))
+        if len(lines) >= chunk_rows:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def write_parquet(rows: Iterator[Dict], columns: List[str], sink: IO[bytes], chunk_rows: int = CHUNK_ROWS) -> int:
+    """Schreibt Zeilen als Parquet, eine Row-Group pro Block (benötigt pyarrow)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError("Parquet-Export benötigt das Paket 'pyarrow'") from exc
+
+    types = {
+        "score": pa.int64(), "total": pa.int64(), "question_no": pa.int64(),
+        "question_id": pa.int64(),
+        "percentage": pa.float64(), "time_taken": pa.float64(),
+        "avg_time_per_question": pa.float64(), "time": pa.float64(),
+        "is_correct": pa.bool_(),
+    }
+    schema = pa.schema([(c, types.get(c, pa.string())) for c in columns])
+    written = 0
+    batch: List[Dict] = []
+
+    with pq.ParquetWriter(sink, schema) as writer:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk_rows:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                written += len(batch)
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            written += len(batch)
+    return written
+
+
+def require_format(fmt: str) -> None:
+    """Prüft vorab, ob das Format exportiert werden kann (RuntimeError/ValueError sonst)"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unbekanntes Export-Format: {fmt}")
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as exc:
+            raise RuntimeError("Parquet-Export benötigt das Paket 'pyarrow'") from exc
+
+
+def export_to(sink: IO[bytes], fmt: str = "csv", level: str = "runs", chunk_rows: int = CHUNK_ROWS, **filters) -> None:
+    """
+    Schreibt den Export blockweise in ein binäres Datei-Objekt.
+
+    Args:
+        sink: Ziel (z.B. offene Datei oder SpooledTemporaryFile)
+        fmt: "csv", "jsonl" oder "parquet"
+        level: "runs" oder "answers"
+        filters: quiz, user, since, until
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unbekanntes Export-Format: {fmt}")
+    rows = iter_rows(level, **filters)
+    columns = columns_for(level)
+    if fmt == "parquet":
+        write_parquet(rows, columns, sink, chunk_rows)
+        return
+    chunks = iter_csv_chunks(rows, columns, chunk_rows) if fmt == "csv" else iter_jsonl_chunks(rows, chunk_rows)
+    for chunk in chunks:
+        sink.write(chunk)
+
+
+def write_csv(sink: IO[bytes], rows: Iterable[Dict], columns: List[str]) -> None:
+    """Schreibt beliebige Zeilen blockweise als CSV (z.B. die Bestenliste)"""
+    for chunk in iter_csv_chunks(iter(rows), columns):
+        sink.write(chunk)
+
+
+def export_filename(fmt: str, level: str) -> str:
+    return f"quiz_{level}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+
+# ---------------------- BEREITSTELLEN ----------------------
+@dataclass(frozen=True)
+class PublishedExport:
+    filename: str
+    url: str
+    size: int
+    created: float
+
+    @property
+    def servable(self) -> bool:
+        return self.size <= MAX_SERVED_BYTES
+
+
+def publish(write: Callable[[IO[bytes]], None], filename: str) -> PublishedExport:
+    """
+    Schreibt einen Export über write(sink) nach static/exports/<token>/filename.
+
+    Die Datei entsteht unter einem temporären Namen und wird erst fertig
+    umbenannt; abgelaufene Exporte werden dabei aufgeräumt.
+    """
+    purge_exports()
+    token = secrets.token_urlsafe(16)
+    directory = os.path.join(EXPORT_DIR, token)
+    os.makedirs(directory)
+    path = os.path.join(directory, filename)
+    temp_path = os.path.join(directory, f".tmp_{filename}")
+    try:
+        with open(temp_path, "wb") as sink:
+            write(sink)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+    return PublishedExport(filename, f"{EXPORT_URL}/{token}/{filename}", os.path.getsize(path), time.time())
+
+
+def publish_export(fmt: str = "csv", level: str = "runs", **filters) -> PublishedExport:
+    """Historie als Datei bereitstellen (siehe export_to)"""
+    return publish(lambda sink: export_to(sink, fmt=fmt, level=level, **filters), export_filename(fmt, level))
+
+
+def purge_exports(max_age: float = EXPORT_TTL) -> int:
+    """Löscht Exporte, die älter als max_age Sekunden sind"""
+    if not os.path.isdir(EXPORT_DIR):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for token in os.listdir(EXPORT_DIR):
+        directory = os.path.join(EXPORT_DIR, token)
+        try:
+            if os.path.isdir(directory) and os.path.getmtime(directory) < cutoff:
+                shutil.rmtree(directory)
+                removed += 1
+        except OSError as e:
+            LOG.warning("Export %s konnte nicht gelöscht werden: %s", token, e)
+    return removed
@@ -0,0 +1,184 @@
+"""
+Speicherbedarf der verbundenen Sessions
+
+Geht über den st.session_state aller aktiven Sessions des Streamlit-Servers
+und schätzt pro Key die Tiefengröße (sys.getsizeof rekursiv über Dicts,
+Listen, Arrays, __dict__ und __slots__). Innerhalb einer Session wird jedes
+Objekt nur einmal gezählt. Objekte, die der Prozess ohnehin für alle hält
+(kompilierte Quizze, Live-Räume, Module, Klassen, Enums, Funktionen), zählen
+nicht zur Session; sie sind die Grenze, an der die Schätzung stoppt.
+
+Die Schätzung liest fremde Sessions ohne deren Lock: ändert sich ein Zustand
+währenddessen, wird die Session übersprungen und beim nächsten Mal gezählt.
+Dazu kommt der RSS des Prozesses (Linux: /proc/self/status).
+
+Created by l1rox3 • 2025
+"""
+
+import enum
+import logging
+import sys
+import threading
+import types
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+LOG = logging.getLogger("quiz.memory")
+
+MAX_OBJECTS = 200_000        # pro Key, damit ein einzelner Riese die Seite nicht blockiert
+LARGE_KEY_BYTES = 100 * 1024  # Keys ab dieser Größe pro Session werden markiert
+LARGE_KEY_SHARE = 0.25        # ... oder ab diesem Anteil an ihrer Session
+
+_ATOMIC = (str, bytes, bytearray, int, float, complex, bool, type(None), array, memoryview, range)
+_SKIP = (types.ModuleType, type, enum.Enum, types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+         types.CodeType, types.FrameType, type(threading.Lock()), type(threading.RLock()))
+
+
+def _slot_values(obj) -> Iterable:
+    for cls in type(obj).__mro__:
+        for name in getattr(cls, "__slots__", ()):
+            if name in ("__dict__", "__weakref__"):
+                continue
+            try:
+                yield getattr(obj, name)
+            except AttributeError:
+                pass
+
+
+def deep_size(obj, seen: Set[int], shared: Set[int] = frozenset(), limit: int = MAX_OBJECTS) -> int:
+    """Geschätzte Größe von obj inkl. aller erreichbaren Objekte, die noch nicht in seen sind"""
+    total = 0
+    stack = [obj]
+    while stack and limit > 0:
+        obj = stack.pop()
+        oid = id(obj)
+        if oid in seen or oid in shared or isinstance(obj, _SKIP):
+            continue
+        seen.add(oid)
+        limit -= 1
+        total += sys.getsizeof(obj, 0)
+        if isinstance(obj, _ATOMIC):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            stack.extend(obj)
+        else:
+            if hasattr(obj, "__dict__"):
+                stack.append(obj.__dict__)
+            stack.extend(_slot_values(obj))
+    return total
+
+
+def shared_objects() -> Set[int]:
+    """ids der Objekte, die der Prozess für alle Sessions hält"""
+    from core.catalog import get_catalog
+    from core.rooms import get_room_hub
+
+    catalog = get_catalog()
+    shared = {id(catalog.get(quiz_id, version)) for quiz_id, version, _ in catalog.loaded_versions()}
+    shared.update(id(room) for room in get_room_hub().rooms())
+    return shared
+
+
+def process_rss() -> Tuple[Optional[int], str]:
+    """(Bytes, Quelle) - aktueller RSS, sonst der Spitzenwert aus getrusage"""
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024, "VmRSS"
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None, "nicht verfügbar"
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux meldet KiB, macOS Bytes
+    return (peak if sys.platform == "darwin" else peak * 1024), "Spitzenwert (ru_maxrss)"
+
+
+@dataclass
+class SessionMemory:
+    session_id: str
+    user: str
+    keys: Dict[str, int]
+
+    @property
+    def total(self) -> int:
+        return sum(self.keys.values())
+
+
+@dataclass
+class MemoryReport:
+    sessions: List[SessionMemory]
+    rss: Optional[int]
+    rss_source: str
+    skipped: int = 0
+    by_key: Dict[str, List[int]] = field(default_factory=dict)   # Key -> Größen je Session
+
+    @property
+    def total(self) -> int:
+        return sum(session.total for session in self.sessions)
+
+    def largest_keys(self, limit: int = 10) -> List[Tuple[str, int, int, int]]:
+        """(Key, Summe, Maximum, Sessions) absteigend nach Summe"""
+        rows = [(key, sum(sizes), max(sizes), len(sizes)) for key, sizes in self.by_key.items()]
+        return sorted(rows, key=lambda row: -row[1])[:limit]
+
+    def flagged(self) -> List[Tuple[str, str, int]]:
+        """(Session, Key, Bytes) für Keys, die ihre Session dominieren"""
+        flagged = []
+        for session in self.sessions:
+            for key, size in session.keys.items():
+                if size >= LARGE_KEY_BYTES or (session.total and size / session.total >= LARGE_KEY_SHARE
+                                               and size >= LARGE_KEY_BYTES / 10):
+                    flagged.append((session.session_id, key, size))
+        return sorted(flagged, key=lambda row: -row[2])
+
+
+def measure_state(state: Dict, shared: Set[int] = frozenset()) -> Dict[str, int]:
+    """Größe pro Key eines Session-State (Objekte, die zwei Keys teilen, zählen beim ersten)"""
+    seen: Set[int] = set()
+    return {str(key): deep_size(value, seen, shared) for key, value in state.items()}
+
+
+def _active_states() -> Iterable[Tuple[str, Dict]]:
+    """(Session-ID, Zustand) aller aktiven Sessions des laufenden Servers"""
+    from streamlit import runtime
+
+    if not runtime.exists():
+        return []
+    # Kein öffentliches API: SessionManager des Runtime-Singletons (fehlt z.B. im AppTest)
+    manager = getattr(runtime.get_instance(), "_session_mgr", None)
+    if not hasattr(manager, "list_active_sessions"):
+        LOG.warning("SessionManager nicht gefunden - Sessions können nicht gemessen werden")
+        return []
+    return [(info.session.id, info.session.session_state) for info in manager.list_active_sessions()]
+
+
+def collect() -> MemoryReport:
+    """Misst alle aktiven Sessions (kostet einige ms pro Session - nur auf Abruf)"""
+    shared = shared_objects()
+    sessions, skipped = [], 0
+    by_key: Dict[str, List[int]] = {}
+    for session_id, state in _active_states():
+        try:
+            values = state.filtered_state
+            keys = measure_state(values, shared)
+            user = str(values.get("username") or "-")
+        except (RuntimeError, KeyError) as e:
+            # Zustand hat sich während der Messung geändert
+            LOG.debug("Session %s übersprungen: %s", session_id, e)
+            skipped += 1
+            continue
+        sessions.append(SessionMemory(session_id=session_id, user=user, keys=keys))
+        for key, size in keys.items():
+            by_key.setdefault(key, []).append(size)
+    rss, source = process_rss()
+    sessions.sort(key=lambda s: -s.total)
+    return MemoryReport(sessions=sessions, rss=rss, rss_source=source, skipped=skipped, by_key=by_key)
@@ -0,0 +1,315 @@
+"""
+PDF -> Fragen-Entwürfe
+
+Extrahiert den Text von PDF-Quellen (z.B. ./data/data.pdf) Seite für Seite in
+einem Hintergrund-Thread und erzeugt daraus einen Entwurf im Format von
+./data/quizzes, den Admins prüfen und übernehmen können. Läuft komplett offline.
+
+Cache (./data/cache/pdf):
+    index.json      Pfad -> mtime, Größe, SHA-256, Entwurf. Unveränderte
+                    Dateien (mtime/Größe gleich) werden nicht einmal gehasht.
+    <sha256>.json   extrahierter Text pro Seite, mit Schlüssel pro Seite
+                    (SHA-256 des Content-Streams). Ändert sich eine PDF, werden
+                    nur Seiten mit neuem Inhalt neu extrahiert.
+
+Benötigt das optionale Paket pypdf.
+
+Created by l1rox3 • 2025
+"""
+
+import hashlib
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from core.catalog import QUIZZES_DIR, get_catalog, validate_quiz
+
+LOG = logging.getLogger("quiz.pdf")
+
+SOURCE_DIR = "./data"
+CACHE_DIR = "./data/cache/pdf"
+DRAFTS_DIR = "./data/quizzes/drafts"
+MAX_QUESTIONS = 30
+OPTIONS = 4
+
+
+# ---------------------- HILFSFUNKTIONEN ----------------------
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_json(path: str, data, indent: Optional[int] = None) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_file = f"{path}.tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+    os.replace(temp_file, path)
+
+
+def _read_json(path: str):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _page_key(page) -> str:
+    """Schlüssel einer Seite: Hash des Content-Streams"""
+    contents = page.get_contents()
+    raw = contents.get_data() if contents is not None else b""
+    return hashlib.sha256(raw).hexdigest()
+
+
+# ---------------------- ENTWÜRFE ----------------------
+_TERM = re.compile(r"^\s*([A-ZÄÖÜ][\wÄÖÜäöüß .-]{1,40}):\s*(.*)$")
+_BULLET = re.compile(r"^\s*[-–•]\s*(.+)$")
+
+
+def _facts(pages: List[str]) -> List[Tuple[str, str]]:
+    """(Begriff, Aussage)-Paare aus Stichpunkt-Layouts wie 'Sari:' gefolgt von '- ...'"""
+    facts = []
+    for text in pages:
+        term = None
+        for line in text.splitlines():
+            match = _TERM.match(line)
+            if match:
+                term = match.group(1).strip()
+                rest = match.group(2).strip()
+                if rest and not rest.endswith(":"):
+                    facts.append((term, rest.lstrip("-– ").strip()))
+                continue
+            bullet = _BULLET.match(line)
+            if bullet and term:
+                # Mehrspaltige Zeilen ("- a - b") nur bis zum nächsten Stichpunkt
+                fact = re.split(r"\s+[-–]\s+", bullet.group(1))[0].strip()
+                if len(fact) >= 8:
+                    facts.append((term, fact))
+    return facts
+
+
+def draft_questions(pages: List[str], max_questions: int = MAX_QUESTIONS, seed: str = "") -> List[Dict]:
+    """
+    Einfache Fragen aus Begriff/Aussage-Paaren: "Was trifft auf <Begriff> zu?"
+    mit einer Aussage des Begriffs als Antwort und Aussagen anderer Begriffe
+    als falsche Optionen. Die Entwürfe sind als Vorlage zum Überarbeiten gedacht.
+    """
+    facts = _facts(pages)
+    rng = random.Random(seed)
+    by_term: Dict[str, List[str]] = {}
+    for term, fact in facts:
+        by_term.setdefault(term, []).append(fact)
+
+    questions = []
+    for term, fact in facts:
+        others = sorted({f for t, fs in by_term.items() if t != term for f in fs})
+        if len(others) < OPTIONS - 1:
+            continue
+        options = rng.sample(others, OPTIONS - 1) + [fact]
+        rng.shuffle(options)
+        questions.append({
+            "question": f"Was trifft auf {term} zu?",
+            "options": options,
+            "answer": fact,
+            "topic": term,
+        })
+    rng.shuffle(questions)
+    return questions[:max_questions]
+
+
+# ---------------------- PIPELINE ----------------------
+@dataclass
+class PdfJob:
+    path: str
+    state: str = "wartet"           # wartet, läuft, fertig, unverändert, fehler
+    pages_total: int = 0
+    pages_done: int = 0
+    pages_cached: int = 0
+    questions: int = 0
+    draft_path: Optional[str] = None
+    error: Optional[str] = None
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+
+class PdfPipeline:
+    def __init__(self, source_dir: str = SOURCE_DIR, cache_dir: str = CACHE_DIR, drafts_dir: str = DRAFTS_DIR):
+        self.source_dir = source_dir
+        self.cache_dir = cache_dir
+        self.drafts_dir = drafts_dir
+        self._index_path = os.path.join(cache_dir, "index.json")
+        self._index: Dict[str, Dict] = _read_json(self._index_path) or {}
+        self._page_texts: Optional[Dict[str, str]] = None
+        self._jobs: Dict[str, PdfJob] = {}
+        self._queue: "queue.Queue[PdfJob]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    # ---------- API ----------
+    def sources(self) -> List[str]:
+        try:
+            with os.scandir(self.source_dir) as entries:
+                return sorted(e.path for e in entries if e.name.lower().endswith(".pdf") and e.is_file())
+        except FileNotFoundError:
+            return []
+
+    def is_current(self, path: str) -> bool:
+        """True, wenn für genau diesen Dateistand schon ein Entwurf existiert"""
+        entry = self._index.get(path)
+        if not entry or not entry.get("draft") or not os.path.exists(entry["draft"]):
+            return False
+        stat = os.stat(path)
+        if entry.get("mtime") == stat.st_mtime and entry.get("size") == stat.st_size:
+            return True
+        return entry.get("sha256") == file_digest(path)
+
+    def submit(self, path: str, force: bool = False) -> PdfJob:
+        """Reiht eine PDF ein (unveränderte Dateien werden übersprungen)"""
+        with self._lock:
+            job = self._jobs.get(path)
+            if job is not None and job.state in ("wartet", "läuft"):
+                return job
+            job = PdfJob(path)
+            self._jobs[path] = job
+            if not force and self.is_current(path):
+                job.state = "unverändert"
+                job.draft_path = self._index[path]["draft"]
+                return job
+            self._queue.put(job)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="pdf-pipeline", daemon=True)
+                self._thread.start()
+            return job
+
+    def submit_all(self, force: bool = False) -> List[PdfJob]:
+        return [self.submit(path, force) for path in self.sources()]
+
+    def jobs(self) -> List[PdfJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def drafts(self) -> List[str]:
+        try:
+            with os.scandir(self.drafts_dir) as entries:
+                return sorted(e.path for e in entries if e.name.endswith(".json"))
+        except FileNotFoundError:
+            return []
+
+    def publish(self, draft_path: str, quiz_id: str) -> str:
+        """Übernimmt einen (geprüften) Entwurf als spielbares Quiz"""
+        if not re.fullmatch(r"[\w-]+", quiz_id):
+            raise ValueError("Quiz-ID darf nur Buchstaben, Ziffern, _ und - enthalten")
+        data = _read_json(draft_path)
+        errors = validate_quiz(data) if data is not None else ["Entwurf nicht lesbar"]
+        if errors:
+            raise ValueError("; ".join(errors))
+        target = os.path.join(QUIZZES_DIR, f"{quiz_id}.json")
+        if os.path.exists(target):
+            raise ValueError(f"Quiz '{quiz_id}' existiert bereits")
+        _write_json(target, data, indent=4)
+        get_catalog().invalidate()
+        return target
+
+    # ---------- Worker ----------
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            job.state = "läuft"
+            job.started = time.time()
+            try:
+                self._process(job)
+                job.state = "fertig"
+            except Exception as e:
+                LOG.error("PDF %s konnte nicht verarbeitet werden: %s", job.path, e)
+                job.state = "fehler"
+                job.error = str(e)
+            job.finished = time.time()
+
+    def _load_page_cache(self) -> Dict[str, str]:
+        if self._page_texts is None:
+            self._page_texts = {}
+            for entry in self._index.values():
+                doc = _read_json(os.path.join(self.cache_dir, f"{entry.get('sha256')}.json")) or {}
+                for page in doc.get("pages", []):
+                    self._page_texts[page["key"]] = page["text"]
+        return self._page_texts
+
+    def _process(self, job: PdfJob) -> None:
+        try:
+            from pypdf import PdfReader
+        except ImportError as exc:
+            raise RuntimeError("PDF-Extraktion benötigt das Paket 'pypdf'") from exc
+
+        stat = os.stat(job.path)
+        sha256 = file_digest(job.path)
+        doc_cache = os.path.join(self.cache_dir, f"{sha256}.json")
+        cached = _read_json(doc_cache)
+
+        if cached is not None:
+            texts = [page["text"] for page in cached["pages"]]
+            job.pages_total = job.pages_done = job.pages_cached = len(texts)
+        else:
+            page_texts = self._load_page_cache()
+            reader = PdfReader(job.path)
+            job.pages_total = len(reader.pages)
+            pages = []
+            for page in reader.pages:
+                key = _page_key(page)
+                text = page_texts.get(key)
+                if text is None:
+                    text = page.extract_text() or ""
+                    page_texts[key] = text
+                else:
+                    job.pages_cached += 1
+                pages.append({"key": key, "text": text})
+                job.pages_done += 1
+            _write_json(doc_cache, {"source": job.path, "pages": pages})
+            texts = [page["text"] for page in pages]
+
+        stem = os.path.splitext(os.path.basename(job.path))[0]
+        title = next((line.strip() for text in texts for line in text.splitlines() if line.strip()), stem)
+        questions = draft_questions(texts, seed=sha256)
+        draft = {
+            "title": f"{title} (Entwurf)",
+            "description": f"Automatisch aus {os.path.basename(job.path)} erzeugt - bitte prüfen.",
+            "source": {"file": os.path.basename(job.path), "sha256": sha256},
+            "questions": questions,
+        }
+        job.draft_path = os.path.join(self.drafts_dir, f"{stem}.json")
+        job.questions = len(questions)
+        _write_json(job.draft_path, draft, indent=4)
+
+        previous = self._index.get(job.path, {}).get("sha256")
+        self._index[job.path] = {"mtime": stat.st_mtime, "size": stat.st_size, "sha256": sha256,
+                                 "draft": job.draft_path}
+        _write_json(self._index_path, self._index, indent=2)
+        if previous and previous != sha256:
+            # Seiten bleiben im Speicher-Cache, die alte Datei wird nicht mehr gebraucht
+            try:
+                os.remove(os.path.join(self.cache_dir, f"{previous}.json"))
+            except OSError:
+                pass
+
+
+_pipeline: Optional[PdfPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_pdf_pipeline() -> PdfPipeline:
+    """Gibt die prozessweite Pipeline zurück"""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = PdfPipeline()
+        return _pipeline
@@ -0,0 +1,202 @@
+"""
+Profiler für Reruns: wie lange dauert welcher Abschnitt eines Skriptlaufs
+
+Jede Seite startet am Anfang ihres Skripts ein Profil (start) und schließt es
+am Ende ab (with finishing(): main()). Dazwischen messen section("name") bzw.
+@profiled("name") die einzelnen Abschnitte: Session-Prüfung, Theme, Settings, Bestenliste,
+save_result ... Eigenes HTML (components.markup.render_html) landet zusätzlich
+im Abschnitt "markdown". Abschnitte sind inklusiv gemessen: ein render_html
+innerhalb von apply_theme zählt in beiden.
+
+Abgeschlossene Profile landen in einem Ringpuffer pro Seite (die letzten
+RING_SIZE Läufe). Ohne laufendes Profil (z.B. im Hintergrund-Thread) kosten
+section() und @profiled nur eine Attribut-Abfrage. Der Profiler lässt sich zur
+Laufzeit ein- und ausschalten (Admin-Panel, Tab Diagnose).
+
+Fragment-Reruns (st.fragment) laufen ohne das Seitenskript; sie starten ihr
+eigenes Profil mit der Seite "<seite>:fragment" (@profiled_fragment). Läuft
+das Fragment als Teil eines vollen Laufs, ist es dort der Abschnitt "fragment".
+
+Created by l1rox3 • 2025
+"""
+
+import functools
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple
+
+RING_SIZE = 200
+SLOW_RERUNS = 10
+
+_local = threading.local()      # Skriptläufe laufen im Thread des ScriptRunners ihrer Session
+
+
+@dataclass
+class RerunProfile:
+    page: str
+    user: str
+    started: float                                   # Uhrzeit, nur zur Anzeige
+    t0: float                                        # perf_counter
+    total_ms: float = 0.0
+    aborted: bool = False                            # durch st.rerun/st.switch_page/st.stop beendet
+    sections: Dict[str, List[float]] = field(default_factory=dict)   # name -> [ms, Aufrufe]
+
+    def add(self, name: str, ms: float) -> None:
+        entry = self.sections.get(name)
+        if entry is None:
+            self.sections[name] = [ms, 1]
+        else:
+            entry[0] += ms
+            entry[1] += 1
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.t0) * 1000
+
+
+class Profiler:
+    def __init__(self, ring_size: int = RING_SIZE):
+        self.enabled = True
+        self.ring_size = ring_size
+        self._rings: Dict[str, Deque[RerunProfile]] = {}
+        self._lock = threading.Lock()
+
+    # ---------- Aufzeichnung ----------
+    def start(self, page: str, user: Optional[str] = None) -> Optional[RerunProfile]:
+        if not self.enabled:
+            _local.current = None
+            return None
+        profile = RerunProfile(page=page, user=user or "-", started=time.time(), t0=time.perf_counter())
+        _local.current = profile
+        return profile
+
+    def finish(self, aborted: bool = False) -> Optional[RerunProfile]:
+        profile = getattr(_local, "current", None)
+        if profile is None:
+            return None
+        _local.current = None
+        profile.total_ms = profile.elapsed_ms
+        profile.aborted = aborted
+        with self._lock:
+            ring = self._rings.get(profile.page)
+            if ring is None:
+                ring = self._rings[profile.page] = deque(maxlen=self.ring_size)
+            ring.append(profile)
+        return profile
+
+    @contextmanager
+    def finishing(self):
+        """Schließt das Profil ab, wenn der Block endet - auch bei st.rerun/st.stop"""
+        completed = False
+        try:
+            yield
+            completed = True
+        finally:
+            # RerunException/StopException sind BaseException: Lauf abgebrochen
+            self.finish(aborted=not completed)
+
+    @contextmanager
+    def fragment(self, page: str, user: Optional[str] = None):
+        """Fragment: allein eigenes Profil "<seite>:fragment", im vollen Lauf ein Abschnitt"""
+        if getattr(_local, "current", None) is not None:
+            with section("fragment"):
+                yield
+            return
+        self.start(f"{page}:fragment", user)
+        with self.finishing():
+            yield
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rings.clear()
+
+    # ---------- Auswertung ----------
+    def pages(self) -> List[str]:
+        with self._lock:
+            return sorted(self._rings)
+
+    def profiles(self, page: Optional[str] = None) -> List[RerunProfile]:
+        with self._lock:
+            if page is not None:
+                return list(self._rings.get(page, ()))
+            return [p for ring in self._rings.values() for p in ring]
+
+    def breakdown(self, page: str) -> List[Tuple[str, int, float, float, float]]:
+        """(Abschnitt, Läufe mit Abschnitt, Ø ms, p95 ms, Anteil an der Gesamtzeit in %)"""
+        profiles = self.profiles(page)
+        total = sum(p.total_ms for p in profiles)
+        per_section: Dict[str, List[float]] = {}
+        for profile in profiles:
+            for name, (ms, _) in profile.sections.items():
+                per_section.setdefault(name, []).append(ms)
+        rows = []
+        for name, samples in per_section.items():
+            samples.sort()
+            p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+            share = sum(samples) / total * 100 if total else 0.0
+            rows.append((name, len(samples), statistics.fmean(samples), p95, share))
+        return sorted(rows, key=lambda row: -row[4])
+
+    def slowest(self, page: Optional[str] = None, limit: int = SLOW_RERUNS) -> List[RerunProfile]:
+        return sorted(self.profiles(page), key=lambda p: -p.total_ms)[:limit]
+
+
+def current() -> Optional[RerunProfile]:
+    """Profil des laufenden Skriptlaufs (None außerhalb eines Laufs)"""
+    return getattr(_local, "current", None)
+
+
+@contextmanager
+def section(name: str):
+    profile = getattr(_local, "current", None)
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(name, (time.perf_counter() - started) * 1000)
+
+
+def profiled(name: str):
+    """Decorator: misst jeden Aufruf der Funktion als Abschnitt name"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if getattr(_local, "current", None) is None:
+                return func(*args, **kwargs)
+            with section(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def profiled_fragment(page: str):
+    """Decorator für st.fragment-Funktionen (unter @st.fragment anbringen)"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            import streamlit as st
+
+            with get_profiler().fragment(page, st.session_state.get("username")):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+_profiler: Optional[Profiler] = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler() -> Profiler:
+    """Gibt den prozessweiten Profiler zurück"""
+    global _profiler
+    with _profiler_lock:
+        if _profiler is None:
+            _profiler = Profiler()
+        return _profiler
@@ -0,0 +1,87 @@
+"""
+Zustand eines Quiz-Durchlaufs in der Session
+
+Pro Session liegt nur ein kleines Objekt mit festen Feldern (__slots__):
+Quiz-ID und Version, Seed, Zahlen und Zeitstempel. Die Antworten stehen in
+drei Arrays (Frage-ID, gewählte Option, Sekunden) statt in einer Liste von
+Dicts mit Texten; welche Fragen in welcher Options-Reihenfolge kamen, folgt
+aus dem Seed (siehe core.compiled). Texte werden erst beim Anzeigen bzw.
+Speichern über das kompilierte Quiz aufgelöst.
+
+Das kompilierte Quiz selbst wird von allen Sessions geteilt; der Durchlauf
+hält nur eine Referenz auf seine Fassung (siehe core.catalog).
+
+Created by l1rox3 • 2025
+"""
+
+import uuid
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+from core import timing
+from core.compiled import CompiledQuiz, new_seed
+
+
+class QuizRun:
+    __slots__ = (
+        "run_id", "quiz_id", "quiz", "version", "mode", "seed", "score", "theta",
+        "qids", "choices", "times", "review_qids", "current_qid",
+        "start_time", "started", "end_time", "render_started", "question_shown",
+        "saved", "better_than",
+    )
+
+    def __init__(self, quiz_id: str, quiz: Optional[CompiledQuiz] = None, mode: str = "server",
+                 start_time: Optional[float] = None):
+        started = quiz is not None
+        self.run_id = uuid.uuid4().hex if started else None
+        self.quiz_id = quiz_id
+        self.quiz = quiz
+        self.version = quiz.version if quiz else None
+        self.mode = mode
+        self.seed = new_seed() if started else None
+        self.score = 0
+        self.theta = 0.0
+        self.qids = array("H")            # beantwortete Fragen, in Reihenfolge
+        self.choices = array("b")         # gewählte Option (Index im Quiz)
+        self.times = array("f")           # Denkzeit in Sekunden
+        self.review_qids = array("H")
+        self.current_qid: Optional[int] = None
+        self.start_time = start_time      # Uhrzeit, nur zur Anzeige
+        self.started = timing.now() if started else None    # monoton, für alle Messungen
+        self.end_time: Optional[float] = None
+        self.render_started = self.started
+        self.question_shown: Optional[float] = None
+        self.saved = False
+        self.better_than: Optional[float] = None
+
+    @property
+    def position(self) -> int:
+        """Index der aktuellen Frage = Zahl der Antworten"""
+        return len(self.qids)
+
+    def answered(self) -> set:
+        return set(self.qids)
+
+    def record(self, qid: int, choice: int, seconds: float) -> bool:
+        """Verbucht eine Antwort, gibt zurück ob sie richtig war"""
+        correct = self.quiz.grade(qid, choice)
+        self.qids.append(qid)
+        self.choices.append(choice)
+        self.times.append(seconds)
+        if correct:
+            self.score += 1
+        return correct
+
+    def load_answers(self, answers: Iterable[Dict]) -> None:
+        """Übernimmt bereits bewertete Antworten (Client-Modus)"""
+        for answer in answers:
+            self.record(answer["q"], answer["s"], answer["t"])
+
+    def answers(self) -> List[Dict]:
+        """Antworten im gespeicherten Format (für save_result und Auswertungen)"""
+        return [self.quiz.answer_record(qid, choice, seconds)
+                for qid, choice, seconds in zip(self.qids, self.choices, self.times)]
+
+    @property
+    def think_time(self) -> float:
+        return round(sum(round(t, 2) for t in self.times), 2)
@@ -0,0 +1,113 @@
+"""
+Perzentil-Rang pro Quiz
+
+Hält pro Quiz ein sortiertes Array aller Durchläufe (Schlüssel: höheres
+Ergebnis zuerst, bei Gleichstand schnellere Zeit zuerst). Neue Ergebnisse
+werden mit bisect.insort eingefügt, die Abfrage "besser als X%" ist ein
+einziges bisect - kein erneutes Lesen der Ergebnis-Dateien.
+
+Archivierte Durchläufe kommen als Histogramm (siehe
+Archive.rank_histogram): ein sortiertes Array der Buckets mit kumulierten
+Anzahlen, abgefragt ebenfalls per bisect.
+
+Created by l1rox3 • 2025
+"""
+
+import bisect
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.results import get_results_store, is_ranked, quiz_id_of
+from core.retention import get_archive
+
+RankKey = Tuple[float, float]
+
+
+def rank_key(percentage: float, time_taken: float) -> RankKey:
+    """Kleiner = besser"""
+    return (-float(percentage), float(time_taken))
+
+
+class QuizRanking:
+    def __init__(self):
+        self._keys: Dict[str, List[RankKey]] = {}
+        # quiz -> (Bucket-Schlüssel sortiert, kumulierte Anzahlen mit führender 0)
+        self._buckets: Dict[str, Tuple[List[RankKey], List[int]]] = {}
+        self._lock = threading.Lock()
+
+    def build(self, results: Iterable[Dict],
+              extra: Optional[Dict[str, Iterable[Tuple[float, float, int]]]] = None) -> None:
+        """
+        Baut alle Arrays einmal auf.
+
+        Args:
+            results: Ergebnisse im Format von save_result
+            extra: zusätzliche (percentage, time_taken, Anzahl)-Buckets pro Quiz (z.B. aus dem Archiv)
+        """
+        keys: Dict[str, List[RankKey]] = {}
+        for result in results:
+            if not is_ranked(result):
+                continue
+            keys.setdefault(quiz_id_of(result), []).append(
+                rank_key(result.get("percentage", 0), result.get("time_taken", 0))
+            )
+        for values in keys.values():
+            values.sort()
+        buckets: Dict[str, Tuple[List[RankKey], List[int]]] = {}
+        for quiz_id, entries in (extra or {}).items():
+            merged: Dict[RankKey, int] = {}
+            for percentage, time_taken, count in entries:
+                key = rank_key(percentage, time_taken)
+                merged[key] = merged.get(key, 0) + count
+            sorted_keys = sorted(merged)
+            cumulative = [0]
+            for key in sorted_keys:
+                cumulative.append(cumulative[-1] + merged[key])
+            buckets[quiz_id] = (sorted_keys, cumulative)
+        with self._lock:
+            self._keys = keys
+            self._buckets = buckets
+
+    def insert(self, result: Dict) -> None:
+        if not is_ranked(result):
+            return
+        key = rank_key(result.get("percentage", 0), result.get("time_taken", 0))
+        with self._lock:
+            bisect.insort(self._keys.setdefault(quiz_id_of(result), []), key)
+
+    def better_than(self, quiz_id: str, percentage: float, time_taken: float) -> Optional[float]:
+        """
+        Anteil (0-100) der anderen Durchläufe, die schlechter waren.
+
+        Der eigene Durchlauf zählt nicht mit; None, wenn es keine anderen gibt.
+        """
+        key = rank_key(percentage, time_taken)
+        with self._lock:
+            keys = self._keys.get(quiz_id, [])
+            lo = bisect.bisect_left(keys, key)
+            hi = bisect.bisect_right(keys, key)
+            archived, cumulative = self._buckets.get(quiz_id, ([], [0]))
+            archived_hi = bisect.bisect_right(archived, key)
+        worse = len(keys) - hi + cumulative[-1] - cumulative[archived_hi]
+        others = len(keys) + cumulative[-1] - (1 if hi > lo else 0)
+        if others <= 0:
+            return None
+        return worse / others * 100
+
+    def count(self, quiz_id: str) -> int:
+        with self._lock:
+            return len(self._keys.get(quiz_id, [])) + self._buckets.get(quiz_id, ([], [0]))[1][-1]
+
+
+_ranking: Optional[QuizRanking] = None
+_ranking_lock = threading.Lock()
+
+
+def get_ranking() -> QuizRanking:
+    """Gibt die prozessweite Rangliste zurück (wird beim ersten Zugriff aufgebaut)"""
+    global _ranking
+    with _ranking_lock:
+        if _ranking is None:
+            _ranking = QuizRanking()
+            _ranking.build(get_results_store().all(), get_archive().rank_histogram())
+        return _ranking
@@ -0,0 +1,341 @@
+"""
+Ergebnis-Speicher für ./data/answers
+
+Hält eine prozessweite In-Memory-Sicht auf alle gespeicherten Quiz-Ergebnisse.
+Beim Kaltstart (Server-Neustart oder leerer Cache) wird das Verzeichnis genau
+einmal gelistet und alle Dateien parallel mit einem begrenzten Thread-Pool
+gelesen und geparst. Danach werden nur noch neue/gelöschte Dateien nachgeladen.
+
+Created by l1rox3 • 2025
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+LOG = logging.getLogger("quiz.results")
+
+ANSWERS_DIR = "./data/answers"
+DEFAULT_QUIZ_ID = "hinduismus"
+MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+ProgressCallback = Callable[[int, int], None]
+
+# ---------------------- DATEI-FUNKTIONEN ----------------------
+def list_result_files(data_dir: str = ANSWERS_DIR) -> List[str]:
+    """Listet alle Ergebnis-Dateien (ein einziger scandir-Aufruf)"""
+    try:
+        with os.scandir(data_dir) as entries:
+            return [e.name for e in entries if e.name.endswith(".json") and e.is_file()]
+    except FileNotFoundError:
+        return []
+
+
+def _read_bytes(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _parse_result(raw: Optional[bytes]) -> Optional[Dict]:
+    if raw is None:
+        return None
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def read_result_file(path: str) -> Optional[Dict]:
+    """Liest und parst eine einzelne Ergebnis-Datei"""
+    return _parse_result(_read_bytes(path))
+
+
+def load_results_serial(data_dir: str = ANSWERS_DIR) -> Dict[str, Dict]:
+    """Referenz-Implementierung: liest alle Dateien nacheinander"""
+    results = {}
+    for name in list_result_files(data_dir):
+        result = read_result_file(os.path.join(data_dir, name))
+        if result is not None:
+            results[name] = result
+    return results
+
+
+def load_results_parallel(
+    data_dir: str = ANSWERS_DIR,
+    names: Optional[Iterable[str]] = None,
+    max_workers: int = MAX_WORKERS,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Dict]:
+    """
+    Liest Ergebnis-Dateien parallel mit einem begrenzten Thread-Pool.
+
+    Die Threads übernehmen nur das Lesen (gibt den GIL frei), geparst wird im
+    aufrufenden Thread, während die nächsten Dateien schon gelesen werden.
+
+    Args:
+        data_dir: Verzeichnis mit den Ergebnis-Dateien
+        names: Dateinamen (None = Verzeichnis einmal listen)
+        max_workers: Obergrenze für parallele Leser
+        progress: Callback (fertig, gesamt), wird aus dem aufrufenden Thread aufgerufen
+
+    Returns:
+        {dateiname: ergebnis} - defekte Dateien werden übersprungen
+    """
+    if names is None:
+        names = list_result_files(data_dir)
+    names = list(names)
+    total = len(names)
+    results: Dict[str, Dict] = {}
+    if not total:
+        if progress:
+            progress(0, 0)
+        return results
+
+    # Kleine Batches pro Task, begrenztes Fenster an laufenden Tasks:
+    # so liegen nie alle Rohdaten gleichzeitig im Speicher
+    batch_size = max(1, min(64, total // (max_workers * 8) or 1))
+    window = max_workers * 4
+    batches = [names[i:i + batch_size] for i in range(0, total, batch_size)]
+    step = max(1, total // 100)
+    done = 0
+
+    def read_batch(batch: List[str]) -> List[Optional[bytes]]:
+        return [_read_bytes(os.path.join(data_dir, name)) for name in batch]
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="results-loader") as pool:
+        pending = deque()
+        batch_iter = iter(batches)
+        for batch in islice(batch_iter, window):
+            pending.append((batch, pool.submit(read_batch, batch)))
+        while pending:
+            batch, future = pending.popleft()
+            next_batch = next(batch_iter, None)
+            if next_batch is not None:
+                pending.append((next_batch, pool.submit(read_batch, next_batch)))
+            for name, raw in zip(batch, future.result()):
+                result = _parse_result(raw)
+                if result is not None:
+                    results[name] = result
+                done += 1
+                if progress and (done % step == 0 or done == total):
+                    progress(done, total)
+
+    skipped = total - len(results)
+    if skipped:
+        LOG.warning("%d Ergebnis-Dateien konnten nicht gelesen werden", skipped)
+    return results
+
+def quiz_id_of(result: Dict) -> str:
+    """Quiz-ID eines Ergebnisses (ältere Dateien haben keine)"""
+    return result.get("quiz_id") or DEFAULT_QUIZ_ID
+
+
+def is_ranked(result: Dict) -> bool:
+    """
+    Zählt das Ergebnis für Bestenliste, Perzentil-Rang und Sketches?
+
+    Adaptive Durchläufe zielen auf ~50 % richtig und sind anders lang, ihr
+    Prozentwert ist mit festen Durchläufen nicht vergleichbar. Ältere adaptive
+    Ergebnisse haben noch kein "mode", aber immer "ability".
+
+    Live-Räume ebenso nicht: das Tempo gibt der Host vor, time_taken zählt nur
+    die beantworteten Fragen, und ein vorzeitig geschlossener Raum speichert
+    nur die bis dahin gestellten Fragen (2 von 2 richtig wären 100 %).
+    """
+    return result.get("mode") not in ("adaptive", "live") and "ability" not in result
+
+# ---------------------- RESULTS STORE ----------------------
+class ResultsStore:
+    """
+    Prozessweite Sicht auf alle Ergebnisse.
+
+    Der erste Zugriff lädt alles parallel (Kaltstart). Spätere Zugriffe prüfen
+    nur die mtime des Verzeichnisses und laden bei Änderungen (z.B. durch
+    git pull) ausschließlich neue Dateien nach.
+    """
+
+    def __init__(self, data_dir: str = ANSWERS_DIR, max_workers: int = MAX_WORKERS):
+        self.data_dir = data_dir
+        self.max_workers = max_workers
+        self._results: Dict[str, Dict] = {}
+        # Über add() eingetragen, aber evtl. noch nicht auf der Platte (Write-Behind)
+        self._pending: set = set()
+        self._runs: Dict[str, str] = {}  # run_id -> dateiname
+        self._dir_mtime: Optional[float] = None
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def _current_dir_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.data_dir).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def cold_start(self, progress: Optional[ProgressCallback] = None) -> None:
+        """Lädt alle Ergebnisse neu (paralleler Kaltstart)"""
+        with self._lock:
+            mtime = self._current_dir_mtime()
+            results = load_results_parallel(
+                self.data_dir, max_workers=self.max_workers, progress=progress
+            )
+            for name in self._pending - set(results):
+                results[name] = self._results[name]
+            self._results = results
+            self._reindex()
+            self._dir_mtime = mtime
+            self._loaded = True
+            LOG.info("Kaltstart: %d Ergebnisse geladen", len(self._results))
+
+    def refresh(self, progress: Optional[ProgressCallback] = None) -> None:
+        """Gleicht die Sicht mit dem Verzeichnis ab (nur Deltas werden gelesen)"""
+        with self._lock:
+            if not self._loaded:
+                self.cold_start(progress)
+                return
+            mtime = self._current_dir_mtime()
+            if mtime == self._dir_mtime:
+                return
+            names = set(list_result_files(self.data_dir))
+            self._pending -= names
+            for gone in set(self._results) - names - self._pending:
+                run_id = self._results.pop(gone).get("run_id")
+                if run_id and self._runs.get(run_id) == gone:
+                    del self._runs[run_id]
+            new_names = names - set(self._results)
+            if new_names:
+                loaded = load_results_parallel(
+                    self.data_dir, names=new_names, max_workers=self.max_workers, progress=progress
+                )
+                self._results.update(loaded)
+                for name, result in loaded.items():
+                    self._index(name, result)
+            self._dir_mtime = mtime
+
+    def _index(self, filename: str, result: Dict) -> None:
+        run_id = result.get("run_id")
+        if run_id:
+            self._runs.setdefault(run_id, filename)
+
+    def _reindex(self) -> None:
+        self._runs = {}
+        for name, result in self._results.items():
+            self._index(name, result)
+
+    def add(self, filename: str, result: Dict) -> None:
+        """Trägt ein gerade gespeichertes Ergebnis ein, ohne neu zu scannen"""
+        with self._lock:
+            self._results[filename] = result
+            self._pending.add(filename)
+            self._index(filename, result)
+
+    def claim_run(self, run_id: str, filename: str, result: Dict) -> Optional[str]:
+        """
+        Trägt ein Ergebnis nur ein, wenn seine run_id noch unbekannt ist.
+
+        Returns:
+            None wenn neu eingetragen, sonst der Dateiname des bestehenden Ergebnisses
+        """
+        self.refresh()
+        with self._lock:
+            existing = self._runs.get(run_id)
+            if existing is not None:
+                return existing
+            self.add(filename, result)
+            return None
+
+    def release_run(self, run_id: str, filename: str) -> None:
+        """Nimmt ein per claim_run eingetragenes Ergebnis zurück (Speichern fehlgeschlagen)"""
+        with self._lock:
+            if filename in self._pending:
+                self._pending.discard(filename)
+                self._results.pop(filename, None)
+            if self._runs.get(run_id) == filename:
+                del self._runs[run_id]
+
+    def items(self, progress: Optional[ProgressCallback] = None) -> List[Tuple[str, Dict]]:
+        """Gibt (dateiname, ergebnis)-Paare zurück"""
+        self.refresh(progress)
+        with self._lock:
+            return list(self._results.items())
+
+    def all(self, progress: Optional[ProgressCallback] = None) -> List[Dict]:
+        """Gibt alle Ergebnisse zurück"""
+        self.refresh(progress)
+        with self._lock:
+            return list(self._results.values())
+
+    def get_run(self, run_id: str) -> Optional[Dict]:
+        with self._lock:
+            filename = self._runs.get(run_id)
+            return self._results.get(filename) if filename else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._results)
+
+
+# ---------------------- DEDUPLIZIERUNG ----------------------
+def run_signature(result: Dict) -> str:
+    """
+    Kennung eines Durchlaufs für die Duplikat-Suche.
+
+    Neue Ergebnisse haben eine run_id. Ältere Duplikate entstanden durch
+    erneutes Rendern der Ergebnisseite: gleiche Antworten inkl. Zeiten pro
+    Frage, nur time_taken und Zeitstempel unterscheiden sich.
+    """
+    if result.get("run_id"):
+        return f"run:{result['run_id']}"
+    answers = json.dumps(result.get("answers", []), sort_keys=True, ensure_ascii=False)
+    return f"legacy:{result.get('username')}:{result.get('score')}:{result.get('total')}:{answers}"
+
+
+def find_duplicate_runs(items: Iterable[Tuple[str, Dict]]) -> List[str]:
+    """Gibt die Dateinamen aller Duplikate zurück (das früheste Ergebnis bleibt)"""
+    groups: Dict[str, List[Tuple[str, str]]] = {}
+    for name, result in items:
+        groups.setdefault(run_signature(result), []).append((result.get("timestamp", ""), name))
+    duplicates = []
+    for entries in groups.values():
+        if len(entries) > 1:
+            entries.sort()
+            duplicates.extend(name for _, name in entries[1:])
+    return sorted(duplicates)
+
+
+def dedupe_answers_dir(data_dir: str = ANSWERS_DIR, apply: bool = False) -> List[str]:
+    """Einmalige Bereinigung: löscht doppelte Ergebnis-Dateien (apply=False = nur anzeigen)"""
+    duplicates = find_duplicate_runs(load_results_parallel(data_dir).items())
+    if apply:
+        for name in duplicates:
+            try:
+                os.remove(os.path.join(data_dir, name))
+            except FileNotFoundError:
+                pass
+        LOG.info("%d doppelte Ergebnisse entfernt", len(duplicates))
+    return duplicates
+
+
+_store: Optional[ResultsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_results_store() -> ResultsStore:
+    """Gibt den prozessweiten ResultsStore zurück"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultsStore()
+        return _store
@@ -0,0 +1,371 @@
+"""
+Aufbewahrung und Archivierung alter Quiz-Durchläufe
+
+Durchläufe, die älter als retention_days (settings.json) sind, werden aus
+./data/answers in unveränderliche, komprimierte Monats-Bundles verschoben
+(./data/archive/runs-YYYY-MM-NNN.jsonl.gz bzw. .zst, wenn `zstandard`
+installiert ist). Ein Bundle wird nie wieder geändert; ein weiterer Lauf im
+selben Monat erzeugt ein neues Bundle mit höherer Nummer.
+
+Damit Bestenliste und Statistiken vollständig bleiben, hält das Archiv
+voraggregierte Zusammenfassungen:
+- summary.json: bestes Ergebnis und Anzahl Versuche pro Quiz und Benutzer,
+  dazu pro Quiz ein Histogramm über (percentage, time_taken) für den
+  Perzentil-Rang: je Ergebnis-Prozentwert Zeit-Buckets mit 1% relativer
+  Genauigkeit (wie DDSketch). Die Größe hängt damit nur von der Zahl
+  verschiedener Ergebnisse und Zeiten ab, nicht von der Zahl der Durchläufe.
+- sketches.json: Sketches der archivierten Durchläufe (wie core.sketches)
+
+Die Rohdaten bleiben über iter_runs() bei Bedarf abfragbar.
+
+Created by l1rox3 • 2025
+"""
+
+import gzip
+import io
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core.results import ANSWERS_DIR, is_ranked, quiz_id_of
+from core.sketches import SketchStore
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+LOG = logging.getLogger("quiz.retention")
+
+ARCHIVE_DIR = "./data/archive"
+DEFAULT_RETENTION_DAYS = 180
+RETENTION_INTERVAL = 24 * 3600  # höchstens ein automatischer Lauf pro Tag
+BUNDLE_PATTERN = re.compile(r"^runs-(\d{4}-\d{2})-(\d{3})\.jsonl\.(gz|zst)$")
+RANK_TIME_ACCURACY = 0.01
+_RANK_GAMMA = (1 + RANK_TIME_ACCURACY) / (1 - RANK_TIME_ACCURACY)
+ZERO_BUCKET = "z"
+
+# ---------------------- KOMPRESSION ----------------------
+def _bundle_extension() -> str:
+    return "zst" if zstandard is not None else "gz"
+
+
+def _open_bundle_writer(path: str, ext: str):
+    raw = open(path, "wb")
+    if ext == "zst":
+        return raw, zstandard.ZstdCompressor(level=10).stream_writer(raw, closefd=False)
+    return raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=9)
+
+
+def _open_bundle_reader(path: str) -> io.TextIOBase:
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"{os.path.basename(path)} benötigt das Paket 'zstandard'")
+        raw = open(path, "rb")
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True), encoding="utf-8")
+    return gzip.open(path, "rt", encoding="utf-8")
+
+
+def _result_datetime(result: Dict) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(result.get("timestamp", ""))
+    except (TypeError, ValueError):
+        return None
+
+
+def _time_bucket(seconds: float) -> str:
+    """Zeit-Bucket im Rang-Histogramm (wie DDSketch-Schlüssel)"""
+    if seconds < 1e-9:
+        return ZERO_BUCKET
+    return str(math.ceil(math.log(seconds) / math.log(_RANK_GAMMA)))
+
+
+def _bucket_time(bucket: str) -> float:
+    """Repräsentative Zeit eines Buckets"""
+    if bucket == ZERO_BUCKET:
+        return 0.0
+    return round(2 * _RANK_GAMMA ** int(bucket) / (_RANK_GAMMA + 1), 2)
+
+
+def _add_rank(quiz: Dict, percentage: float, time_taken: float, count: int = 1) -> None:
+    times = quiz.setdefault("rank_hist", {}).setdefault(str(float(percentage)), {})
+    bucket = _time_bucket(float(time_taken))
+    times[bucket] = times.get(bucket, 0) + count
+
+
+def _atomic_write_json(path: str, data: Dict) -> None:
+    temp_file = f"{path}.tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, path)
+
+# ---------------------- ARCHIV ----------------------
+class Archive:
+    def __init__(self, archive_dir: str = ARCHIVE_DIR, answers_dir: str = ANSWERS_DIR):
+        self.archive_dir = archive_dir
+        self.answers_dir = answers_dir
+        self.summary_path = os.path.join(archive_dir, "summary.json")
+        self.pending_path = os.path.join(archive_dir, ".pending.json")
+        self.sketches = SketchStore(os.path.join(archive_dir, "sketches.json"))
+        self._lock = threading.RLock()
+        self._summary: Dict = {"version": 1, "runs": 0, "quizzes": {}}
+        self.load()
+
+    # ---------- Persistenz ----------
+    def load(self) -> None:
+        with self._lock:
+            self._finish_pending()
+            if os.path.exists(self.summary_path):
+                try:
+                    with open(self.summary_path, "r", encoding="utf-8") as f:
+                        self._summary = json.load(f)
+                except (OSError, ValueError) as e:
+                    LOG.error("Archiv-Zusammenfassung konnte nicht geladen werden: %s", e)
+            for quiz in self._summary.get("quizzes", {}).values():
+                # Ältere Zusammenfassungen: einzelne (percentage, time_taken)-Paare
+                # ins Histogramm übernehmen (gespeichert mit dem nächsten Archiv-Lauf)
+                for percentage, time_taken in quiz.pop("rank_pairs", []):
+                    _add_rank(quiz, percentage, time_taken)
+            self.sketches.load()
+
+    def _finish_pending(self) -> None:
+        """Schließt einen unterbrochenen Archiv-Lauf ab (Bundles umbenennen, Dateien löschen)"""
+        if not os.path.exists(self.pending_path):
+            return
+        with open(self.pending_path, "r", encoding="utf-8") as f:
+            pending = json.load(f)
+        for temp_file, final in pending.get("bundles", []):
+            if os.path.exists(temp_file):
+                os.replace(temp_file, final)
+        for path in (self.summary_path, self.sketches.path):
+            if os.path.exists(f"{path}.next"):
+                os.replace(f"{path}.next", path)
+        for name in pending.get("files", []):
+            try:
+                os.remove(os.path.join(self.answers_dir, name))
+            except FileNotFoundError:
+                pass
+        os.remove(self.pending_path)
+        LOG.info("Unterbrochener Archiv-Lauf abgeschlossen")
+
+    # ---------- Abfragen ----------
+    @property
+    def archived_runs(self) -> int:
+        return self._summary.get("runs", 0)
+
+    def bundles(self) -> List[Dict]:
+        """Alle Bundles mit Monat und Größe, älteste zuerst"""
+        if not os.path.isdir(self.archive_dir):
+            return []
+        out = []
+        for name in sorted(os.listdir(self.archive_dir)):
+            match = BUNDLE_PATTERN.match(name)
+            if match:
+                out.append({
+                    "name": name,
+                    "month": match.group(1),
+                    "seq": int(match.group(2)),
+                    "size": os.path.getsize(os.path.join(self.archive_dir, name)),
+                })
+        return out
+
+    def leaderboard_entries(self, quiz: Optional[str] = None) -> List[Dict]:
+        """Bestes archiviertes Ergebnis pro Benutzer (im Format von save_result)"""
+        with self._lock:
+            entries = []
+            for quiz_id, data in self._summary.get("quizzes", {}).items():
+                if quiz and quiz_id != quiz:
+                    continue
+                for user in data.get("users", {}).values():
+                    if user["best"] is not None:       # nur adaptive Durchläufe
+                        entries.append(dict(user["best"]))
+            return entries
+
+    def attempts_by_user(self, quiz: Optional[str] = None) -> Dict[str, int]:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for quiz_id, data in self._summary.get("quizzes", {}).items():
+                if quiz and quiz_id != quiz:
+                    continue
+                for username, user in data.get("users", {}).items():
+                    counts[username] = counts.get(username, 0) + user.get("runs", 0)
+            return counts
+
+    def runs_by_quiz(self) -> Dict[str, int]:
+        """Anzahl archivierter Durchläufe pro Quiz"""
+        with self._lock:
+            return {
+                quiz_id: sum(user.get("runs", 0) for user in data.get("users", {}).values())
+                for quiz_id, data in self._summary.get("quizzes", {}).items()
+            }
+
+    def rank_histogram(self) -> Dict[str, List[Tuple[float, float, int]]]:
+        """(percentage, time_taken, Anzahl) der archivierten Durchläufe pro Quiz, Zeiten auf 1% genau"""
+        with self._lock:
+            return {
+                quiz_id: [
+                    (float(percentage), _bucket_time(bucket), count)
+                    for percentage, times in data.get("rank_hist", {}).items()
+                    for bucket, count in times.items()
+                ]
+                for quiz_id, data in self._summary.get("quizzes", {}).items()
+            }
+
+    def iter_runs(
+        self,
+        quiz: Optional[str] = None,
+        user: Optional[str] = None,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+    ) -> Iterator[Dict]:
+        """Liest archivierte Durchläufe bei Bedarf (Bundles außerhalb des Zeitraums werden übersprungen)"""
+        for bundle in self.bundles():
+            if since and bundle["month"] < since.strftime("%Y-%m"):
+                continue
+            if until and bundle["month"] > until.strftime("%Y-%m"):
+                continue
+            with _open_bundle_reader(os.path.join(self.archive_dir, bundle["name"])) as f:
+                for line in f:
+                    result = json.loads(line)["result"]
+                    if quiz and quiz_id_of(result) != quiz:
+                        continue
+                    if user and result.get("username") != user:
+                        continue
+                    if since or until:
+                        ts = _result_datetime(result)
+                        if ts is None or (since and ts.date() < since) or (until and ts.date() > until):
+                            continue
+                    yield result
+
+    # ---------- Archivieren ----------
+    def _add_to_summary(self, summary: Dict, result: Dict) -> None:
+        users = summary["quizzes"].setdefault(quiz_id_of(result), {"users": {}})["users"]
+        username = result.get("username")
+        entry = users.setdefault(username, {"runs": 0, "best": None})
+        entry["runs"] += 1
+        summary["runs"] = summary.get("runs", 0) + 1
+        if not is_ranked(result):
+            return
+        best = entry["best"]
+        candidate = {k: v for k, v in result.items() if k != "answers"}
+        candidate.setdefault("quiz_id", quiz_id_of(result))
+        _add_rank(summary["quizzes"][quiz_id_of(result)], result.get("percentage", 0), result.get("time_taken", 0))
+        if best is None or (
+            (result.get("percentage", 0), -result.get("time_taken", 0))
+            > (best.get("percentage", 0), -best.get("time_taken", 0))
+        ):
+            entry["best"] = candidate
+
+    def _next_bundle_path(self, month: str, ext: str) -> str:
+        used = [b["seq"] for b in self.bundles() if b["month"] == month]
+        return os.path.join(self.archive_dir, f"runs-{month}-{max(used, default=0) + 1:03d}.jsonl.{ext}")
+
+    def archive(self, items: Iterable[Tuple[str, Dict]], older_than: datetime) -> int:
+        """
+        Verschiebt alle Durchläufe vor older_than ins Archiv.
+
+        Ablauf (absturzsicher): Bundles und neue Zusammenfassungen werden unter
+        temporären Namen geschrieben und in .pending.json vermerkt; erst dann
+        werden sie umbenannt und die Dateien in answers_dir gelöscht.
+        """
+        with self._lock:
+            by_month: Dict[str, List[Tuple[str, Dict]]] = {}
+            for name, result in items:
+                ts = _result_datetime(result)
+                if ts is not None and ts < older_than:
+                    by_month.setdefault(ts.strftime("%Y-%m"), []).append((name, result))
+            if not by_month:
+                return 0
+
+            os.makedirs(self.archive_dir, exist_ok=True)
+            ext = _bundle_extension()
+            summary = json.loads(json.dumps(self._summary))
+            sketches = SketchStore(f"{self.sketches.path}.next")
+            sketches.merge_from(self.sketches)
+            bundles, files = [], []
+
+            for month, entries in sorted(by_month.items()):
+                entries.sort(key=lambda e: e[1].get("timestamp", ""))
+                final = self._next_bundle_path(month, ext)
+                temp_file = f"{final}.tmp"
+                raw, writer = _open_bundle_writer(temp_file, ext)
+                try:
+                    for name, result in entries:
+                        line = json.dumps({"file": name, "result": result}, ensure_ascii=False) + "\n"
+                        writer.write(line.encode("utf-8"))
+                        self._add_to_summary(summary, result)
+                        sketches.record(result, persist=False)
+                        files.append(name)
+                    writer.close()
+                    raw.flush()
+                    os.fsync(raw.fileno())
+                finally:
+                    raw.close()
+                bundles.append((temp_file, final))
+
+            _atomic_write_json(f"{self.summary_path}.next", summary)
+            sketches.save()
+            _atomic_write_json(self.pending_path, {"bundles": bundles, "files": files})
+            self._finish_pending()
+
+            self._summary = summary
+            self.sketches.load()
+            LOG.info("%d Durchläufe in %d Bundles archiviert", len(files), len(bundles))
+            return len(files)
+
+
+_archive: Optional[Archive] = None
+_archive_lock = threading.Lock()
+_last_run = 0.0
+
+
+def get_archive() -> Archive:
+    """Gibt das prozessweite Archiv zurück"""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = Archive()
+        return _archive
+
+
+def run_retention(retention_days: int = DEFAULT_RETENTION_DAYS) -> int:
+    """Archiviert alle Durchläufe, die älter als retention_days sind"""
+    from core.results import get_results_store
+    from core.sketches import get_sketch_store
+    from core.write_queue import get_write_queue
+
+    # Journal leeren, sonst würden archivierte Dateien beim Neustart wiederhergestellt
+    get_write_queue().flush(checkpoint=True)
+    store = get_results_store()
+    archived = get_archive().archive(store.items(), datetime.now() - timedelta(days=retention_days))
+    if archived:
+        store.refresh()
+    # Sicherstellen, dass der Sketch-Store geladen ist; archivierte Beiträge bleiben darin erhalten
+    get_sketch_store()
+    return archived
+
+
+def maybe_run_retention(settings: Dict) -> None:
+    """Startet höchstens einmal pro Tag einen Archiv-Lauf im Hintergrund"""
+    global _last_run
+    with _archive_lock:
+        if time.time() - _last_run < RETENTION_INTERVAL:
+            return
+        _last_run = time.time()
+    days = int(settings.get("retention_days") or DEFAULT_RETENTION_DAYS)
+
+    def worker():
+        try:
+            run_retention(days)
+        except Exception as exc:
+            LOG.exception("Archiv-Lauf fehlgeschlagen: %s", exc)
+
+    threading.Thread(target=worker, name="retention", daemon=True).start()
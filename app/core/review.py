@@ -0,0 +1,302 @@
+"""
+Wiederholen: Spaced Repetition pro Benutzer (SM-2)
+
+Falsch beantwortete Fragen kommen in einen persönlichen Wiederholungsplan.
+Jede Frage hat Easiness-Faktor, Intervall, Wiederholungen und Fälligkeit nach
+SM-2; pro Benutzer und Quiz liegt ein Min-Heap nach Fälligkeit. Eine
+Wiederholungsrunde nimmt die fälligen Fragen direkt vom Heap, die
+Ergebnis-Historie wird dafür nicht erneut durchsucht (nur einmal, wenn für
+einen Benutzer noch kein Plan existiert).
+
+Gespeichert wird kompakt in ./data/review/<benutzer>.json (Name
+URL-kodiert, damit verschiedene Benutzer nie dieselbe Datei bekommen):
+    {"username": benutzer,
+     "quizzes": {quiz_id: {"items": {schlüssel: [ef, intervall_tage, wdh, fällig]},
+                           "heap": [[fällig, schlüssel], ...]}}}
+
+Fragen sind über ihren stabilen Schlüssel (CompiledQuiz.keys) eingeplant;
+erst die Wiederholungsrunde übersetzt sie in Positionen der aktuellen Fassung.
+Fragen, die ein Admin aus dem Quiz gelöscht hat, fallen dabei aus dem Plan.
+
+Veraltete Heap-Einträge (Frage wurde inzwischen neu geplant) werden beim
+Herausnehmen übersprungen und beim Speichern aussortiert, wenn der Heap zu
+groß wird.
+
+Created by l1rox3 • 2025
+"""
+
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import quote
+
+from core.catalog import get_catalog
+from core.compiled import CompiledQuiz
+from core.results import get_results_store, quiz_id_of
+
+LOG = logging.getLogger("quiz.review")
+
+REVIEW_DIR = "./data/review"
+SESSION_SIZE = 10
+DAY = 86400.0
+INITIAL_EF = 2.5
+MIN_EF = 1.3
+QUALITY_CORRECT = 4
+QUALITY_WRONG = 1
+
+
+def sm2(item: List[float], quality: int, now: float) -> List[float]:
+    """Ein SM-2-Schritt: [ef, intervall, wdh, fällig] -> neuer Eintrag"""
+    ef, interval, reps, _ = item
+    if quality < 3:
+        reps, interval = 0, 1
+    else:
+        reps += 1
+        interval = 1 if reps == 1 else 6 if reps == 2 else max(1, round(interval * ef))
+    ef = max(MIN_EF, ef + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    return [round(ef, 3), interval, reps, round(now + interval * DAY, 1)]
+
+
+class UserSchedule:
+    """Plan eines Benutzers: pro Quiz Items und Heap"""
+
+    def __init__(self, path: str, username: str):
+        self.path = path
+        self.username = username
+        self.items: Dict[str, Dict[str, List[float]]] = {}
+        self.heaps: Dict[str, List[Tuple[float, str]]] = {}
+
+    def load(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            LOG.error("Fehler beim Laden von %s: %s", self.path, e)
+            return False
+        if data.get("username", self.username) != self.username:
+            # Ältere Dateinamen konnten kollidieren ("a b" und "a_b"): fremde Pläne nicht übernehmen
+            LOG.warning("%s gehört zu %r, nicht zu %r", self.path, data["username"], self.username)
+            return False
+        legacy = data.get("version") != 2
+        for quiz_id, entry in data.get("quizzes", {}).items():
+            items = entry.get("items", {})
+            if legacy:
+                # Version 1 war nach Positionen geplant: der aktuellen Fassung zuordnen
+                keys = get_catalog().question_keys(quiz_id) or ()
+                items = {keys[int(qid)]: item for qid, item in items.items() if int(qid) < len(keys)}
+            self.items[quiz_id] = dict(items)
+            heap = [(item[3], key) for key, item in self.items[quiz_id].items()]
+            heapq.heapify(heap)
+            self.heaps[quiz_id] = heap
+        return True
+
+    def save(self) -> None:
+        quizzes = {}
+        for quiz_id, items in self.items.items():
+            heap = self.heaps.get(quiz_id, [])
+            if len(heap) > 2 * len(items):
+                heap = [(item[3], key) for key, item in items.items()]
+                heapq.heapify(heap)
+                self.heaps[quiz_id] = heap
+            quizzes[quiz_id] = {
+                "items": dict(items),
+                "heap": [[round(due, 1), key] for due, key in heap],
+            }
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_file = f"{self.path}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump({"version": 2, "username": self.username, "quizzes": quizzes}, f, separators=(",", ":"))
+        os.replace(temp_file, self.path)
+
+    def _valid(self, quiz_id: str, due: float, key: str) -> bool:
+        item = self.items.get(quiz_id, {}).get(key)
+        return item is not None and abs(item[3] - due) < 0.5
+
+    def answer(self, quiz_id: str, key: str, correct: bool, now: float) -> None:
+        """Verbucht eine Antwort: Fehler planen die Frage ein, richtige Antworten nur bekannte Fragen"""
+        items = self.items.setdefault(quiz_id, {})
+        item = items.get(key)
+        if item is None:
+            if correct:
+                return
+            # Neu verpasste Frage: sofort wiederholbar
+            item = [INITIAL_EF, 0, 0, round(now, 1)]
+        else:
+            item = sm2(item, QUALITY_CORRECT if correct else QUALITY_WRONG, now)
+        items[key] = item
+        heapq.heappush(self.heaps.setdefault(quiz_id, []), (item[3], key))
+
+    def prune(self, quiz_id: str, keys: Set[str]) -> bool:
+        """Entfernt Fragen, die nicht mehr im Quiz stehen; True, wenn sich etwas geändert hat"""
+        items = self.items.get(quiz_id, {})
+        removed = [key for key in items if key not in keys]
+        for key in removed:
+            del items[key]
+        return bool(removed)
+
+    def due(self, quiz_id: str, now: float, limit: int) -> List[str]:
+        """
+        Bis zu limit fällige Fragen, früheste zuerst (O(k log n)).
+
+        Die Einträge werden vom Heap genommen und gleich wieder eingefügt -
+        eine abgebrochene Runde verliert also nichts; erst die Antwort plant
+        die Frage neu.
+        """
+        heap = self.heaps.get(quiz_id, [])
+        taken: List[Tuple[float, str]] = []
+        while heap and len(taken) < limit and heap[0][0] <= now:
+            due, key = heapq.heappop(heap)
+            if self._valid(quiz_id, due, key) and all(key != k for _, k in taken):
+                taken.append((due, key))
+        for entry in taken:
+            heapq.heappush(heap, entry)
+        return [key for _, key in taken]
+
+    def next_due(self, quiz_id: str) -> Optional[float]:
+        """Zeitpunkt der nächsten fälligen Frage (veraltete Einträge oben werden entfernt)"""
+        heap = self.heaps.get(quiz_id, [])
+        while heap and not self._valid(quiz_id, *heap[0]):
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def pending(self, quiz_id: str) -> int:
+        return len(self.items.get(quiz_id, {}))
+
+
+class ReviewScheduler:
+    def __init__(self, review_dir: str = REVIEW_DIR):
+        self.review_dir = review_dir
+        self._users: Dict[str, UserSchedule] = {}
+        self._lock = threading.RLock()
+
+    def _path(self, username: str) -> str:
+        return os.path.join(self.review_dir, quote(username, safe="") + ".json")
+
+    def _schedule(self, username: str) -> UserSchedule:
+        schedule = self._users.get(username)
+        if schedule is None:
+            schedule = UserSchedule(self._path(username), username)
+            if not schedule.load():
+                self._bootstrap(username, schedule)
+            self._users[username] = schedule
+        return schedule
+
+    def _bootstrap(self, username: str, schedule: UserSchedule) -> None:
+        """Einmaliger Aufbau aus der bisherigen Historie des Benutzers"""
+        results = [r for r in get_results_store().all() if r.get("username") == username]
+        results.sort(key=lambda r: r.get("timestamp", ""))
+        for result in results:
+            self._apply(schedule, result, _timestamp(result))
+        if results:
+            schedule.save()
+            LOG.info("Wiederholungsplan für %s aus %d Ergebnissen aufgebaut", username, len(results))
+
+    def _apply(self, schedule: UserSchedule, result: Dict, now: float) -> None:
+        quiz_id = quiz_id_of(result)
+        keys, lookup = None, None
+        for answer in result.get("answers", []):
+            if "q" in answer:
+                # Positionen gelten für die Fassung, mit der gespielt wurde
+                if keys is None:
+                    keys = get_catalog().question_keys(quiz_id, result.get("quiz_version")) or ()
+                if answer["q"] >= len(keys):
+                    continue
+                key, correct = keys[answer["q"]], bool(answer.get("c"))
+            else:
+                # Ältere Ergebnisse: Frage über den Text zuordnen
+                if lookup is None:
+                    quiz = get_catalog().get(quiz_id)
+                    lookup = {text: key for text, key in zip(quiz.questions, quiz.keys)} if quiz else {}
+                key = lookup.get(answer.get("question"))
+                if key is None:
+                    continue
+                correct = bool(answer.get("is_correct"))
+            schedule.answer(quiz_id, key, correct, now)
+
+    def _current(self, schedule: UserSchedule, quiz_id: str) -> Optional[CompiledQuiz]:
+        """Aktuelle Fassung des Quiz; aus dem Quiz gelöschte Fragen fliegen dabei aus dem Plan"""
+        quiz = get_catalog().get(quiz_id)
+        if quiz is not None and schedule.prune(quiz_id, set(quiz.keys)):
+            try:
+                schedule.save()
+            except OSError as e:
+                LOG.error("Wiederholungsplan %s konnte nicht gespeichert werden: %s", schedule.path, e)
+        return quiz
+
+    # ---------- API ----------
+    def load_user(self, username: str) -> None:
+        """Lädt (bzw. baut) den Plan eines Benutzers - vor dem Eintragen eines neuen Ergebnisses aufrufen"""
+        with self._lock:
+            self._schedule(username)
+
+    def rebuild(self, username: str) -> None:
+        """
+        Baut den Plan eines Benutzers neu aus seiner Historie (z.B. nach dem
+        Löschen doppelter Ergebnisse). Wiederholungsrunden stehen nur im Plan,
+        ihr Fortschritt geht dabei verloren.
+        """
+        with self._lock:
+            schedule = UserSchedule(self._path(username), username)
+            self._bootstrap(username, schedule)
+            try:
+                schedule.save()
+            except OSError as e:
+                LOG.error("Wiederholungsplan für %s konnte nicht gespeichert werden: %s", username, e)
+            self._users[username] = schedule
+
+    def record(self, username: str, result: Dict, now: Optional[float] = None) -> None:
+        """Verbucht alle Antworten eines Ergebnisses (Quiz oder Wiederholungsrunde)"""
+        with self._lock:
+            schedule = self._schedule(username)
+            self._apply(schedule, result, time.time() if now is None else now)
+            try:
+                schedule.save()
+            except OSError as e:
+                LOG.error("Wiederholungsplan für %s konnte nicht gespeichert werden: %s", username, e)
+
+    def next_session(self, username: str, quiz_id: str, limit: int = SESSION_SIZE,
+                     now: Optional[float] = None) -> List[int]:
+        """Frage-IDs (Positionen in der aktuellen Fassung) für die nächste Wiederholungsrunde"""
+        with self._lock:
+            schedule = self._schedule(username)
+            quiz = self._current(schedule, quiz_id)
+            if quiz is None:
+                return []
+            keys = schedule.due(quiz_id, time.time() if now is None else now, limit)
+            return [quiz.position(key) for key in keys]
+
+    def status(self, username: str, quiz_id: str, now: Optional[float] = None) -> Tuple[bool, Optional[float], int]:
+        """(etwas fällig?, nächste Fälligkeit, Fragen im Plan)"""
+        with self._lock:
+            schedule = self._schedule(username)
+            self._current(schedule, quiz_id)
+            next_due = schedule.next_due(quiz_id)
+            now = time.time() if now is None else now
+            return next_due is not None and next_due <= now, next_due, schedule.pending(quiz_id)
+
+
+def _timestamp(result: Dict) -> float:
+    try:
+        return datetime.fromisoformat(result.get("timestamp", "")).timestamp()
+    except (TypeError, ValueError):
+        return time.time()
+
+
+_scheduler: Optional[ReviewScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_review_scheduler() -> ReviewScheduler:
+    """Gibt den prozessweiten ReviewScheduler zurück"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = ReviewScheduler()
+        return _scheduler
@@ -0,0 +1,349 @@
+"""
+Live-Räume: alle beantworten gleichzeitig dieselbe Frage
+
+Ein prozessweiter Hub (RoomHub) hält alle offenen Räume im Speicher: Quiz,
+aktuelle Frage, Deadline und Punktestand. Ablauf eines Raums:
+
+    lobby -> question -> reveal -> question -> ... -> finished
+
+Jede Session abonniert ihren Raum (Subscription). Ändert sich der Zustand
+(nächste Frage, Auflösung, Ende), baut der Raum genau einen unveränderlichen
+Snapshot (Frage, Optionen, Rangliste) und benachrichtigt die Abonnenten - die
+Kosten des Fan-outs sind also ein Event pro Teilnehmer, nicht ein Neuaufbau
+pro Teilnehmer. Eine Antwort ändert nur Zähler und Punkte des Teilnehmers und
+löst keinen Fan-out aus. Niemand liest dafür Dateien.
+
+Die Deadline wird beim nächsten Zugriff geprüft (tick); die Seiten fragen
+ihren Raum ohnehin jede Sekunde ab.
+
+Die Ergebnisse speichert der Raum selbst über on_finish (siehe
+RoomHub.create): beim Übergang nach finished, und für die bis dahin
+gespielten Fragen auch, wenn der Raum vorher geschlossen wird oder abläuft.
+Schlägt das Speichern fehl, bleibt results_saved False und der nächste
+Versuch (save_results) speichert erneut. on_finish bekommt eine Kopie der
+Ergebnisse und läuft ohne die Sperre des Raums - das Speichern kann auf den
+Group Commit warten, die Abfragen der Teilnehmer sollen dabei nicht hängen.
+
+Created by l1rox3 • 2025
+"""
+
+import logging
+import secrets
+import threading
+import time
+import uuid
+import weakref
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.compiled import CompiledQuiz, new_seed
+
+LOG = logging.getLogger("quiz.rooms")
+
+LOBBY, QUESTION, REVEAL, FINISHED = "lobby", "question", "reveal", "finished"
+QUESTION_SECONDS = 20
+MAX_POINTS = 1000
+SCOREBOARD_SIZE = 10
+ROOM_TTL = 3 * 3600          # Räume ohne Aktivität werden danach entfernt
+CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+CODE_LENGTH = 5
+
+
+@dataclass(frozen=True)
+class RoomSnapshot:
+    """Zustand eines Raums zwischen zwei Übergängen (wird von allen Teilnehmern geteilt)"""
+    version: int
+    state: str
+    position: int                                   # Index der aktuellen Frage
+    total: int
+    question: str = ""
+    options: Tuple[Tuple[int, str], ...] = ()       # (Options-Index, Text) in Anzeige-Reihenfolge
+    deadline: float = 0.0                           # time.monotonic()
+    correct: Optional[int] = None                   # erst bei reveal/finished
+    scoreboard: Tuple[Tuple[str, int], ...] = ()
+
+
+@dataclass(frozen=True)
+class ParticipantResult:
+    """Kopie der Antworten eines Teilnehmers für on_finish"""
+    name: str
+    correct: int
+    answers: Tuple[Dict, ...]
+
+
+class Participant:
+    __slots__ = ("name", "points", "correct", "answers", "answered_position")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.points = 0
+        self.correct = 0
+        self.answers: List[Dict] = []
+        self.answered_position = -1
+
+
+class Subscription:
+    """Abo einer Session: hält den zuletzt gesehenen Snapshot"""
+    __slots__ = ("room", "name", "snapshot", "_event", "__weakref__")
+
+    def __init__(self, room: "Room", name: str):
+        self.room = room
+        self.name = name
+        self.snapshot = room.snapshot
+        self._event = threading.Event()
+
+    def notify(self) -> None:
+        self._event.set()
+
+    def poll(self) -> Optional[RoomSnapshot]:
+        """Neuer Snapshot seit dem letzten Aufruf, sonst None (prüft vorher die Deadline)"""
+        self.room.tick()
+        if not self._event.is_set():
+            return None
+        self._event.clear()
+        self.snapshot = self.room.snapshot
+        return self.snapshot
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[RoomSnapshot]:
+        """Blockiert bis zur nächsten Änderung (für Hintergrund-Threads und den Lasttest)"""
+        if self._event.wait(timeout):
+            return self.poll()
+        return None
+
+
+class Room:
+    def __init__(self, code: str, quiz: CompiledQuiz, host: str, question_seconds: int = QUESTION_SECONDS,
+                 on_finish: Optional[Callable[["Room", int, List[ParticipantResult]], None]] = None):
+        self.code = code
+        self.quiz = quiz
+        self.host = host
+        self.question_seconds = question_seconds
+        self.run_id = uuid.uuid4().hex
+        self.seed = new_seed()
+        self.qids = quiz.draw(self.seed)
+        self.participants: Dict[str, Participant] = {}
+        self.answered = 0
+        self.started_at: Optional[float] = None
+        self.last_activity = time.monotonic()
+        self.results_saved = False
+        self._on_finish = on_finish
+        self._saving = False
+        self._question_started = 0.0
+        self._subscribers: "weakref.WeakSet[Subscription]" = weakref.WeakSet()
+        self._lock = threading.RLock()
+        self.snapshot = RoomSnapshot(version=0, state=LOBBY, position=0, total=len(self.qids))
+
+    # ---------- Abos ----------
+    def subscribe(self, name: str) -> Subscription:
+        subscription = Subscription(self, name)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def _publish(self, state: str, position: int, deadline: float = 0.0) -> None:
+        """Baut den neuen Snapshot einmal und benachrichtigt alle Abonnenten"""
+        qid = self.qids[position] if position < len(self.qids) else None
+        options: Tuple[Tuple[int, str], ...] = ()
+        question = ""
+        correct = None
+        if qid is not None and state in (QUESTION, REVEAL):
+            question = self.quiz.questions[qid]
+            texts = self.quiz.options[qid]
+            options = tuple((choice, texts[choice]) for choice in self.quiz.option_order(self.seed, qid))
+            if state == REVEAL:
+                correct = self.quiz.answers[qid]
+        scoreboard = ()
+        if state in (REVEAL, FINISHED):
+            ranked = sorted(self.participants.values(), key=lambda p: -p.points)
+            scoreboard = tuple((p.name, p.points) for p in ranked[:SCOREBOARD_SIZE])
+        self.snapshot = RoomSnapshot(
+            version=self.snapshot.version + 1, state=state, position=position, total=len(self.qids),
+            question=question, options=options, deadline=deadline, correct=correct, scoreboard=scoreboard,
+        )
+        for subscription in list(self._subscribers):
+            subscription.notify()
+
+    # ---------- Ablauf ----------
+    def join(self, name: str) -> Participant:
+        with self._lock:
+            self.last_activity = time.monotonic()
+            participant = self.participants.get(name)
+            if participant is None:
+                participant = Participant(name)
+                self.participants[name] = participant
+            return participant
+
+    def leave(self, name: str) -> None:
+        with self._lock:
+            # Nach dem Start bleiben Punkte und Antworten für die Auswertung erhalten
+            if self.snapshot.state == LOBBY:
+                self.participants.pop(name, None)
+
+    def _ask(self, position: int) -> None:
+        self.answered = 0
+        self._question_started = time.monotonic()
+        self._publish(QUESTION, position, self._question_started + self.question_seconds)
+
+    def start(self) -> None:
+        with self._lock:
+            if self.snapshot.state != LOBBY:
+                return
+            self.started_at = time.time()
+            self._ask(0)
+
+    def advance(self) -> None:
+        """Host: Frage auflösen bzw. zur nächsten Frage weiterschalten"""
+        finished = False
+        with self._lock:
+            self.last_activity = time.monotonic()
+            snapshot = self.snapshot
+            if snapshot.state == QUESTION:
+                self._publish(REVEAL, snapshot.position)
+            elif snapshot.state == REVEAL:
+                if snapshot.position + 1 < len(self.qids):
+                    self._ask(snapshot.position + 1)
+                else:
+                    self._publish(FINISHED, snapshot.position)
+                    finished = True
+        if finished:
+            self.save_results()
+
+    @property
+    def played(self) -> int:
+        """Anzahl bisher gestellter Fragen (nach finished alle)"""
+        if self.snapshot.state == LOBBY:
+            return 0
+        return len(self.qids) if self.snapshot.state == FINISHED else self.snapshot.position + 1
+
+    def save_results(self) -> bool:
+        """
+        Speichert die Ergebnisse einmal über on_finish(raum, gestellte Fragen, Ergebnisse).
+
+        Unter der Sperre wird nur kopiert, gespeichert wird danach. results_saved
+        wird erst gesetzt, wenn on_finish durchgelaufen ist; on_finish muss also
+        wiederholbar sein. Gibt results_saved zurück.
+        """
+        with self._lock:
+            if self.results_saved or self._saving or self._on_finish is None or self.snapshot.state == LOBBY:
+                return self.results_saved
+            self._saving = True
+            played = self.played
+            results = [
+                ParticipantResult(p.name, p.correct, tuple(p.answers))
+                for p in self.participants.values() if p.answers
+            ]
+        saved = False
+        try:
+            self._on_finish(self, played, results)
+            saved = True
+        except Exception as e:
+            LOG.error("Ergebnisse von Live-Raum %s konnten nicht gespeichert werden: %s", self.code, e)
+        finally:
+            with self._lock:
+                self._saving = False
+                self.results_saved = saved
+        return saved
+
+    def tick(self, now: Optional[float] = None) -> None:
+        """Löst die Frage auf, wenn die Zeit um ist oder alle geantwortet haben"""
+        snapshot = self.snapshot
+        if snapshot.state != QUESTION:
+            return
+        now = time.monotonic() if now is None else now
+        all_answered = bool(self.participants) and self.answered >= len(self.participants)
+        if now < snapshot.deadline and not all_answered:
+            return
+        with self._lock:
+            if self.snapshot is snapshot:
+                self._publish(REVEAL, snapshot.position)
+
+    def answer(self, name: str, position: int, choice: int) -> bool:
+        """Verbucht eine Antwort (nur für die laufende Frage, nur einmal pro Teilnehmer)"""
+        with self._lock:
+            snapshot = self.snapshot
+            participant = self.participants.get(name)
+            if (participant is None or snapshot.state != QUESTION or snapshot.position != position
+                    or participant.answered_position == position):
+                return False
+            seconds = time.monotonic() - self._question_started
+            qid = self.qids[position]
+            record = self.quiz.answer_record(qid, choice, seconds)
+            participant.answers.append(record)
+            participant.answered_position = position
+            if record["c"]:
+                participant.correct += 1
+                # Schnelle richtige Antworten bringen mehr Punkte (1000 .. 500)
+                participant.points += round(MAX_POINTS * (1 - 0.5 * min(seconds / self.question_seconds, 1.0)))
+            self.answered += 1
+            self.last_activity = time.monotonic()
+        return True
+
+    def rank(self, name: str) -> Optional[int]:
+        participant = self.participants.get(name)
+        if participant is None:
+            return None
+        return 1 + sum(1 for p in self.participants.values() if p.points > participant.points)
+
+
+class RoomHub:
+    """Registry aller offenen Räume"""
+
+    def __init__(self):
+        self._rooms: Dict[str, Room] = {}
+        self._lock = threading.Lock()
+
+    def _new_code(self) -> str:
+        while True:
+            code = "".join(secrets.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH))
+            if code not in self._rooms:
+                return code
+
+    def create(self, quiz: CompiledQuiz, host: str, question_seconds: int = QUESTION_SECONDS,
+               on_finish: Optional[Callable[[Room, int, List[ParticipantResult]], None]] = None) -> Room:
+        """on_finish(raum, gestellte Fragen, Ergebnisse) speichert die Ergebnisse, wenn der Raum endet oder geschlossen wird"""
+        with self._lock:
+            expired = self._sweep()
+            room = Room(self._new_code(), quiz, host, question_seconds, on_finish)
+            self._rooms[room.code] = room
+        for old in expired:
+            old.save_results()
+        LOG.info("Live-Raum %s für '%s' von %s eröffnet", room.code, quiz.quiz_id, host)
+        return room
+
+    def get(self, code: str) -> Optional[Room]:
+        with self._lock:
+            return self._rooms.get(code.strip().upper())
+
+    def close(self, code: str) -> None:
+        """Schließt einen Raum; bereits gespielte Fragen werden noch gespeichert"""
+        with self._lock:
+            room = self._rooms.pop(code, None)
+        if room is not None:
+            room.save_results()
+
+    def rooms(self) -> List[Room]:
+        with self._lock:
+            return list(self._rooms.values())
+
+    def _sweep(self) -> List[Room]:
+        """Entfernt abgelaufene Räume (unter self._lock) und gibt sie zum Speichern zurück"""
+        cutoff = time.monotonic() - ROOM_TTL
+        expired = [code for code, room in self._rooms.items() if room.last_activity < cutoff]
+        return [self._rooms.pop(code) for code in expired]
+
+
+_hub: Optional[RoomHub] = None
+_hub_lock = threading.Lock()
+
+
+def get_room_hub() -> RoomHub:
+    """Gibt den prozessweiten RoomHub zurück"""
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = RoomHub()
+        return _hub
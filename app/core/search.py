@@ -0,0 +1,225 @@
+"""
+Volltextsuche über alle Fragen des Katalogs
+
+Invertierter Index im Prozess: pro Suchbegriff eine Posting-Liste
+{(quiz_id, frage_id): Häufigkeit}. Indexiert werden Frage- und Optionstexte,
+die Frage zählt dabei doppelt. Gerankt wird mit BM25; der letzte Begriff der
+Eingabe wird zusätzlich als Präfix gesucht (Suche beim Tippen).
+
+Normalisierung für deutsche Texte: Kleinschreibung, Umlaute gefaltet
+(ä -> ae, ö -> oe, ü -> ue, ß -> ss, übrige Akzente entfernt), Stoppwörter
+raus und einfache Endungen abgeschnitten ("Göttinnen" und "Göttin" treffen
+sich also).
+
+Der Index wird einmal aus dem Katalog aufgebaut. Danach wird bei jeder Suche
+nur das Manifest verglichen (der Katalog prüft die Dateien höchstens alle
+paar Sekunden): Quizze mit neuer Version werden aus dem Index genommen und
+neu eingetragen, alle anderen bleiben unberührt.
+
+Created by l1rox3 • 2025
+"""
+
+import bisect
+import logging
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from core.catalog import QuizCatalog, get_catalog
+
+LOG = logging.getLogger("quiz.search")
+
+QUESTION_WEIGHT = 2
+PREFIX_EXPANSIONS = 20   # höchstens so viele Begriffe pro Präfix
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+DocId = Tuple[str, int]
+
+_FOLD = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+_TOKEN = re.compile(r"[a-z0-9]+")
+_SUFFIXES = ("innen", "ungen", "heit", "keit", "ung", "en", "er", "es", "em", "e", "n", "s")
+STOPWORDS = frozenset("""
+    aber alle als also am an auch auf aus bei bin bis das dass dem den der des die dies diese
+    dieser du durch ein eine einem einen einer eines er es fuer hat hatte ich ihr im in ist ja
+    kein man mit nach nicht noch nur oder sein sich sie sind so und uns von vom vor war was
+    welche welcher welches wer wie wir wird wo zu zum zur
+""".split())
+
+
+# ---------------------- NORMALISIERUNG ----------------------
+def fold(text: str) -> str:
+    """Kleinschreibung und Umlaut-Faltung, übrige Akzente werden entfernt"""
+    text = text.lower().translate(_FOLD)
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def stem(token: str) -> str:
+    """Schneidet eine häufige Endung ab, solange mindestens 4 Zeichen übrig bleiben"""
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 4:
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [stem(t) for t in _TOKEN.findall(fold(text)) if t not in STOPWORDS]
+
+
+# ---------------------- INDEX ----------------------
+@dataclass
+class SearchHit:
+    quiz_id: str
+    quiz_title: str
+    question_id: int
+    question: str
+    options: Tuple[str, ...]
+    answer: str
+    score: float
+
+
+class QuestionIndex:
+    def __init__(self, catalog: Optional[QuizCatalog] = None):
+        self._catalog = catalog
+        self._postings: Dict[str, Dict[DocId, int]] = {}
+        self._doc_terms: Dict[DocId, Counter] = {}
+        self._doc_len: Dict[DocId, int] = {}
+        self._total_len = 0
+        self._quizzes: Dict[str, Tuple[str, str, int]] = {}     # quiz -> (version, titel, fragen)
+        self._vocabulary: Optional[List[str]] = None             # sortiert, für Präfixe
+        self._lock = threading.RLock()
+
+    @property
+    def catalog(self) -> QuizCatalog:
+        return self._catalog or get_catalog()
+
+    # ---------- Pflege ----------
+    def _add(self, doc: DocId, terms: Counter) -> None:
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[doc] = tf
+        self._doc_terms[doc] = terms
+        length = sum(terms.values())
+        self._doc_len[doc] = length
+        self._total_len += length
+
+    def _remove_quiz(self, quiz_id: str) -> None:
+        _, _, count = self._quizzes.pop(quiz_id)
+        for qid in range(count):
+            doc = (quiz_id, qid)
+            for term in self._doc_terms.pop(doc, ()):
+                postings = self._postings[term]
+                del postings[doc]
+                if not postings:
+                    del self._postings[term]
+            self._total_len -= self._doc_len.pop(doc, 0)
+
+    def _add_quiz(self, quiz_id: str, title: str) -> None:
+        quiz = self.catalog.get(quiz_id)
+        if quiz is None:
+            return
+        for qid, question in enumerate(quiz.questions):
+            terms = Counter()
+            for _ in range(QUESTION_WEIGHT):
+                terms.update(tokenize(question))
+            for option in quiz.options[qid]:
+                terms.update(tokenize(option))
+            self._add((quiz_id, qid), terms)
+        self._quizzes[quiz_id] = (quiz.version, title, len(quiz.questions))
+
+    def sync(self) -> int:
+        """Gleicht den Index mit dem Katalog ab, gibt die Zahl neu indexierter Quizze zurück"""
+        with self._lock:
+            manifest = {info.quiz_id: info for info in self.catalog.manifest()}
+            changed = 0
+            for quiz_id in list(self._quizzes):
+                info = manifest.get(quiz_id)
+                if info is None or info.version != self._quizzes[quiz_id][0]:
+                    self._remove_quiz(quiz_id)
+            for quiz_id, info in manifest.items():
+                if quiz_id not in self._quizzes:
+                    self._add_quiz(quiz_id, info.title)
+                    changed += 1
+            if changed or len(self._quizzes) != len(manifest):
+                self._vocabulary = None
+            if changed:
+                LOG.info("Suchindex: %d Quiz(ze) neu indexiert, %d Fragen, %d Begriffe",
+                         changed, len(self._doc_len), len(self._postings))
+            return changed
+
+    # ---------- Suche ----------
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        terms = []
+        for term in self._vocabulary[start:start + PREFIX_EXPANSIONS]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def search(self, query: str, limit: int = 20) -> List[SearchHit]:
+        """BM25-Ranking über Frage- und Optionstexte"""
+        with self._lock:
+            self.sync()
+            tokens = [t for t in _TOKEN.findall(fold(query)) if t not in STOPWORDS]
+            if not tokens or not self._doc_len:
+                return []
+            terms = [stem(t) for t in tokens]
+            # Letztes Wort beim Tippen evtl. unvollständig: auch als Präfix suchen
+            if not query[-1:].isspace():
+                terms += [t for t in self._expand_prefix(tokens[-1]) if t not in terms]
+
+            n_docs = len(self._doc_len)
+            avg_len = self._total_len / n_docs
+            scores: Dict[DocId, float] = {}
+            for term in set(terms):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc, tf in postings.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_len[doc] / avg_len)
+                    scores[doc] = scores.get(doc, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+            hits = []
+            for (quiz_id, qid), score in sorted(scores.items(), key=lambda item: -item[1])[:limit]:
+                quiz = self.catalog.get(quiz_id)
+                if quiz is None:
+                    continue
+                hits.append(SearchHit(
+                    quiz_id=quiz_id,
+                    quiz_title=self._quizzes[quiz_id][1],
+                    question_id=qid,
+                    question=quiz.questions[qid],
+                    options=quiz.options[qid],
+                    answer=quiz.options[qid][quiz.answers[qid]],
+                    score=round(score, 3),
+                ))
+            return hits
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"quizzes": len(self._quizzes), "questions": len(self._doc_len), "terms": len(self._postings)}
+
+
+_index: Optional[QuestionIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_question_index() -> QuestionIndex:
+    """Gibt den prozessweiten Suchindex zurück (aufgebaut beim ersten Zugriff)"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            started = time.perf_counter()
+            _index = QuestionIndex()
+            _index.sync()
+            LOG.info("Suchindex in %.1f ms aufgebaut", (time.perf_counter() - started) * 1000)
+        return _index
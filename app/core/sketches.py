@@ -0,0 +1,371 @@
+"""
+Mergebare Streaming-Sketches für Punkte- und Zeitverteilungen
+
+- DDSketch: Quantile mit relativer Genauigkeit (Standard 1%), mergebar durch
+  Addition der Bucket-Zähler.
+- FixedHistogram: feste Bins, mergebar solange die Grenzen gleich sind.
+
+Der SketchStore hält pro Quiz und Tag (Zeitfenster) je einen Sketch und ein
+Histogramm pro Metrik und speichert alles in ./data/stats/sketches.json.
+save_result aktualisiert ihn, Abfragen mergen nur die betroffenen Fenster.
+
+Created by l1rox3 • 2025
+"""
+
+import bisect
+import json
+import logging
+import math
+import os
+import threading
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.results import get_results_store, is_ranked, quiz_id_of
+
+LOG = logging.getLogger("quiz.sketches")
+
+STATS_DIR = "./data/stats"
+SKETCHES_FILE = os.path.join(STATS_DIR, "sketches.json")
+
+# Metrik -> Histogramm-Grenzen (letzter Bin ist offen nach oben)
+METRICS: Dict[str, List[float]] = {
+    "percentage": [0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100],
+    "time_taken": [0, 30, 60, 90, 120, 180, 240, 300, 420, 600],
+    "avg_time_per_question": [0, 2, 4, 6, 8, 10, 15, 20, 30, 45, 60],
+}
+
+# ---------------------- DDSKETCH ----------------------
+class DDSketch:
+    """Quantil-Sketch mit relativer Genauigkeit (nur Werte >= 0)"""
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value: float, weight: int = 1) -> None:
+        value = float(value)
+        if value < 0 or math.isnan(value):
+            return
+        if value < 1e-9:
+            self.zero_count += weight
+        else:
+            key = self._key(value)
+            self.bins[key] = self.bins.get(key, 0) + weight
+            if len(self.bins) > self.max_bins:
+                self._collapse()
+        self.count += weight
+        self.total += value * weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def _collapse(self) -> None:
+        # Kleinste Buckets zusammenlegen (hohe Quantile bleiben exakt)
+        keys = sorted(self.bins)
+        excess = keys[:len(keys) - self.max_bins + 1]
+        merged = sum(self.bins.pop(k) for k in excess)
+        target = keys[len(excess)]
+        self.bins[target] = self.bins.get(target, 0) + merged
+
+    def merge(self, other: "DDSketch") -> None:
+        if other.gamma != self.gamma:
+            raise ValueError("Sketches mit unterschiedlicher Genauigkeit können nicht gemergt werden")
+        for key, n in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + n
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Gibt das q-Quantil (0..1) zurück oder None, wenn leer"""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                return min(max(self._value(key), self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def to_dict(self) -> Dict:
+        return {
+            "alpha": self.relative_accuracy,
+            "bins": {str(k): n for k, n in self.bins.items()},
+            "zero": self.zero_count,
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "DDSketch":
+        sketch = cls(relative_accuracy=data.get("alpha", 0.01))
+        sketch.bins = {int(k): int(n) for k, n in data.get("bins", {}).items()}
+        sketch.zero_count = data.get("zero", 0)
+        sketch.count = data.get("count", 0)
+        sketch.total = data.get("sum", 0.0)
+        if sketch.count:
+            sketch.min = data.get("min", math.inf)
+            sketch.max = data.get("max", -math.inf)
+        return sketch
+
+# ---------------------- HISTOGRAMM ----------------------
+class FixedHistogram:
+    """Histogramm mit festen Grenzen; Bin i zählt edges[i] <= x < edges[i+1]"""
+
+    def __init__(self, edges: List[float]):
+        self.edges = list(edges)
+        self.counts = [0] * len(self.edges)
+
+    def add(self, value: float, weight: int = 1) -> None:
+        idx = bisect.bisect_right(self.edges, value) - 1
+        self.counts[max(idx, 0)] += weight
+
+    def merge(self, other: "FixedHistogram") -> None:
+        if other.edges != self.edges:
+            raise ValueError("Histogramme mit unterschiedlichen Grenzen können nicht gemergt werden")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+
+    def labels(self) -> List[str]:
+        out = []
+        for i, lo in enumerate(self.edges):
+            hi = self.edges[i + 1] if i + 1 < len(self.edges) else None
+            out.append(f"{lo:g}–{hi:g}" if hi is not None else f"≥{lo:g}")
+        return out
+
+    def to_dict(self) -> Dict:
+        return {"edges": self.edges, "counts": self.counts}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "FixedHistogram":
+        hist = cls(data["edges"])
+        hist.counts = list(data["counts"])
+        return hist
+
+# ---------------------- SKETCH STORE ----------------------
+class MetricSummary:
+    """Sketch + Histogramm einer Metrik"""
+
+    def __init__(self, metric: str):
+        self.metric = metric
+        self.sketch = DDSketch()
+        self.hist = FixedHistogram(METRICS[metric])
+
+    def add(self, value: float) -> None:
+        self.sketch.add(value)
+        self.hist.add(value)
+
+    def merge(self, other: "MetricSummary") -> None:
+        self.sketch.merge(other.sketch)
+        self.hist.merge(other.hist)
+
+    def percentiles(self, qs: Iterable[float] = (0.5, 0.9, 0.99)) -> Dict[str, Optional[float]]:
+        return {f"p{round(q * 100)}": self.sketch.quantile(q) for q in qs}
+
+    def to_dict(self) -> Dict:
+        return {"sketch": self.sketch.to_dict(), "hist": self.hist.to_dict()}
+
+    @classmethod
+    def from_dict(cls, metric: str, data: Dict) -> "MetricSummary":
+        summary = cls(metric)
+        summary.sketch = DDSketch.from_dict(data["sketch"])
+        hist = FixedHistogram.from_dict(data["hist"])
+        if hist.edges == summary.hist.edges:
+            summary.hist = hist
+        return summary
+
+
+def _window_of(result: Dict) -> str:
+    try:
+        return datetime.fromisoformat(result.get("timestamp", "")).date().isoformat()
+    except (TypeError, ValueError):
+        return date.today().isoformat()
+
+
+class SketchStore:
+    """
+    Persistierte Sketches pro Quiz und Tag.
+
+    Struktur: {quiz_id: {"YYYY-MM-DD": {metrik: MetricSummary}}}
+    """
+
+    def __init__(self, path: str = SKETCHES_FILE):
+        self.path = path
+        self._windows: Dict[str, Dict[str, Dict[str, MetricSummary]]] = {}
+        self._lock = threading.RLock()
+        self._loaded = False
+
+    # ---------- Persistenz ----------
+    def load(self) -> bool:
+        """Lädt gespeicherte Sketches, gibt False zurück wenn keine Datei existiert"""
+        with self._lock:
+            self._loaded = True
+            if not os.path.exists(self.path):
+                return False
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                LOG.error("Fehler beim Laden von %s: %s", self.path, e)
+                return False
+            self._windows = {
+                quiz: {
+                    window: {m: MetricSummary.from_dict(m, d) for m, d in metrics.items() if m in METRICS}
+                    for window, metrics in windows.items()
+                }
+                for quiz, windows in data.get("quizzes", {}).items()
+            }
+            return True
+
+    def save(self) -> None:
+        with self._lock:
+            data = {
+                "version": 1,
+                "quizzes": {
+                    quiz: {
+                        window: {m: s.to_dict() for m, s in metrics.items()}
+                        for window, metrics in windows.items()
+                    }
+                    for quiz, windows in self._windows.items()
+                },
+            }
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_file = f"{self.path}.tmp"
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(temp_file, self.path)
+
+    def ensure_loaded(self, results: Optional[Iterable[Dict]] = None, base: Optional["SketchStore"] = None) -> None:
+        """Lädt die Datei einmal; fehlt sie, wird aus den Ergebnissen (+ base) nachgebaut"""
+        with self._lock:
+            if self._loaded:
+                return
+            if not self.load() and results is not None:
+                self.rebuild(results, base)
+                LOG.info("Sketches aus vorhandenen Ergebnissen aufgebaut")
+
+    def rebuild(self, results: Iterable[Dict], base: Optional["SketchStore"] = None) -> None:
+        """
+        Baut alle Sketches neu auf (z.B. nach dem Entfernen von Duplikaten).
+
+        base enthält bereits voraggregierte Beiträge, deren Rohdaten nicht mehr
+        im heißen Bestand liegen (Archiv).
+        """
+        with self._lock:
+            self._windows = {}
+            for result in results:
+                self._record(result)
+            if base is not None:
+                self.merge_from(base)
+            self._loaded = True
+            self.save()
+
+    def merge_from(self, other: "SketchStore") -> None:
+        """Addiert alle Fenster eines anderen Stores"""
+        with self._lock, other._lock:
+            for quiz, windows in other._windows.items():
+                for window, metrics in windows.items():
+                    target = self._windows.setdefault(quiz, {}).setdefault(window, {})
+                    for metric, summary in metrics.items():
+                        if metric not in target:
+                            target[metric] = MetricSummary(metric)
+                        target[metric].merge(summary)
+
+    # ---------- Schreiben ----------
+    def _record(self, result: Dict) -> None:
+        if not is_ranked(result):
+            return      # adaptive Durchläufe verzerren Prozent und Dauer
+        metrics = self._windows.setdefault(quiz_id_of(result), {}).setdefault(_window_of(result), {})
+        for metric in METRICS:
+            value = result.get(metric)
+            if value is None:
+                continue
+            if metric not in metrics:
+                metrics[metric] = MetricSummary(metric)
+            metrics[metric].add(value)
+
+    def record(self, result: Dict, persist: bool = True) -> None:
+        """Nimmt ein neues Ergebnis auf (aus save_result)"""
+        with self._lock:
+            self._record(result)
+            if persist:
+                try:
+                    self.save()
+                except OSError as e:
+                    LOG.error("Sketches konnten nicht gespeichert werden: %s", e)
+
+    # ---------- Abfragen ----------
+    def quizzes(self) -> List[str]:
+        with self._lock:
+            return sorted(self._windows)
+
+    def window_range(self) -> Tuple[Optional[date], Optional[date]]:
+        with self._lock:
+            days = [w for windows in self._windows.values() for w in windows]
+        if not days:
+            return None, None
+        return date.fromisoformat(min(days)), date.fromisoformat(max(days))
+
+    def query(
+        self,
+        metric: str,
+        quizzes: Optional[Iterable[str]] = None,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+    ) -> MetricSummary:
+        """Merged alle Fenster der gewählten Quizze im Zeitraum"""
+        merged = MetricSummary(metric)
+        selected = set(quizzes) if quizzes else None
+        with self._lock:
+            for quiz, windows in self._windows.items():
+                if selected is not None and quiz not in selected:
+                    continue
+                for window, metrics in windows.items():
+                    if since and window < since.isoformat():
+                        continue
+                    if until and window > until.isoformat():
+                        continue
+                    if metric in metrics:
+                        merged.merge(metrics[metric])
+        return merged
+
+
+_store: Optional[SketchStore] = None
+_store_lock = threading.Lock()
+
+
+def get_sketch_store() -> SketchStore:
+    """Gibt den prozessweiten SketchStore zurück (lädt bzw. baut ihn beim ersten Zugriff)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            from core.retention import get_archive
+            _store = SketchStore()
+            _store.ensure_loaded(get_results_store().all(), base=get_archive().sketches)
+        return _store
@@ -0,0 +1,715 @@
+"""
+Stylesheets der Seiten: einmal pro Prozess und Theme kompiliert
+
+main.py, pages/quizzes.py und pages/admin.py haben je ein eigenes Stylesheet
+(KINDS), das sich nur über die Farben des Themes unterscheidet. Statt das CSS
+bei jedem Rerun als f-String zu bauen und per st.markdown mitzuschicken, wird
+es hier einmal pro (Seite, Theme) gebaut und unter einem Inhalts-Hash
+abgelegt: static/css/<seite>-<hash>.css neben main.py. Streamlit liefert den
+Ordner mit server.enableStaticServing unter app/static/ aus; pro Rerun geht
+dann nur noch ein <link> an den Browser, der die Datei selbst zwischenspeichert.
+Ändert sich das CSS (anderes Theme, neue Regeln), ändert sich der Hash und damit
+die URL.
+
+Änderungen an den Vorlagen hier wirken erst nach einem Neustart des Servers.
+
+Created by l1rox3 • 2025
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Tuple
+
+LOG = logging.getLogger("quiz.styles")
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+CSS_DIR = os.path.join(STATIC_DIR, "css")
+STATIC_URL = "app/static/css"     # relativ zur Seite, funktioniert auch mit server.baseUrlPath
+
+
+@dataclass(frozen=True)
+class Stylesheet:
+    kind: str
+    css: str
+    digest: str                   # sha256 des CSS, gekürzt
+
+    @property
+    def filename(self) -> str:
+        return f"{self.kind}-{self.digest}.css"
+
+    @property
+    def url(self) -> str:
+        return f"{STATIC_URL}/{self.filename}"
+
+
+# ---------- Vorlagen ----------
+def _main_css(t: Dict[str, str]) -> str:
+    """main.py: Dashboard, Login, Theme-Auswahl, Footer"""
+    return f"""
+    @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@400;600;700;800&display=swap');
+
+    /* Global Styles */
+    html, body, .stApp {{
+        background: {t['bg']};
+        color: {t['text']};
+        font-family: 'Poppins', -apple-system, BlinkMacSystemFont, sans-serif;
+    }}
+
+    .block-container {{
+        padding-top: 2rem;
+        padding-bottom: 4rem;
+        max-width: 1200px;
+    }}
+
+    /* Header Styles */
+    .main-header {{
+        background: {t['card_gradient']};
+        padding: 2.5rem;
+        border-radius: 25px;
+        text-align: center;
+        margin-bottom: 2.5rem;
+        box-shadow: 0 15px 40px rgba(0,0,0,0.3);
+    }}
+
+    .main-title {{
+        font-size: 3rem;
+        font-weight: 800;
+        color: white;
+        margin: 0;
+        text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
+        letter-spacing: -0.02em;
+    }}
+
+    .main-subtitle {{
+        font-size: 1.3rem;
+        color: rgba(255,255,255,0.9);
+        margin-top: 0.5rem;
+        font-weight: 500;
+    }}
+
+    /* Cards */
+    .action-card {{
+        background: {t['surface']};
+        border: 1px solid {t['border']};
+        border-radius: 20px;
+        padding: 2rem;
+        text-align: center;
+        transition: all 0.3s ease;
+        backdrop-filter: blur(10px);
+        height: 100%;
+    }}
+
+    .action-card:hover {{
+        transform: translateY(-8px);
+        box-shadow: 0 15px 40px rgba(102, 126, 234, 0.3);
+        border-color: {t['accent']};
+    }}
+
+    .action-card h3 {{
+        font-size: 2rem;
+        margin-bottom: 0.5rem;
+    }}
+
+    .action-card p {{
+        color: {t['text_secondary']};
+        font-size: 1.1rem;
+    }}
+
+    /* Stats Cards */
+    .stats-card {{
+        background: {t['surface']};
+        border: 1px solid {t['border']};
+        border-radius: 18px;
+        padding: 1.5rem;
+        text-align: center;
+        backdrop-filter: blur(10px);
+        transition: all 0.3s ease;
+    }}
+
+    .stats-card:hover {{
+        transform: translateY(-5px);
+        box-shadow: 0 10px 30px rgba(0,0,0,0.2);
+    }}
+
+    .stats-label {{
+        color: {t['text_secondary']};
+        font-size: 0.95rem;
+        text-transform: uppercase;
+        letter-spacing: 1px;
+        font-weight: 600;
+        margin-bottom: 0.5rem;
+    }}
+
+    .stats-value {{
+        color: {t['text']};
+        font-size: 2.5rem;
+        font-weight: 800;
+    }}
+
+    /* Leaderboard */
+    .leaderboard-item {{
+        background: {t['surface']};
+        border: 1px solid {t['border']};
+        border-radius: 15px;
+        padding: 1.5rem;
+        margin: 0.8rem 0;
+        display: flex;
+        justify-content: space-between;
+        align-items: center;
+        transition: all 0.3s ease;
+        backdrop-filter: blur(10px);
+    }}
+
+    .leaderboard-item:hover {{
+        transform: translateX(8px);
+        box-shadow: 0 8px 25px rgba(102, 126, 234, 0.2);
+        border-color: {t['accent']};
+    }}
+
+    .leaderboard-rank {{
+        font-weight: 800;
+        color: {t['accent']};
+        font-size: 1.5rem;
+        min-width: 3.5rem;
+        text-align: center;
+    }}
+
+    /* Buttons */
+    .stButton > button {{
+        background: {t['card_gradient']} !important;
+        color: white !important;
+        border: none !important;
+        border-radius: 15px !important;
+        padding: 1rem 2rem !important;
+        font-weight: 700 !important;
+        font-size: 1.1rem !important;
+        box-shadow: 0 8px 20px rgba(0,0,0,0.2);
+        transition: all 0.3s ease !important;
+        text-transform: uppercase;
+        letter-spacing: 0.5px;
+    }}
+
+    .stButton > button:hover {{
+        transform: translateY(-3px) !important;
+        box-shadow: 0 12px 30px rgba(102, 126, 234, 0.4) !important;
+    }}
+
+    /* Inputs */
+    input, textarea, select {{
+        background: {t['surface']} !important;
+        border: 1px solid {t['border']} !important;
+        border-radius: 12px !important;
+        color: {t['text']} !important;
+        padding: 0.8rem !important;
+        font-size: 1rem !important;
+    }}
+
+    input:focus, textarea:focus, select:focus {{
+        border-color: {t['accent']} !important;
+        box-shadow: 0 0 0 2px {t['accent']}33 !important;
+    }}
+
+    /* PDF Card */
+    .pdf-card {{
+        background: {t['surface']};
+        border: 1px solid {t['border']};
+        border-radius: 20px;
+        padding: 2rem;
+        backdrop-filter: blur(10px);
+        margin: 1rem 0;
+    }}
+
+    /* Tabs */
+    .stTabs [data-baseweb="tab-list"] {{
+        gap: 1rem;
+        background: {t['surface']};
+        padding: 0.5rem;
+        border-radius: 15px;
+        border: 1px solid {t['border']};
+    }}
+
+    .stTabs [data-baseweb="tab"] {{
+        color: {t['text_secondary']};
+        border-radius: 10px;
+        padding: 0.8rem 1.5rem;
+        font-weight: 600;
+    }}
+
+    .stTabs [aria-selected="true"] {{
+        background: {t['card_gradient']};
+        color: white;
+    }}
+
+    /* Theme Preview */
+    .theme-preview {{
+        border: 2px solid {t['border']};
+        border-radius: 15px;
+        padding: 1.5rem;
+        cursor: pointer;
+        transition: all 0.3s ease;
+        text-align: center;
+    }}
+
+    .theme-preview:hover {{
+        transform: scale(1.05);
+        box-shadow: 0 10px 30px rgba(0,0,0,0.2);
+    }}
+
+    .theme-preview.active {{
+        border-color: {t['accent']};
+        background: {t['surface']};
+        box-shadow: 0 0 0 3px {t['accent']}33;
+    }}
+
+    /* Login Card */
+    .login-card {{
+        background: {t['surface']};
+        border: 1px solid {t['border']};
+        border-radius: 25px;
+        padding: 3rem;
+        max-width: 500px;
+        margin: 4rem auto;
+        backdrop-filter: blur(10px);
+        box-shadow: 0 20px 60px rgba(0,0,0,0.3);
+    }}
+
+    /* Footer */
+    .footer {{
+        position: fixed;
+        bottom: 0;
+        left: 0;
+        right: 0;
+        background: {t['surface']};
+        border-top: 1px solid {t['border']};
+        padding: 1rem;
+        text-align: center;
+        backdrop-filter: blur(10px);
+        z-index: 999;
+    }}
+
+    .footer-text {{
+        color: {t['text_secondary']};
+        font-size: 0.9rem;
+        margin: 0;
+    }}
+
+    .footer-link {{
+        color: {t['accent']};
+        text-decoration: none;
+        font-weight: 700;
+        transition: all 0.2s ease;
+    }}
+
+    .footer-link:hover {{
+        color: {t['accent_hover']};
+        text-decoration: underline;
+    }}
+
+    /* Hide Streamlit Elements */
+    #MainMenu, header, footer {{visibility: hidden;}}
+    .stDeployButton {{display: none;}}
+
+    /* Spacing */
+    h1, h2, h3 {{
+        color: {t['text']};
+        font-weight: 700;
+    }}
+
+    p, span, div, label {{
+        color: {t['text']};
+    }}
+"""
+
+
+def _quizzes_css(t: Dict[str, str]) -> str:
+    """pages/quizzes.py: Fragen, Statistiken, Ergebnis"""
+    return f"""
+    .stApp {{
+        background: {t['bg']};
+    }}
+
+    .main-title {{
+        font-size: 3rem;
+        font-weight: 800;
+        text-align: center;
+        color: {t['text']};
+        margin-bottom: 2rem;
+        text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
+    }}
+
+    .question-card {{
+        background: {t['surface']};
+        border: 2px solid {t['border']};
+        border-radius: 20px;
+        padding: 2.5rem;
+        margin: 2rem 0;
+        backdrop-filter: blur(10px);
+    }}
+
+    .question-text {{
+        font-size: 1.8rem;
+        font-weight: 600;
+        color: {t['text']};
+        margin-bottom: 2rem;
+        text-align: center;
+    }}
+
+    .stats-card {{
+        background: {t['surface']};
+        border: 2px solid {t['border']};
+        border-radius: 15px;
+        padding: 1.5rem;
+        text-align: center;
+        backdrop-filter: blur(10px);
+    }}
+
+    .stat-value {{
+        font-size: 2.5rem;
+        font-weight: 800;
+        color: {t['accent']};
+    }}
+
+    .stat-label {{
+        font-size: 1rem;
+        color: {t['text_secondary']};
+        margin-top: 0.5rem;
+    }}
+
+    .stButton > button {{
+        border-radius: 15px;
+        border: 2px solid {t['border']};
+        background: {t['surface']};
+        color: {t['text']};
+        transition: all 0.3s ease;
+        font-weight: 600;
+        padding: 1.5rem 1rem;
+        font-size: 1.1rem;
+        height: auto;
+        min-height: 80px;
+        white-space: normal;
+        word-wrap: break-word;
+    }}
+
+    .stButton > button:hover {{
+        background: {t['card_gradient']};
+        transform: translateY(-2px);
+        box-shadow: 0 5px 15px rgba(0,0,0,0.3);
+    }}
+
+    .result-card {{
+        background: {t['card_gradient']};
+        border-radius: 20px;
+        padding: 3rem;
+        text-align: center;
+        margin: 2rem 0;
+        box-shadow: 0 20px 60px rgba(0,0,0,0.4);
+    }}
+
+    .result-score {{
+        font-size: 5rem;
+        font-weight: 900;
+        color: {t['text']};
+    }}
+"""
+
+
+def _admin_css(t: Dict[str, str]) -> str:
+    """pages/admin.py: dunkles Admin-Theme"""
+    return f"""
+    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
+
+    * {{
+        font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
+    }}
+
+    .stApp {{
+        background: {t['bg']};
+        color: {t['text']};
+    }}
+
+    .main .block-container {{
+        padding-top: 2rem;
+        padding-bottom: 2rem;
+    }}
+
+    /* Header */
+    .admin-header {{
+        background: linear-gradient(135deg, {t['surface']} 0%, {t['card_bg']} 100%);
+        border-radius: 16px;
+        padding: 2.5rem;
+        margin-bottom: 2rem;
+        border: 1px solid {t['border']};
+        text-align: center;
+    }}
+
+    .admin-title {{
+        font-size: 2.5rem;
+        font-weight: 700;
+        background: linear-gradient(135deg, {t['accent']}, {t['success']});
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+        margin-bottom: 0.5rem;
+    }}
+
+    .admin-subtitle {{
+        color: {t['text_secondary']};
+        font-size: 1.1rem;
+        font-weight: 400;
+    }}
+
+    /* Cards */
+    .stats-card {{
+        background: {t['card_bg']};
+        border: 1px solid {t['border']};
+        border-radius: 12px;
+        padding: 1.5rem;
+        text-align: center;
+        transition: all 0.3s ease;
+    }}
+
+    .stats-card:hover {{
+        transform: translateY(-5px);
+        border-color: {t['accent']};
+        box-shadow: 0 10px 30px rgba(59, 130, 246, 0.1);
+    }}
+
+    .stats-value {{
+        font-size: 2.5rem;
+        font-weight: 700;
+        color: {t['accent']};
+        margin: 0.5rem 0;
+    }}
+
+    .stats-label {{
+        color: {t['text_secondary']};
+        font-size: 0.9rem;
+        font-weight: 500;
+        text-transform: uppercase;
+        letter-spacing: 0.5px;
+    }}
+
+    /* User Cards */
+    .user-card {{
+        background: {t['card_bg']};
+        border: 1px solid {t['border']};
+        border-radius: 12px;
+        padding: 1.5rem;
+        margin: 0.75rem 0;
+        transition: all 0.2s ease;
+    }}
+
+    .user-card:hover {{
+        border-color: {t['accent']};
+        transform: translateX(5px);
+    }}
+
+    .user-header {{
+        display: flex;
+        justify-content: space-between;
+        align-items: center;
+        margin-bottom: 1rem;
+    }}
+
+    .user-name {{
+        font-size: 1.2rem;
+        font-weight: 600;
+        color: {t['text']};
+    }}
+
+    .badge {{
+        padding: 0.3rem 0.8rem;
+        border-radius: 20px;
+        font-size: 0.75rem;
+        font-weight: 600;
+        text-transform: uppercase;
+    }}
+
+    .badge-admin {{
+        background: {t['accent']}20;
+        color: {t['accent']};
+        border: 1px solid {t['accent']};
+    }}
+
+    .badge-user {{
+        background: {t['success']}20;
+        color: {t['success']};
+        border: 1px solid {t['success']};
+    }}
+
+    .badge-active {{
+        background: {t['success']}20;
+        color: {t['success']};
+    }}
+
+    .badge-blocked {{
+        background: {t['error']}20;
+        color: {t['error']};
+    }}
+
+    /* Buttons */
+    .stButton > button {{
+        background: {t['surface_light']};
+        color: {t['text']} !important;
+        border: 1px solid {t['border']};
+        border-radius: 8px;
+        padding: 0.6rem 1.2rem;
+        font-weight: 500;
+        transition: all 0.2s ease;
+    }}
+
+    .stButton > button:hover {{
+        background: {t['accent']};
+        border-color: {t['accent']};
+        transform: translateY(-2px);
+    }}
+
+    .btn-success button {{
+        background: {t['success']} !important;
+        border-color: {t['success']} !important;
+    }}
+
+    .btn-danger button {{
+        background: {t['error']} !important;
+        border-color: {t['error']} !important;
+    }}
+
+    .btn-warning button {{
+        background: {t['warning']} !important;
+        border-color: {t['warning']} !important;
+    }}
+
+    /* Tabs */
+    .stTabs [data-baseweb="tab-list"] {{
+        gap: 0;
+        background: transparent;
+        border-bottom: 1px solid {t['border']};
+    }}
+
+    .stTabs [data-baseweb="tab"] {{
+        border-radius: 8px 8px 0 0;
+        color: {t['text_secondary']} !important;
+        font-weight: 500;
+        padding: 0.75rem 1.5rem;
+        border: none;
+        background: transparent;
+    }}
+
+    .stTabs [aria-selected="true"] {{
+        background: {t['accent']} !important;
+        color: white !important;
+    }}
+
+    /* Tables */
+    .dataframe {{
+        background: {t['card_bg']} !important;
+        color: {t['text']} !important;
+    }}
+
+    .dataframe th {{
+        background: {t['surface']} !important;
+        color: {t['text']} !important;
+    }}
+
+    .dataframe td {{
+        background: {t['card_bg']} !important;
+        color: {t['text']} !important;
+        border-color: {t['border']} !important;
+    }}
+
+    /* Sidebar */
+    [data-testid="stSidebar"] {{
+        background: {t['surface']} !important;
+        border-right: 1px solid {t['border']};
+    }}
+
+    /* Progress bars */
+    .stProgress > div > div > div > div {{
+        background: linear-gradient(90deg, {t['accent']}, {t['success']});
+    }}
+
+    /* Hide Streamlit branding */
+    #MainMenu {{visibility: hidden;}}
+    footer {{visibility: hidden;}}
+    header {{visibility: hidden;}}
+
+    /* Custom scrollbar */
+    ::-webkit-scrollbar {{
+        width: 6px;
+    }}
+
+    ::-webkit-scrollbar-track {{
+        background: {t['bg']};
+    }}
+
+    ::-webkit-scrollbar-thumb {{
+        background: {t['border']};
+        border-radius: 3px;
+    }}
+
+    ::-webkit-scrollbar-thumb:hover {{
+        background: {t['accent']};
+    }}
+"""
+
+
+KINDS: Dict[str, Callable[[Dict[str, str]], str]] = {
+    "main": _main_css,
+    "quizzes": _quizzes_css,
+    "admin": _admin_css,
+}
+
+
+# ---------- Kompilieren & Ablegen ----------
+_cache: Dict[Tuple[str, str], Stylesheet] = {}
+_published: Dict[str, bool] = {}
+_lock = threading.Lock()
+
+
+def theme_key(theme: Dict[str, str]) -> str:
+    """Hash über die Farben eines Themes (Themes sind Dicts und nicht hashbar)"""
+    return hashlib.sha256(json.dumps(theme, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def compile_stylesheet(kind: str, theme: Dict[str, str]) -> Stylesheet:
+    """CSS der Seite kind für theme, einmal pro Prozess gebaut"""
+    key = (kind, theme_key(theme))
+    sheet = _cache.get(key)
+    if sheet is None:
+        css = KINDS[kind](theme)
+        sheet = Stylesheet(kind, css, hashlib.sha256(css.encode("utf-8")).hexdigest()[:12])
+        with _lock:
+            sheet = _cache.setdefault(key, sheet)
+    return sheet
+
+
+def publish(sheet: Stylesheet) -> bool:
+    """Legt das Stylesheet als static/css/<seite>-<hash>.css ab; False, wenn das nicht geht"""
+    published = _published.get(sheet.filename)
+    if published is not None:
+        return published
+    with _lock:
+        if sheet.filename not in _published:
+            _published[sheet.filename] = _write(sheet)
+        return _published[sheet.filename]
+
+
+def _write(sheet: Stylesheet) -> bool:
+    path = os.path.join(CSS_DIR, sheet.filename)
+    if os.path.exists(path):
+        return True          # gleicher Hash = gleicher Inhalt (früherer Prozess)
+    try:
+        os.makedirs(CSS_DIR, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=CSS_DIR, prefix=".tmp_", suffix=".css")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(sheet.css)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+        return True
+    except OSError as exc:
+        LOG.warning("Stylesheet %s konnte nicht abgelegt werden: %s", sheet.filename, exc)
+        return False
@@ -0,0 +1,53 @@
+"""
+Farb-Themes der App (gemeinsam für main.py und pages/quizzes.py)
+
+Liegt als Modul vor, damit das Dict einmal pro Prozess gebaut wird und nicht
+bei jedem Rerun der Seitenskripte neu.
+
+Created by l1rox3 • 2025
+"""
+
+from typing import Dict
+
+DEFAULT_THEME = "Purple Dream"
+
+THEMES: Dict[str, Dict[str, str]] = {
+    "Purple Dream": {
+        "name": "Purple Dream",
+        "bg": "linear-gradient(135deg, #0f0c29 0%, #302b63 50%, #24243e 100%)",
+        "surface": "rgba(255,255,255,0.05)",
+        "border": "rgba(255,255,255,0.1)",
+        "text": "#ffffff",
+        "text_secondary": "rgba(255,255,255,0.7)",
+        "accent": "#667eea",
+        "accent_hover": "#764ba2",
+        "card_gradient": "linear-gradient(135deg, #667eea 0%, #764ba2 100%)",
+    },
+    "Ocean Blue": {
+        "name": "Ocean Blue",
+        "bg": "linear-gradient(135deg, #0a192f 0%, #112240 50%, #1a365d 100%)",
+        "surface": "rgba(255,255,255,0.05)",
+        "border": "rgba(255,255,255,0.1)",
+        "text": "#ffffff",
+        "text_secondary": "rgba(255,255,255,0.7)",
+        "accent": "#3b82f6",
+        "accent_hover": "#60a5fa",
+        "card_gradient": "linear-gradient(135deg, #3b82f6 0%, #2563eb 100%)",
+    },
+    "Dark Minimal": {
+        "name": "Dark Minimal",
+        "bg": "linear-gradient(135deg, #0a0a0a 0%, #1a1a1a 50%, #0a0a0a 100%)",
+        "surface": "rgba(255,255,255,0.05)",
+        "border": "rgba(255,255,255,0.1)",
+        "text": "#ffffff",
+        "text_secondary": "rgba(255,255,255,0.6)",
+        "accent": "#ffffff",
+        "accent_hover": "#e5e5e5",
+        "card_gradient": "linear-gradient(135deg, #2a2a2a 0%, #1a1a1a 100%)",
+    },
+}
+
+
+def get_theme(name: str) -> Dict[str, str]:
+    """Theme nach Name, unbekannte Namen fallen auf DEFAULT_THEME zurück"""
+    return THEMES.get(name, THEMES[DEFAULT_THEME])
@@ -0,0 +1,178 @@
+"""
+Antwortzeiten: Denkzeit der Spieler vs. Renderzeit des Servers
+
+Alle Zeiten kommen aus time.monotonic() (keine Sprünge durch NTP/Zeitumstellung)
+und werden pro Frage getrennt erfasst:
+
+    render  Server: vom Eingang der vorherigen Antwort (bzw. Start des
+            Durchlaufs) bis die Frage fertig gerendert ist - Callback,
+            Bewertung, Auswahl der nächsten Frage und der Fragment-Lauf.
+    think   Spieler: von der fertig gerenderten Frage bis zum Eingang der
+            Antwort. Enthält unvermeidbar auch Netzwerk und Browser, aber
+            keinen Rerun mehr; das ist die Zeit, die in 'time' gespeichert
+            wird und in die Bestenliste eingeht.
+
+Pro Quiz, Frage und Art gibt es einen DDSketch (Perzentile) und ein festes
+Histogramm (siehe core.sketches), gespeichert in ./data/stats/timing.json
+mit dem nächsten Group Commit der Ergebnis-Queue. Fragen sind über ihren
+stabilen Schlüssel (CompiledQuiz.keys) erfasst, damit gelöschte oder
+umsortierte Fragen ihre Zeiten nicht an eine andere Frage weitergeben.
+
+Created by l1rox3 • 2025
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from core.catalog import get_catalog
+from core.sketches import STATS_DIR, DDSketch, FixedHistogram
+
+LOG = logging.getLogger("quiz.timing")
+
+TIMING_FILE = os.path.join(STATS_DIR, "timing.json")
+
+# Art -> Histogramm-Grenzen (think in Sekunden, render in Millisekunden)
+KINDS: Dict[str, List[float]] = {
+    "think": [0, 1, 2, 3, 5, 8, 13, 20, 30, 60],
+    "render": [0, 5, 10, 20, 50, 100, 200, 500, 1000],
+}
+UNITS = {"think": "s", "render": "ms"}
+
+
+def now() -> float:
+    """Zeitquelle für alle Messungen (monoton, nur innerhalb des Prozesses vergleichbar)"""
+    return time.monotonic()
+
+
+class LatencySummary:
+    """Sketch + Histogramm einer Art für eine Frage"""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.sketch = DDSketch()
+        self.hist = FixedHistogram(KINDS[kind])
+
+    def add(self, value: float) -> None:
+        self.sketch.add(value)
+        self.hist.add(value)
+
+    def merge(self, other: "LatencySummary") -> None:
+        self.sketch.merge(other.sketch)
+        self.hist.merge(other.hist)
+
+    def to_dict(self) -> Dict:
+        return {"sketch": self.sketch.to_dict(), "hist": self.hist.to_dict()}
+
+    @classmethod
+    def from_dict(cls, kind: str, data: Dict) -> "LatencySummary":
+        summary = cls(kind)
+        summary.sketch = DDSketch.from_dict(data["sketch"])
+        hist = FixedHistogram.from_dict(data["hist"])
+        if hist.edges == summary.hist.edges:
+            summary.hist = hist
+        return summary
+
+
+class TimingStats:
+    def __init__(self, path: str = TIMING_FILE):
+        self.path = path
+        # (quiz_id, frage-schlüssel, art) -> Summary
+        self._summaries: Dict[Tuple[str, str, str], LatencySummary] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def load(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            LOG.error("Fehler beim Laden von %s: %s", self.path, e)
+            return False
+        legacy = data.get("version") != 2
+        with self._lock:
+            for quiz_id, questions in data.get("quizzes", {}).items():
+                if legacy:
+                    # Version 1 war nach Positionen geschlüsselt: bestmöglich der aktuellen Fassung zuordnen
+                    quiz = get_catalog().get(quiz_id)
+                    keys = quiz.keys if quiz is not None else ()
+                    questions = {keys[int(qid)]: kinds for qid, kinds in questions.items() if int(qid) < len(keys)}
+                    self._dirty = True
+                for key, kinds in questions.items():
+                    for kind, summary in kinds.items():
+                        if kind in KINDS:
+                            self._summaries[(quiz_id, key, kind)] = LatencySummary.from_dict(kind, summary)
+        return True
+
+    def save(self) -> None:
+        """Speichert nur, wenn seit dem letzten Speichern etwas dazugekommen ist"""
+        with self._lock:
+            if not self._dirty:
+                return
+            quizzes: Dict[str, Dict[str, Dict]] = {}
+            for (quiz_id, key, kind), summary in self._summaries.items():
+                quizzes.setdefault(quiz_id, {}).setdefault(key, {})[kind] = summary.to_dict()
+            self._dirty = False
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_file = f"{self.path}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump({"version": 2, "quizzes": quizzes}, f, separators=(",", ":"))
+        os.replace(temp_file, self.path)
+
+    def record(self, quiz_id: str, key: str, kind: str, value: float) -> None:
+        """value in der Einheit der Art (think: s, render: ms); key = Frage-Schlüssel"""
+        with self._lock:
+            entry = (quiz_id, key, kind)
+            summary = self._summaries.get(entry)
+            if summary is None:
+                summary = self._summaries[entry] = LatencySummary(kind)
+            summary.add(value)
+            self._dirty = True
+
+    def record_think(self, quiz_id: str, key: str, seconds: float) -> None:
+        self.record(quiz_id, key, "think", seconds)
+
+    def record_render(self, quiz_id: str, key: str, seconds: float) -> None:
+        self.record(quiz_id, key, "render", seconds * 1000)
+
+    # ---------- Abfragen ----------
+    def quizzes(self) -> List[str]:
+        with self._lock:
+            return sorted({quiz_id for quiz_id, _, _ in self._summaries})
+
+    def query(self, quiz_id: str, kind: str, key: Optional[str] = None) -> LatencySummary:
+        """Gemergte Verteilung einer Art für ein Quiz (oder eine einzelne Frage)"""
+        merged = LatencySummary(kind)
+        with self._lock:
+            for (q, question, k), summary in self._summaries.items():
+                if q == quiz_id and k == kind and (key is None or question == key):
+                    merged.merge(summary)
+        return merged
+
+    def per_question(self, quiz_id: str) -> Dict[str, Dict[str, LatencySummary]]:
+        """Frage-Schlüssel -> Art -> Summary"""
+        with self._lock:
+            out: Dict[str, Dict[str, LatencySummary]] = {}
+            for (q, key, kind), summary in self._summaries.items():
+                if q == quiz_id:
+                    out.setdefault(key, {})[kind] = summary
+            return out
+
+
+_stats: Optional[TimingStats] = None
+_stats_lock = threading.Lock()
+
+
+def get_timing_stats() -> TimingStats:
+    """Gibt die prozessweiten Antwortzeit-Statistiken zurück"""
+    global _stats
+    with _stats_lock:
+        if _stats is None:
+            _stats = TimingStats()
+            _stats.load()
+        return _stats
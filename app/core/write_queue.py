@@ -0,0 +1,319 @@
+"""
+Write-Behind-Queue für Quiz-Ergebnisse (Group Commit)
+
+Wenn eine ganze Klasse gleichzeitig fertig wird, schreibt nicht mehr jede
+Session ihre Datei selbst. Stattdessen landen die Ergebnisse in einer
+prozessweiten Queue; ein Writer-Thread sammelt alles, was gerade ansteht, und
+schreibt es als einen Block in ein Journal (ein write, ein fsync). Danach gelten
+die Ergebnisse als dauerhaft gespeichert und werden bestätigt. Die einzelnen
+Dateien in ./data/answers werden anschließend ohne fsync erzeugt; beim Start
+wird das Journal wieder eingespielt, falls dabei etwas verloren ging.
+
+Durability-Modi:
+    "fsync": submit() wartet, bis der Group Commit mit fsync durch ist (Standard)
+    "async": submit() kehrt sofort zurück, der Commit folgt im Hintergrund
+
+Wer erst nach einem erfolgreichen Commit etwas tun will (z.B. Statistiken
+fortschreiben), gibt submit() ein on_commit mit; es wird im Writer-Thread mit
+dem Fehler bzw. None aufgerufen, bevor das Ticket als erledigt gilt.
+
+Created by l1rox3 • 2025
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from core.adaptive import get_item_bank
+from core.results import ANSWERS_DIR
+from core.sketches import DDSketch, get_sketch_store
+from core.timing import get_timing_stats
+
+LOG = logging.getLogger("quiz.write_queue")
+
+JOURNAL_FILE = "./data/journal/results.jsonl"
+DURABILITY_MODES = ("fsync", "async")
+MAX_BATCH = 256
+MAX_WAIT = 0.005          # Sekunden, die auf weitere Ergebnisse gewartet wird
+SUBMIT_TIMEOUT = 30.0     # Sekunden, die submit() im fsync-Modus höchstens wartet
+CHECKPOINT_BYTES = 1024 * 1024
+
+
+class CommitTicket:
+    """Bestätigung für ein eingereichtes Ergebnis"""
+
+    def __init__(self, filename: str, on_commit: Optional[Callable[[Optional[BaseException]], None]] = None):
+        self.filename = filename
+        self.enqueued_at = time.perf_counter()
+        self.error: Optional[BaseException] = None
+        self.on_commit = on_commit
+        self._done = threading.Event()
+
+    def _resolve(self, error: Optional[BaseException] = None) -> None:
+        if self._done.is_set():
+            return
+        self.error = error
+        if self.on_commit is not None:
+            try:
+                self.on_commit(error)
+            except Exception as e:
+                LOG.error("on_commit für %s fehlgeschlagen: %s", self.filename, e)
+        self._done.set()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wartet auf den Commit; wirft den Schreibfehler weiter"""
+        if not self._done.wait(timeout):
+            return False
+        if self.error is not None:
+            raise self.error
+        return True
+
+
+class ResultWriteQueue:
+    def __init__(
+        self,
+        answers_dir: str = ANSWERS_DIR,
+        journal_path: str = JOURNAL_FILE,
+        durability: str = "fsync",
+        max_batch: int = MAX_BATCH,
+        max_wait: float = MAX_WAIT,
+    ):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unbekannter Durability-Modus: {durability}")
+        self.answers_dir = answers_dir
+        self.journal_path = journal_path
+        self.durability = durability
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._hooks: List[Callable[[], None]] = []
+        self._metrics_lock = threading.Lock()
+        self._commit_latency = DDSketch()
+        self._ack_latency = DDSketch()
+        self._commits = 0
+        self._records = 0
+        self._errors = 0
+        self._last_batch = 0
+        self._max_batch_seen = 0
+
+        os.makedirs(self.answers_dir, exist_ok=True)
+        os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+        self.recover()
+        self._journal = open(self.journal_path, "ab")
+        self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+        self._thread.start()
+
+    # ---------- API ----------
+    def submit(
+        self,
+        filename: str,
+        result: Dict,
+        wait: Optional[bool] = None,
+        on_commit: Optional[Callable[[Optional[BaseException]], None]] = None,
+    ) -> CommitTicket:
+        """
+        Reicht ein Ergebnis ein.
+
+        Args:
+            filename: Dateiname in answers_dir
+            result: Ergebnis-Dict (wie von save_result erzeugt)
+            wait: überschreibt den Durability-Modus für diesen Aufruf
+            on_commit: wird nach dem Commit mit dem Fehler bzw. None aufgerufen
+
+        Raises:
+            den Schreibfehler des Commits, TimeoutError nach SUBMIT_TIMEOUT (nur beim Warten)
+        """
+        ticket = CommitTicket(filename, on_commit)
+        self._queue.put((filename, result, ticket))
+        if wait if wait is not None else self.durability == "fsync":
+            if not ticket.wait(SUBMIT_TIMEOUT):
+                raise TimeoutError(f"Group Commit für {filename} nicht innerhalb von {SUBMIT_TIMEOUT:.0f} s")
+        return ticket
+
+    def add_commit_hook(self, hook: Callable[[], None]) -> None:
+        """Wird nach jedem Group Commit einmal aufgerufen (z.B. Statistiken speichern)"""
+        self._hooks.append(hook)
+
+    def flush(self, timeout: Optional[float] = 10.0, checkpoint: bool = False) -> bool:
+        """
+        Wartet, bis alle eingereichten Ergebnisse committet sind.
+
+        Mit checkpoint=True wird danach das Journal geleert, z.B. bevor
+        Ergebnis-Dateien gelöscht oder archiviert werden (sonst würde der
+        nächste Start sie wiederherstellen).
+        """
+        ticket = CommitTicket("")
+        self._queue.put((None, checkpoint, ticket))
+        return ticket._done.wait(timeout)
+
+    def metrics(self) -> Dict:
+        with self._metrics_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "commits": self._commits,
+                "records": self._records,
+                "errors": self._errors,
+                "last_batch": self._last_batch,
+                "max_batch": self._max_batch_seen,
+                "avg_batch": self._records / self._commits if self._commits else 0.0,
+                "commit_ms_p50": _ms(self._commit_latency.quantile(0.5)),
+                "commit_ms_p99": _ms(self._commit_latency.quantile(0.99)),
+                "ack_ms_p50": _ms(self._ack_latency.quantile(0.5)),
+                "ack_ms_p99": _ms(self._ack_latency.quantile(0.99)),
+                "durability": self.durability,
+            }
+
+    # ---------- Writer-Thread ----------
+    def _collect(self) -> List[tuple]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            try:
+                records = [item for item in batch if item[0] is not None]
+                markers = [item for item in batch if item[0] is None]
+                if records:
+                    self._commit(records)
+                if any(checkpoint for _, checkpoint, _ in markers):
+                    self._checkpoint()
+            except Exception as e:
+                # Der Thread muss weiterlaufen, sonst hängt jedes weitere submit()
+                LOG.exception("Writer-Thread: Batch fehlgeschlagen: %s", e)
+                with self._metrics_lock:
+                    self._errors += 1
+                for _, _, ticket in batch:
+                    ticket._resolve(e)     # bereits erledigte Tickets bleiben unverändert
+                continue
+            for _, _, ticket in markers:
+                ticket._resolve()
+
+    def _commit(self, records: List[tuple]) -> None:
+        started = time.perf_counter()
+        try:
+            # Auch nicht serialisierbare Ergebnisse scheitern nur für diesen Batch
+            payload = b"".join(
+                json.dumps({"file": filename, "result": result}, ensure_ascii=False).encode("utf-8") + b"\n"
+                for filename, result, _ in records
+            )
+            self._journal.write(payload)
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+        except (OSError, TypeError, ValueError) as e:
+            LOG.error("Group Commit fehlgeschlagen: %s", e)
+            with self._metrics_lock:
+                self._errors += 1
+            for _, _, ticket in records:
+                ticket._resolve(e)
+            return
+
+        committed = time.perf_counter()
+        for _, _, ticket in records:
+            ticket._resolve()
+
+        for filename, result, _ in records:
+            try:
+                self._materialize(filename, result)
+            except OSError as e:
+                # Bleibt im Journal und wird beim nächsten Start eingespielt
+                LOG.error("Ergebnis-Datei %s konnte nicht geschrieben werden: %s", filename, e)
+
+        with self._metrics_lock:
+            self._commits += 1
+            self._records += len(records)
+            self._last_batch = len(records)
+            self._max_batch_seen = max(self._max_batch_seen, len(records))
+            self._commit_latency.add(committed - started)
+            for _, _, ticket in records:
+                self._ack_latency.add(committed - ticket.enqueued_at)
+
+        for hook in self._hooks:
+            try:
+                hook()
+            except Exception as e:
+                LOG.error("Commit-Hook fehlgeschlagen: %s", e)
+
+        if self._queue.empty() and self._journal.tell() > CHECKPOINT_BYTES:
+            self._checkpoint()
+
+    def _materialize(self, filename: str, result: Dict) -> None:
+        path = os.path.join(self.answers_dir, filename)
+        temp_file = f"{path}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        os.replace(temp_file, path)
+
+    def _checkpoint(self) -> None:
+        """Ein sync für alle erzeugten Dateien, danach wird das Journal geleert"""
+        try:
+            os.sync()
+            self._journal.truncate(0)
+            self._journal.seek(0)
+            os.fsync(self._journal.fileno())
+        except OSError as e:
+            LOG.error("Checkpoint fehlgeschlagen: %s", e)
+
+    # ---------- Recovery ----------
+    def recover(self) -> int:
+        """Spielt das Journal ein: fehlende Ergebnis-Dateien werden nachgeschrieben"""
+        if not os.path.exists(self.journal_path):
+            return 0
+        restored = 0
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Abgeschnittene letzte Zeile eines unvollständigen Commits
+                    continue
+                path = os.path.join(self.answers_dir, record["file"])
+                if not os.path.exists(path):
+                    self._materialize(record["file"], record["result"])
+                    restored += 1
+        if restored:
+            os.sync()
+            LOG.warning("%d Ergebnisse aus dem Journal wiederhergestellt", restored)
+        with open(self.journal_path, "wb") as f:
+            os.fsync(f.fileno())
+        return restored
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+_queue_instance: Optional[ResultWriteQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_write_queue(durability: Optional[str] = None) -> ResultWriteQueue:
+    """Gibt die prozessweite Queue zurück; der Durability-Modus kann live geändert werden"""
+    global _queue_instance
+    with _queue_lock:
+        if _queue_instance is None:
+            _queue_instance = ResultWriteQueue(durability=durability or "fsync")
+            _queue_instance.add_commit_hook(get_sketch_store().save)
+            _queue_instance.add_commit_hook(get_item_bank().save)
+            _queue_instance.add_commit_hook(get_timing_stats().save)
+            atexit.register(_queue_instance.flush)
+        elif durability in DURABILITY_MODES:
+            _queue_instance.durability = durability
+        return _queue_instance
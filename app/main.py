@@ -20,11 +20,18 @@ import os
 import subprocess
 import threading
 import time
-from pathlib import Path
 from typing import Dict, List, Optional
 
 import streamlit as st
 from pages.auth import AuthManager, UserRole, DEFAULT_PASSWORD
+from components.markup import render_html
+from components.profiler_overlay import show_profiler_overlay
+from components.stylesheet import use_stylesheet
+from core.profiler import get_profiler, profiled, section
+from core.catalog import get_catalog
+from core.results import DEFAULT_QUIZ_ID, get_results_store, is_ranked, quiz_id_of
+from core.themes import DEFAULT_THEME, THEMES, get_theme
+from core.retention import get_archive, maybe_run_retention
 
 # =========================================================
 # KONFIGURATION
@@ -43,6 +50,10 @@ ANSWERS_DIR = "./data/answers"
 SETTINGS_FILE = "./data/settings.json"
 PDF_PATH = "data.pdf"
 
+# Profil dieses Reruns (abgeschlossen am Ende des Skripts, siehe core.profiler)
+PROFILER = get_profiler()
+PROFILER.start("main", st.session_state.get("username"))
+
 # =========================================================
 # SESSION VALIDIERUNG
 # =========================================================
@@ -51,7 +62,8 @@ if "auth_manager" not in st.session_state:
 auth_manager = st.session_state.auth_manager
 
 if "username" in st.session_state and st.session_state.username.strip():
-    status = auth_manager.check_user_status(st.session_state.username)
+    with section("session"):
+        status = auth_manager.check_user_status(st.session_state.username)
     if status["should_logout"]:
         st.error(f"🔒 {status['message']}")
         st.warning("Du wurdest automatisch ausgeloggt.")
@@ -60,50 +72,23 @@ if "username" in st.session_state and st.session_state.username.strip():
         time.sleep(2)
         st.rerun()
 
-# =========================================================
-# THEMES
-# =========================================================
-THEMES: Dict[str, Dict[str, str]] = {
-    "Purple Dream": {
-        "name": "Purple Dream",
-        "bg": "linear-gradient(135deg, #0f0c29 0%, #302b63 50%, #24243e 100%)",
-        "surface": "rgba(255,255,255,0.05)",
-        "border": "rgba(255,255,255,0.1)",
-        "text": "#ffffff",
-        "text_secondary": "rgba(255,255,255,0.7)",
-        "accent": "#667eea",
-        "accent_hover": "#764ba2",
-        "card_gradient": "linear-gradient(135deg, #667eea 0%, #764ba2 100%)",
-    },
-    "Ocean Blue": {
-        "name": "Ocean Blue",
-        "bg": "linear-gradient(135deg, #0a192f 0%, #112240 50%, #1a365d 100%)",
-        "surface": "rgba(255,255,255,0.05)",
-        "border": "rgba(255,255,255,0.1)",
-        "text": "#ffffff",
-        "text_secondary": "rgba(255,255,255,0.7)",
-        "accent": "#3b82f6",
-        "accent_hover": "#60a5fa",
-        "card_gradient": "linear-gradient(135deg, #3b82f6 0%, #2563eb 100%)",
-    },
-    "Dark Minimal": {
-        "name": "Dark Minimal",
-        "bg": "linear-gradient(135deg, #0a0a0a 0%, #1a1a1a 50%, #0a0a0a 100%)",
-        "surface": "rgba(255,255,255,0.05)",
-        "border": "rgba(255,255,255,0.1)",
-        "text": "#ffffff",
-        "text_secondary": "rgba(255,255,255,0.6)",
-        "accent": "#ffffff",
-        "accent_hover": "#e5e5e5",
-        "card_gradient": "linear-gradient(135deg, #2a2a2a 0%, #1a1a1a 100%)",
-    },
-}
-
 # =========================================================
 # SETTINGS FUNKTIONEN
 # =========================================================
+_settings: Optional[Dict] = None    # einmal pro Lauf gelesen (das Skript läuft bei jedem Rerun neu)
+
+
 def load_settings() -> Dict:
-    """Lädt App-Einstellungen."""
+    """Lädt App-Einstellungen (pro Rerun nur einmal von der Platte)."""
+    global _settings
+    if _settings is None:
+        _settings = read_settings()
+    return _settings
+
+
+@profiled("settings")
+def read_settings() -> Dict:
+    """Liest ./data/settings.json."""
     try:
         if os.path.exists(SETTINGS_FILE):
             with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
@@ -117,10 +102,12 @@ def load_settings() -> Dict:
 
 def save_settings(settings: Dict) -> None:
     """Speichert App-Einstellungen."""
+    global _settings
     try:
         os.makedirs(os.path.dirname(SETTINGS_FILE) or "./data", exist_ok=True)
         with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
             json.dump(settings, f, indent=2, ensure_ascii=False)
+        _settings = settings
     except Exception as exc:
         LOG.exception("Fehler beim Speichern der Einstellungen: %s", exc)
 
@@ -128,292 +115,16 @@ def save_settings(settings: Dict) -> None:
 def get_current_theme() -> Dict[str, str]:
     """Gibt aktuelles Theme zurück."""
     settings = load_settings()
-    theme_name = settings.get("current_theme", "Purple Dream")
-    return THEMES.get(theme_name, THEMES["Purple Dream"])
+    return get_theme(settings.get("current_theme", DEFAULT_THEME))
 
 # =========================================================
 # STYLING
 # =========================================================
+@profiled("theme")
 def apply_theme() -> None:
-    """Wendet modernes Theme mit Gradients an."""
-    t = get_current_theme()
-    css = f"""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@400;600;700;800&display=swap');
-
-    /* Global Styles */
-    html, body, .stApp {{
-        background: {t['bg']};
-        color: {t['text']};
-        font-family: 'Poppins', -apple-system, BlinkMacSystemFont, sans-serif;
-    }}
-
-    .block-container {{
-        padding-top: 2rem;
-        padding-bottom: 4rem;
-        max-width: 1200px;
-    }}
-
-    /* Header Styles */
-    .main-header {{
-        background: {t['card_gradient']};
-        padding: 2.5rem;
-        border-radius: 25px;
-        text-align: center;
-        margin-bottom: 2.5rem;
-        box-shadow: 0 15px 40px rgba(0,0,0,0.3);
-    }}
-
-    .main-title {{
-        font-size: 3rem;
-        font-weight: 800;
-        color: white;
-        margin: 0;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        letter-spacing: -0.02em;
-    }}
-
-    .main-subtitle {{
-        font-size: 1.3rem;
-        color: rgba(255,255,255,0.9);
-        margin-top: 0.5rem;
-        font-weight: 500;
-    }}
-
-    /* Cards */
-    .action-card {{
-        background: {t['surface']};
-        border: 1px solid {t['border']};
-        border-radius: 20px;
-        padding: 2rem;
-        text-align: center;
-        transition: all 0.3s ease;
-        backdrop-filter: blur(10px);
-        height: 100%;
-    }}
-
-    .action-card:hover {{
-        transform: translateY(-8px);
-        box-shadow: 0 15px 40px rgba(102, 126, 234, 0.3);
-        border-color: {t['accent']};
-    }}
-
-    .action-card h3 {{
-        font-size: 2rem;
-        margin-bottom: 0.5rem;
-    }}
-
-    .action-card p {{
-        color: {t['text_secondary']};
-        font-size: 1.1rem;
-    }}
-
-    /* Stats Cards */
-    .stats-card {{
-        background: {t['surface']};
-        border: 1px solid {t['border']};
-        border-radius: 18px;
-        padding: 1.5rem;
-        text-align: center;
-        backdrop-filter: blur(10px);
-        transition: all 0.3s ease;
-    }}
-
-    .stats-card:hover {{
-        transform: translateY(-5px);
-        box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-    }}
-
-    .stats-label {{
-        color: {t['text_secondary']};
-        font-size: 0.95rem;
-        text-transform: uppercase;
-        letter-spacing: 1px;
-        font-weight: 600;
-        margin-bottom: 0.5rem;
-    }}
-
-    .stats-value {{
-        color: {t['text']};
-        font-size: 2.5rem;
-        font-weight: 800;
-    }}
-
-    /* Leaderboard */
-    .leaderboard-item {{
-        background: {t['surface']};
-        border: 1px solid {t['border']};
-        border-radius: 15px;
-        padding: 1.5rem;
-        margin: 0.8rem 0;
-        display: flex;
-        justify-content: space-between;
-        align-items: center;
-        transition: all 0.3s ease;
-        backdrop-filter: blur(10px);
-    }}
-
-    .leaderboard-item:hover {{
-        transform: translateX(8px);
-        box-shadow: 0 8px 25px rgba(102, 126, 234, 0.2);
-        border-color: {t['accent']};
-    }}
-
-    .leaderboard-rank {{
-        font-weight: 800;
-        color: {t['accent']};
-        font-size: 1.5rem;
-        min-width: 3.5rem;
-        text-align: center;
-    }}
-
-    /* Buttons */
-    .stButton > button {{
-        background: {t['card_gradient']} !important;
-        color: white !important;
-        border: none !important;
-        border-radius: 15px !important;
-        padding: 1rem 2rem !important;
-        font-weight: 700 !important;
-        font-size: 1.1rem !important;
-        box-shadow: 0 8px 20px rgba(0,0,0,0.2);
-        transition: all 0.3s ease !important;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-    }}
-
-    .stButton > button:hover {{
-        transform: translateY(-3px) !important;
-        box-shadow: 0 12px 30px rgba(102, 126, 234, 0.4) !important;
-    }}
-
-    /* Inputs */
-    input, textarea, select {{
-        background: {t['surface']} !important;
-        border: 1px solid {t['border']} !important;
-        border-radius: 12px !important;
-        color: {t['text']} !important;
-        padding: 0.8rem !important;
-        font-size: 1rem !important;
-    }}
-
-    input:focus, textarea:focus, select:focus {{
-        border-color: {t['accent']} !important;
-        box-shadow: 0 0 0 2px {t['accent']}33 !important;
-    }}
-
-    /* PDF Card */
-    .pdf-card {{
-        background: {t['surface']};
-        border: 1px solid {t['border']};
-        border-radius: 20px;
-        padding: 2rem;
-        backdrop-filter: blur(10px);
-        margin: 1rem 0;
-    }}
-
-    /* Tabs */
-    .stTabs [data-baseweb="tab-list"] {{
-        gap: 1rem;
-        background: {t['surface']};
-        padding: 0.5rem;
-        border-radius: 15px;
-        border: 1px solid {t['border']};
-    }}
-
-    .stTabs [data-baseweb="tab"] {{
-        color: {t['text_secondary']};
-        border-radius: 10px;
-        padding: 0.8rem 1.5rem;
-        font-weight: 600;
-    }}
-
-    .stTabs [aria-selected="true"] {{
-        background: {t['card_gradient']};
-        color: white;
-    }}
-
-    /* Theme Preview */
-    .theme-preview {{
-        border: 2px solid {t['border']};
-        border-radius: 15px;
-        padding: 1.5rem;
-        cursor: pointer;
-        transition: all 0.3s ease;
-        text-align: center;
-    }}
-
-    .theme-preview:hover {{
-        transform: scale(1.05);
-        box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-    }}
-
-    .theme-preview.active {{
-        border-color: {t['accent']};
-        background: {t['surface']};
-        box-shadow: 0 0 0 3px {t['accent']}33;
-    }}
-
-    /* Login Card */
-    .login-card {{
-        background: {t['surface']};
-        border: 1px solid {t['border']};
-        border-radius: 25px;
-        padding: 3rem;
-        max-width: 500px;
-        margin: 4rem auto;
-        backdrop-filter: blur(10px);
-        box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-    }}
-
-    /* Footer */
-    .footer {{
-        position: fixed;
-        bottom: 0;
-        left: 0;
-        right: 0;
-        background: {t['surface']};
-        border-top: 1px solid {t['border']};
-        padding: 1rem;
-        text-align: center;
-        backdrop-filter: blur(10px);
-        z-index: 999;
-    }}
-
-    .footer-text {{
-        color: {t['text_secondary']};
-        font-size: 0.9rem;
-        margin: 0;
-    }}
-
-    .footer-link {{
-        color: {t['accent']};
-        text-decoration: none;
-        font-weight: 700;
-        transition: all 0.2s ease;
-    }}
-
-    .footer-link:hover {{
-        color: {t['accent_hover']};
-        text-decoration: underline;
-    }}
-
-    /* Hide Streamlit Elements */
-    #MainMenu, header, footer {{visibility: hidden;}}
-    .stDeployButton {{display: none;}}
-    
-    /* Spacing */
-    h1, h2, h3 {{
-        color: {t['text']};
-        font-weight: 700;
-    }}
-    
-    p, span, div, label {{
-        color: {t['text']};
-    }}
-    </style>
-    """
-    st.markdown(css, unsafe_allow_html=True)
+    """Wendet modernes Theme mit Gradients an (CSS aus core.styles)."""
+    use_stylesheet("main", get_current_theme())
+
 #==========================================================
 # SESSION INIT
 # =========================================================
@@ -437,23 +148,27 @@ def init_session() -> None:
 # =========================================================
 def get_all_results() -> List[Dict]:
     """Lädt alle gespeicherten Ergebnisse aus quizzes.py Format"""
-    data_dir = Path("./data/answers")
-    if not data_dir.exists():
-        return []
-    
-    results = []
-    for file in data_dir.glob("*.json"):
-        try:
-            with open(file, 'r', encoding='utf-8') as f:
-                results.append(json.load(f))
-        except:
-            continue
+    store = get_results_store()
+    if store.loaded:
+        return store.all()
+
+    # Kaltstart: paralleles Laden mit Fortschrittsanzeige
+    progress_bar = st.progress(0.0, text="Lade Ergebnisse...")
+
+    def report(done: int, total: int) -> None:
+        progress_bar.progress(done / total if total else 1.0, text=f"Lade Ergebnisse... {done}/{total}")
+
+    results = store.all(progress=report)
+    progress_bar.empty()
     return results
 
 
-def get_leaderboard_data() -> List[Dict]:
-    """Erstellt Leaderboard-Daten aus quizzes.py Format"""
-    results = get_all_results()
+@profiled("leaderboard")
+def get_leaderboard_data(quiz_id: str) -> List[Dict]:
+    """Erstellt Leaderboard-Daten eines Quiz aus quizzes.py Format"""
+    # Archivierte Durchläufe zählen über ihr voraggregiertes Bestergebnis mit
+    results = [r for r in get_all_results() if quiz_id_of(r) == quiz_id and is_ranked(r)]
+    results += get_archive().leaderboard_entries(quiz=quiz_id)
     if not results:
         return []
     
@@ -466,7 +181,8 @@ def get_leaderboard_data() -> List[Dict]:
         percentage = (score / total) * 100
         time_taken = result.get("time_taken", 0)
         
-        if username not in user_best or percentage > user_best[username]["percentage"]:
+        best = user_best.get(username)
+        if best is None or (percentage, -time_taken) > (best["percentage"], -best["time_taken"]):
             user_best[username] = {
                 "username": username,
                 "score": score,
@@ -498,6 +214,17 @@ def format_time(seconds: float) -> str:
 # =========================================================
 # GIT AUTO-SYNC
 # =========================================================
+# Laufzeitdaten (Journal der Schreibqueue, abgeleitete Statistiken,
+# Wiederholungspläne, Caches, erzeugte Static-Dateien) lösen keinen Sync aus
+# und stehen in .gitignore: ein git pull darf z.B. das Journal nicht unter
+# dem laufenden Writer ersetzen
+SYNC_EXCLUDE = {
+    os.path.normpath(p) for p in (
+        "data/journal", "data/stats", "data/review", "data/cache", "app/static",
+    )
+}
+
+
 def git_commit_push():
     """Committet und pusht Änderungen."""
     try:
@@ -530,9 +257,10 @@ def file_watcher():
 
 
 def snapshot_dir(path):
-    """Erstellt Verzeichnis-Snapshot."""
+    """Erstellt Verzeichnis-Snapshot (ohne SYNC_EXCLUDE)."""
     snapshot = {}
-    for root, _, files in os.walk(path):
+    for root, dirs, files in os.walk(path):
+        dirs[:] = [d for d in dirs if os.path.normpath(os.path.join(root, d)) not in SYNC_EXCLUDE]
         for f in files:
             if ".git" in root:
                 continue
@@ -558,7 +286,7 @@ def autorun():
 def render_footer():
     """Zeigt Footer mit Credits."""
     t = get_current_theme()
-    st.markdown(f"""
+    render_html(f"""
     <div class="footer">
         <p class="footer-text">
             Created by <a href="#" class="footer-link">l1rox3</a> • 2025 
@@ -566,7 +294,7 @@ def render_footer():
             | <span style="color: {t['accent']};">Quiz App v3.0</span>
         </p>
     </div>
-    """, unsafe_allow_html=True)
+    """)
 
 
 def show_login() -> None:
@@ -574,15 +302,15 @@ def show_login() -> None:
     apply_theme()
     t = get_current_theme()
 
-    st.markdown(f"""
+    render_html(f"""
     <div class="main-header">
         <h1 class="main-title">Quiz Dashboard</h1>
         <p class="main-subtitle">Teste dein Wissen</p>
     </div>
-    """, unsafe_allow_html=True)
+    """)
 
-    st.markdown('<div class="login-card">', unsafe_allow_html=True)
-    st.markdown("<h2 style='text-align:center; margin-bottom:2rem;'>Anmelden</h2>", unsafe_allow_html=True)
+    render_html('<div class="login-card">')
+    render_html("<h2 style='text-align:center; margin-bottom:2rem;'>Anmelden</h2>")
 
     username = st.text_input("Benutzername", key="login_user", placeholder="dein.name")
     password = st.text_input("Passwort", type="password", key="login_pass", placeholder="••••••••")
@@ -612,7 +340,7 @@ def show_login() -> None:
         else:
             st.error(message)
 
-    st.markdown('</div>', unsafe_allow_html=True)
+    render_html('</div>')
     render_footer()
 
 
@@ -621,16 +349,16 @@ def show_password_change() -> None:
     apply_theme()
     t = get_current_theme()
 
-    st.markdown(f"""
+    render_html(f"""
     <div class="main-header">
         <h1 class="main-title">🔐 Passwort ändern</h1>
         <p class="main-subtitle">Ändere dein Standard-Passwort für mehr Sicherheit</p>
     </div>
-    """, unsafe_allow_html=True)
+    """)
 
     st.warning("⚠️ Du verwendest noch das Standard-Passwort!")
 
-    st.markdown('<div class="login-card">', unsafe_allow_html=True)
+    render_html('<div class="login-card">')
 
     old_pw = st.text_input("Aktuelles Passwort", type="password", key="pc_old_pw")
     new_pw = st.text_input("Neues Passwort", type="password", key="pc_new_pw")
@@ -662,13 +390,23 @@ def show_password_change() -> None:
             st.session_state.skip_password_change = True
             st.rerun()
 
-    st.markdown('</div>', unsafe_allow_html=True)
+    render_html('</div>')
     render_footer()
 
 
 def show_leaderboard():
-    """Zeigt das Leaderboard aus quizzes.py"""
-    leaderboard = get_leaderboard_data()
+    """Zeigt das Leaderboard aus quizzes.py (pro Quiz, Ergebnisse verschiedener Quizze sind nicht vergleichbar)"""
+    manifest = get_catalog().manifest()
+    titles = {info.quiz_id: info.title for info in manifest}
+    quiz_ids = list(titles) or [DEFAULT_QUIZ_ID]
+    quiz_id = st.selectbox(
+        "Quiz",
+        quiz_ids,
+        index=quiz_ids.index(DEFAULT_QUIZ_ID) if DEFAULT_QUIZ_ID in quiz_ids else 0,
+        format_func=lambda q: titles.get(q, q),
+        key="leaderboard_quiz"
+    )
+    leaderboard = get_leaderboard_data(quiz_id)
     
     if not leaderboard:
         st.info("Noch keine Ergebnisse vorhanden. Sei der Erste!")
@@ -677,7 +415,7 @@ def show_leaderboard():
     # Top 3
     for idx, entry in enumerate(leaderboard[:3]):
         medal = ["🥇", "🥈", "🥉"][idx]
-        st.markdown(f"""
+        render_html(f"""
         <div class="stats-card" style="margin: 1rem 0; padding: 2rem;">
             <h2 style="font-size: 2rem; margin-bottom: 1rem;">{medal} {entry['username']}</h2>
             <div style="display: flex; justify-content: space-around; flex-wrap: wrap;">
@@ -699,13 +437,13 @@ def show_leaderboard():
                 </div>
             </div>
         </div>
-        """, unsafe_allow_html=True)
+        """)
     
     # Rest of leaderboard
     if len(leaderboard) > 3:
         st.markdown("### Weitere Spieler")
         for idx, entry in enumerate(leaderboard[3:], 4):
-            st.markdown(f"""
+            render_html(f"""
             <div class="leaderboard-item">
                 <div style="display:flex;align-items:center;gap:1.5rem;flex:1">
                     <div class="leaderboard-rank">#{idx}</div>
@@ -720,17 +458,17 @@ def show_leaderboard():
                     </div>
                 </div>
             </div>
-            """, unsafe_allow_html=True)
+            """)
 
 
 def show_pdf_data_page() -> None:
     """Zeigt PDF-Datenquelle und alle Ergebnisse."""
-    st.markdown("<h3 style='margin-bottom: 1.5rem;'>📄 Quiz-Datenquelle</h3>", unsafe_allow_html=True)
+    render_html("<h3 style='margin-bottom: 1.5rem;'>📄 Quiz-Datenquelle</h3>")
     
     # PDF Info
     if os.path.exists(PDF_PATH):
         file_size = os.path.getsize(PDF_PATH) / 1024  # KB
-        st.markdown(f"""
+        render_html(f"""
         <div class="pdf-card">
             <h4 style="margin:0 0 1rem 0">📕 Hinduismus - Kleidung und Tiere</h4>
             <p style="color:rgba(255,255,255,0.7);margin:0">
@@ -739,7 +477,7 @@ def show_pdf_data_page() -> None:
                 ✅ Status: Verfügbar
             </p>
         </div>
-        """, unsafe_allow_html=True)
+        """)
         
         # Download Button
         with open(PDF_PATH, "rb") as pdf_file:
@@ -756,7 +494,7 @@ def show_pdf_data_page() -> None:
 
 def show_theme_selector() -> None:
     """Theme-Auswahl."""
-    st.markdown("<h3 style='margin-bottom: 1.5rem;'>🎨 Wähle dein Design</h3>", unsafe_allow_html=True)
+    render_html("<h3 style='margin-bottom: 1.5rem;'>🎨 Wähle dein Design</h3>")
     settings = load_settings()
     current_theme = settings.get("current_theme", "Purple Dream")
 
@@ -765,12 +503,12 @@ def show_theme_selector() -> None:
         with cols[idx]:
             is_active = theme_name == current_theme
             active_class = "active" if is_active else ""
-            st.markdown(f"""
+            render_html(f"""
             <div class="theme-preview {active_class}">
                 <div style="width:100%;height:80px;background:{theme_data['card_gradient']};border-radius:10px;margin-bottom:1rem"></div>
                 <h4 style="margin:0;color:{theme_data['text']}">{theme_data['name']}</h4>
             </div>
-            """, unsafe_allow_html=True)
+            """)
             if st.button("✓ Aktiv" if is_active else "Auswählen", key=f"theme_{theme_name}", use_container_width=True, disabled=is_active):
                 settings["current_theme"] = theme_name
                 save_settings(settings)
@@ -783,72 +521,72 @@ def show_dashboard() -> None:
     """Hauptdashboard."""
     apply_theme()
     
-    st.markdown(f"""
+    render_html(f"""
     <div class="main-header">
         <h1 class="main-title">👋 Willkommen, {st.session_state.username}!</h1>
         <p class="main-subtitle">Bereit für deine nächste Herausforderung?</p>
     </div>
-    """, unsafe_allow_html=True)
+    """)
 
     # Action Cards - 3 Spalten
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.markdown("""
+        render_html("""
         <div class="action-card">
             <h3>📝</h3>
             <h3>Quiz</h3>
             <p>Starte ein Quiz</p>
         </div>
-        """, unsafe_allow_html=True)
+        """)
         if st.button("Zum Quiz", key="btn_quiz", use_container_width=True):
             st.switch_page("pages/quizzes.py")
     
     with col2:
-        st.markdown("""
+        render_html("""
         <div class="action-card">
             <h3>📄</h3>
             <h3>Daten</h3>
             <p>PDF & Ergebnisse</p>
         </div>
-        """, unsafe_allow_html=True)
+        """)
         if st.button("Daten", key="btn_pdf", use_container_width=True):
             st.session_state.show_pdf_data = True
             st.rerun()
     
     with col3:
-        st.markdown("""
+        render_html("""
         <div class="action-card">
             <h3>🎨</h3>
             <h3>Design</h3>
             <p>Theme ändern</p>
         </div>
-        """, unsafe_allow_html=True)
+        """)
         if st.button("Theme", key="btn_theme", use_container_width=True):
             st.session_state.show_theme_selector = True
             st.rerun()
 
     # Leaderboard direkt im Dashboard
-    st.markdown("<div style='height: 2rem;'></div>", unsafe_allow_html=True)
-    st.markdown("<h2 style='margin-bottom: 1.5rem;'>🏆 Aktuelle Bestenliste</h2>", unsafe_allow_html=True)
+    render_html("<div style='height: 2rem;'></div>")
+    render_html("<h2 style='margin-bottom: 1.5rem;'>🏆 Aktuelle Bestenliste</h2>")
     
     show_leaderboard()
 
     # Admin Bereich
     if st.session_state.role == UserRole.ADMIN:
-        st.markdown("<div style='height: 2rem;'></div>", unsafe_allow_html=True)
-        st.markdown("""
+        render_html("<div style='height: 2rem;'></div>")
+        render_html("""
         <div class="action-card">
             <h3>⚙️</h3>
             <h3>Admin-Bereich</h3>
             <p>Benutzerverwaltung und Einstellungen</p>
         </div>
-        """, unsafe_allow_html=True)
+        """)
         if st.button("Zum Admin-Panel", key="btn_admin", use_container_width=True):
             st.switch_page("pages/admin.py")
 
     # Logout Button
-    st.markdown("<div style='height: 2rem;'></div>", unsafe_allow_html=True)
+    render_html("<div style='height: 2rem;'></div>")
     if st.button("Abmelden", key="btn_logout", use_container_width=True):
         for key in list(st.session_state.keys()):
             del st.session_state[key]
@@ -867,6 +605,9 @@ def main():
     except Exception as exc:
         LOG.warning("Auto-Sync konnte nicht gestartet werden: %s", exc)
 
+    # Alte Durchläufe archivieren (höchstens einmal pro Tag, im Hintergrund)
+    maybe_run_retention(load_settings())
+
     # Login Check
     if not st.session_state.get("logged_in"):
         show_login()
@@ -880,16 +621,16 @@ def main():
     # PDF & Data Page
     if st.session_state.get("show_pdf_data"):
         apply_theme()
-        st.markdown(f"""
+        render_html(f"""
         <div class="main-header">
             <h1 class="main-title">📄 Quiz-Daten & Ergebnisse</h1>
             <p class="main-subtitle">PDF-Quelle und alle Durchläufe</p>
         </div>
-        """, unsafe_allow_html=True)
+        """)
         
         show_pdf_data_page()
         
-        st.markdown("<div style='height: 2rem;'></div>", unsafe_allow_html=True)
+        render_html("<div style='height: 2rem;'></div>")
         if st.button("← Zurück zum Dashboard", use_container_width=True):
             st.session_state.show_pdf_data = False
             st.rerun()
@@ -900,16 +641,16 @@ def main():
     # Theme Selector
     if st.session_state.get("show_theme_selector"):
         apply_theme()
-        st.markdown(f"""
+        render_html(f"""
         <div class="main-header">
             <h1 class="main-title">🎨 Design anpassen</h1>
             <p class="main-subtitle">Wähle dein Lieblingstheme</p>
         </div>
-        """, unsafe_allow_html=True)
+        """)
         
         show_theme_selector()
         
-        st.markdown("<div style='height: 2rem;'></div>", unsafe_allow_html=True)
+        render_html("<div style='height: 2rem;'></div>")
         if st.button("← Zurück zum Dashboard", use_container_width=True):
             st.session_state.show_theme_selector = False
             st.rerun()
@@ -922,4 +663,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with PROFILER.finishing():
+        main()
+        show_profiler_overlay()
\ No newline at end of file
@@ -1,7 +1,9 @@
 import streamlit as st
 import sys
 import os
+import html
 import json
+import time
 import pandas as pd
 from datetime import datetime
 
@@ -9,11 +11,36 @@ from datetime import datetime
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from pages.auth import AuthManager, UserRole
-auth_manager = AuthManager()
+from components.markup import render_html
+from components.profiler_overlay import show_profiler_overlay
+from components.stylesheet import use_stylesheet
+from core import export
+from core.adaptive import get_item_bank
+from core.results import (
+    DEFAULT_QUIZ_ID, dedupe_answers_dir, find_duplicate_runs, get_results_store, is_ranked, quiz_id_of
+)
+from core.catalog import get_catalog
+from core.memory import collect as collect_memory
+from core.pdf_pipeline import get_pdf_pipeline
+from core.profiler import get_profiler, profiled, section
+from core.ranking import get_ranking
+from core.search import get_question_index
+from core.retention import DEFAULT_RETENTION_DAYS, get_archive, run_retention
+from core.review import get_review_scheduler
+from core.sketches import get_sketch_store
+from core.timing import UNITS, get_timing_stats
+from core.write_queue import get_write_queue
+# Profil dieses Reruns (abgeschlossen am Ende des Skripts, siehe core.profiler)
+PROFILER = get_profiler()
+PROFILER.start("admin", st.session_state.get("username"))
+
+with section("session"):
+    auth_manager = AuthManager()
 
 # ⚠️ WICHTIG: Session-Validierung bei JEDEM Seitenaufruf!
 if "username" in st.session_state and st.session_state.username.strip():
-    status = auth_manager.check_user_status(st.session_state.username)
+    with section("session"):
+        status = auth_manager.check_user_status(st.session_state.username)
     
     if status["should_logout"]:
         st.error(f"🔒 {status['message']}")
@@ -34,7 +61,7 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-ANSWERS_DIR = "./data/answers"
+SETTINGS_FILE = "./data/settings.json"
 
 # ---------------------- THEME ----------------------
 def get_theme():
@@ -54,296 +81,73 @@ def get_theme():
         "card_bg": "#1e1e1e"
     }
 
+@profiled("theme")
 def apply_admin_theme():
-    """Wendet das moderne Dark Theme an"""
-    t = get_theme()
-    
-    css = f"""
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-        
-        * {{
-            font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
-        }}
-        
-        .stApp {{
-            background: {t['bg']};
-            color: {t['text']};
-        }}
-        
-        .main .block-container {{
-            padding-top: 2rem;
-            padding-bottom: 2rem;
-        }}
-        
-        /* Header */
-        .admin-header {{
-            background: linear-gradient(135deg, {t['surface']} 0%, {t['card_bg']} 100%);
-            border-radius: 16px;
-            padding: 2.5rem;
-            margin-bottom: 2rem;
-            border: 1px solid {t['border']};
-            text-align: center;
-        }}
-        
-        .admin-title {{
-            font-size: 2.5rem;
-            font-weight: 700;
-            background: linear-gradient(135deg, {t['accent']}, {t['success']});
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            margin-bottom: 0.5rem;
-        }}
-        
-        .admin-subtitle {{
-            color: {t['text_secondary']};
-            font-size: 1.1rem;
-            font-weight: 400;
-        }}
-        
-        /* Cards */
-        .stats-card {{
-            background: {t['card_bg']};
-            border: 1px solid {t['border']};
-            border-radius: 12px;
-            padding: 1.5rem;
-            text-align: center;
-            transition: all 0.3s ease;
-        }}
-        
-        .stats-card:hover {{
-            transform: translateY(-5px);
-            border-color: {t['accent']};
-            box-shadow: 0 10px 30px rgba(59, 130, 246, 0.1);
-        }}
-        
-        .stats-value {{
-            font-size: 2.5rem;
-            font-weight: 700;
-            color: {t['accent']};
-            margin: 0.5rem 0;
-        }}
-        
-        .stats-label {{
-            color: {t['text_secondary']};
-            font-size: 0.9rem;
-            font-weight: 500;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-        }}
-        
-        /* User Cards */
-        .user-card {{
-            background: {t['card_bg']};
-            border: 1px solid {t['border']};
-            border-radius: 12px;
-            padding: 1.5rem;
-            margin: 0.75rem 0;
-            transition: all 0.2s ease;
-        }}
-        
-        .user-card:hover {{
-            border-color: {t['accent']};
-            transform: translateX(5px);
-        }}
-        
-        .user-header {{
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 1rem;
-        }}
-        
-        .user-name {{
-            font-size: 1.2rem;
-            font-weight: 600;
-            color: {t['text']};
-        }}
-        
-        .badge {{
-            padding: 0.3rem 0.8rem;
-            border-radius: 20px;
-            font-size: 0.75rem;
-            font-weight: 600;
-            text-transform: uppercase;
-        }}
-        
-        .badge-admin {{
-            background: {t['accent']}20;
-            color: {t['accent']};
-            border: 1px solid {t['accent']};
-        }}
-        
-        .badge-user {{
-            background: {t['success']}20;
-            color: {t['success']};
-            border: 1px solid {t['success']};
-        }}
-        
-        .badge-active {{
-            background: {t['success']}20;
-            color: {t['success']};
-        }}
-        
-        .badge-blocked {{
-            background: {t['error']}20;
-            color: {t['error']};
-        }}
-        
-        /* Buttons */
-        .stButton > button {{
-            background: {t['surface_light']};
-            color: {t['text']} !important;
-            border: 1px solid {t['border']};
-            border-radius: 8px;
-            padding: 0.6rem 1.2rem;
-            font-weight: 500;
-            transition: all 0.2s ease;
-        }}
-        
-        .stButton > button:hover {{
-            background: {t['accent']};
-            border-color: {t['accent']};
-            transform: translateY(-2px);
-        }}
-        
-        .btn-success button {{
-            background: {t['success']} !important;
-            border-color: {t['success']} !important;
-        }}
-        
-        .btn-danger button {{
-            background: {t['error']} !important;
-            border-color: {t['error']} !important;
-        }}
-        
-        .btn-warning button {{
-            background: {t['warning']} !important;
-            border-color: {t['warning']} !important;
-        }}
-        
-        /* Tabs */
-        .stTabs [data-baseweb="tab-list"] {{
-            gap: 0;
-            background: transparent;
-            border-bottom: 1px solid {t['border']};
-        }}
-        
-        .stTabs [data-baseweb="tab"] {{
-            border-radius: 8px 8px 0 0;
-            color: {t['text_secondary']} !important;
-            font-weight: 500;
-            padding: 0.75rem 1.5rem;
-            border: none;
-            background: transparent;
-        }}
-        
-        .stTabs [aria-selected="true"] {{
-            background: {t['accent']} !important;
-            color: white !important;
-        }}
-        
-        /* Tables */
-        .dataframe {{
-            background: {t['card_bg']} !important;
-            color: {t['text']} !important;
-        }}
-        
-        .dataframe th {{
-            background: {t['surface']} !important;
-            color: {t['text']} !important;
-        }}
-        
-        .dataframe td {{
-            background: {t['card_bg']} !important;
-            color: {t['text']} !important;
-            border-color: {t['border']} !important;
-        }}
-        
-        /* Sidebar */
-        [data-testid="stSidebar"] {{
-            background: {t['surface']} !important;
-            border-right: 1px solid {t['border']};
-        }}
-        
-        /* Progress bars */
-        .stProgress > div > div > div > div {{
-            background: linear-gradient(90deg, {t['accent']}, {t['success']});
-        }}
-        
-        /* Hide Streamlit branding */
-        #MainMenu {{visibility: hidden;}}
-        footer {{visibility: hidden;}}
-        header {{visibility: hidden;}}
-        
-        /* Custom scrollbar */
-        ::-webkit-scrollbar {{
-            width: 6px;
-        }}
-        
-        ::-webkit-scrollbar-track {{
-            background: {t['bg']};
-        }}
-        
-        ::-webkit-scrollbar-thumb {{
-            background: {t['border']};
-            border-radius: 3px;
-        }}
-        
-        ::-webkit-scrollbar-thumb:hover {{
-            background: {t['accent']};
-        }}
-    </style>
-    """
-    st.markdown(css, unsafe_allow_html=True)
+    """Wendet das moderne Dark Theme an (CSS aus core.styles)"""
+    use_stylesheet("admin", get_theme())
 
 # ---------------------- DATEN-FUNKTIONEN ----------------------
-def load_user_data(username: str):
-    """Lädt die Daten eines Benutzers"""
-    user_file = os.path.join(ANSWERS_DIR, f"{username}.json")
-    if not os.path.exists(user_file):
-        return {"username": username, "runs": []}
-    
+@profiled("settings")
+def load_app_settings():
+    """Lädt ./data/settings.json (gemeinsam mit main.py)"""
     try:
-        with open(user_file, "r", encoding="utf-8") as f:
+        with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
             return json.load(f)
-    except Exception as e:
-        return {"username": username, "runs": []}
+    except Exception:
+        return {"current_theme": "Purple Dream", "custom_theme": None}
+
+def save_app_settings(settings):
+    """Speichert ./data/settings.json"""
+    with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
+        json.dump(settings, f, indent=2, ensure_ascii=False)
+
+def get_user_run_stats():
+    """(bestes Ergebnis in %, Versuche) pro Benutzer über alle Quizze - ResultsStore und Archiv"""
+    archive = get_archive()
+    results = get_results_store().all()
+    stats = {username: [None, runs] for username, runs in archive.attempts_by_user().items()}
+    for result in results:
+        stats.setdefault(result.get("username"), [None, 0])[1] += 1
+    for result in [r for r in results if is_ranked(r)] + archive.leaderboard_entries():
+        entry = stats.setdefault(result.get("username"), [None, 0])
+        percentage = result.get("percentage", 0)
+        if entry[0] is None or percentage > entry[0]:
+            entry[0] = percentage
+    return stats
 
-def get_leaderboard():
-    """Erstellt eine Bestenliste basierend auf Runs"""
-    if not os.path.exists(ANSWERS_DIR):
-        return []
+@profiled("leaderboard")
+def get_leaderboard(quiz_id: str):
+    """
+    Bestes Ergebnis pro Benutzer in einem Quiz (wie main.get_leaderboard_data):
+    ResultsStore plus voraggregierte Bestergebnisse und Versuche aus dem Archiv
+    """
+    archive = get_archive()
+    results = [r for r in get_results_store().all() if quiz_id_of(r) == quiz_id]
+    attempts = archive.attempts_by_user(quiz=quiz_id)
+    for result in results:
+        attempts[result.get("username")] = attempts.get(result.get("username"), 0) + 1
     
-    leaderboard = []
+    ranked = [r for r in results if is_ranked(r)] + archive.leaderboard_entries(quiz=quiz_id)
+    ranked.sort(key=lambda r: (-r.get("percentage", 0), r.get("time_taken", 0)))
+    best = {}
+    for result in ranked:
+        best.setdefault(result.get("username"), result)
     
-    for filename in os.listdir(ANSWERS_DIR):
-        if not filename.endswith(".json"):
-            continue
-        
-        username = filename[:-5]
-        user_data = load_user_data(username)
-        
-        runs = user_data.get("runs", [])
-        if not runs:
-            continue
-        
-        # Bestes Ergebnis pro Nutzer
-        best_run = max(runs, key=lambda x: x.get("percentage", 0))
-        
-        leaderboard.append({
+    info = get_catalog().info(quiz_id)
+    quiz_name = info.title if info else quiz_id
+    return [
+        {
             "username": username,
-            "score": best_run.get("percentage", 0),
-            "correct": best_run.get("correct", 0),
-            "total": best_run.get("total", 0),
-            "time": best_run.get("time_seconds", 0),
-            "quiz_name": best_run.get("quiz_name", "Unbekannt"),
-            "timestamp": best_run.get("timestamp", ""),
-            "attempts": len(runs)
-        })
-    
-    leaderboard.sort(key=lambda x: (-x["score"], x["time"]))
-    return leaderboard
+            "score": result.get("percentage", 0),
+            "correct": result.get("score", 0),
+            "total": result.get("total", 0),
+            "time": result.get("time_taken", 0),
+            "quiz_name": quiz_name,
+            "timestamp": result.get("timestamp", ""),
+            "attempts": attempts.get(username, 0)
+        }
+        for username, result in best.items()
+    ]
 
 def get_user_stats():
     """Gibt Statistiken über alle Benutzer zurück"""
@@ -352,13 +156,8 @@ def get_user_stats():
     active_users = sum(1 for u in users.values() if u.active)
     admin_users = sum(1 for u in users.values() if u.role == UserRole.ADMIN)
     
-    # Quiz-Statistiken
-    total_attempts = 0
-    if os.path.exists(ANSWERS_DIR):
-        for filename in os.listdir(ANSWERS_DIR):
-            if filename.endswith(".json"):
-                user_data = load_user_data(filename[:-5])
-                total_attempts += len(user_data.get("runs", []))
+    # Quiz-Statistiken (archivierte Durchläufe zählen mit)
+    total_attempts = len(get_results_store().all()) + get_archive().archived_runs
     
     return {
         "total": total_users,
@@ -379,10 +178,10 @@ def show_user_management(current_admin):
     """Benutzerverwaltung mit modernem Design"""
     t = get_theme()
     
-    st.markdown("<div class='admin-header'>", unsafe_allow_html=True)
-    st.markdown("<div class='admin-title'>👥 Benutzerverwaltung</div>", unsafe_allow_html=True)
-    st.markdown("<div class='admin-subtitle'>Verwalten Sie Benutzerkonten und Berechtigungen</div>", unsafe_allow_html=True)
-    st.markdown("</div>", unsafe_allow_html=True)
+    render_html("<div class='admin-header'>")
+    render_html("<div class='admin-title'>👥 Benutzerverwaltung</div>")
+    render_html("<div class='admin-subtitle'>Verwalten Sie Benutzerkonten und Berechtigungen</div>")
+    render_html("</div>")
     
     # Statistiken
     stats = get_user_stats()
@@ -390,36 +189,36 @@ def show_user_management(current_admin):
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.markdown(f'''
+        render_html(f'''
         <div class="stats-card">
             <div class="stats-label">Gesamt Benutzer</div>
             <div class="stats-value">{stats['total']}</div>
         </div>
-        ''', unsafe_allow_html=True)
+        ''')
     
     with col2:
-        st.markdown(f'''
+        render_html(f'''
         <div class="stats-card">
             <div class="stats-label">Aktiv</div>
             <div class="stats-value">{stats['active']}</div>
         </div>
-        ''', unsafe_allow_html=True)
+        ''')
     
     with col3:
-        st.markdown(f'''
+        render_html(f'''
         <div class="stats-card">
             <div class="stats-label">Admins</div>
             <div class="stats-value">{stats['admins']}</div>
         </div>
-        ''', unsafe_allow_html=True)
+        ''')
     
     with col4:
-        st.markdown(f'''
+        render_html(f'''
         <div class="stats-card">
             <div class="stats-label">Quiz Versuche</div>
             <div class="stats-value">{stats['total_attempts']}</div>
         </div>
-        ''', unsafe_allow_html=True)
+        ''')
     
     # Neuen Benutzer hinzufügen
     with st.expander("➕ Neuen Benutzer erstellen", expanded=True):
@@ -511,13 +310,14 @@ def show_user_management(current_admin):
         st.info("ℹ️ Keine Benutzer gefunden")
         return
     
+    run_stats = get_user_run_stats()
     for username, user in filtered_users:
         role_badge = "badge-admin" if user.role == UserRole.ADMIN else "badge-user"
         role_text = "Admin" if user.role == UserRole.ADMIN else "User"
         status_badge = "badge-active" if user.active else "badge-blocked"
         status_text = "Aktiv" if user.active else "Blockiert"
         
-        st.markdown(f'''
+        render_html(f'''
         <div class="user-card">
             <div class="user-header">
                 <div class="user-name">👤 {username}</div>
@@ -527,28 +327,28 @@ def show_user_management(current_admin):
                 </div>
             </div>
         </div>
-        ''', unsafe_allow_html=True)
+        ''')
         
         # Aktionen
         col1, col2, col3, col4 = st.columns([1, 1, 1, 2])
         
         with col1:
             if user.active:
-                st.markdown('<div class="btn-danger">', unsafe_allow_html=True)
+                render_html('<div class="btn-danger">')
                 if st.button("🚫 Blockieren", key=f"block_{username}", use_container_width=True):
                     user.active = False
                     auth_manager.save_users(users)
                     st.success(f"✅ '{username}' wurde blockiert")
                     st.rerun()
-                st.markdown('</div>', unsafe_allow_html=True)
+                render_html('</div>')
             else:
-                st.markdown('<div class="btn-success">', unsafe_allow_html=True)
+                render_html('<div class="btn-success">')
                 if st.button("✅ Aktivieren", key=f"activate_{username}", use_container_width=True):
                     user.active = True
                     auth_manager.save_users(users)
                     st.success(f"✅ '{username}' wurde aktiviert")
                     st.rerun()
-                st.markdown('</div>', unsafe_allow_html=True)
+                render_html('</div>')
         
         with col2:
             if user.role == UserRole.ADMIN:
@@ -576,11 +376,11 @@ def show_user_management(current_admin):
         
         with col4:
             # Benutzerstatistiken anzeigen
-            user_data = load_user_data(username)
-            runs = user_data.get("runs", [])
-            if runs:
-                best_score = max(run.get("percentage", 0) for run in runs)
-                st.info(f"📊 Bestes Ergebnis: {best_score:.1f}% ({len(runs)} Versuche)")
+            best_score, attempts = run_stats.get(username, (None, 0))
+            if best_score is not None:
+                st.info(f"📊 Bestes Ergebnis: {best_score:.1f}% ({attempts} Versuche)")
+            elif attempts:
+                st.info(f"📊 {attempts} Versuche")
             else:
                 st.info("📊 Noch keine Quiz-Versuche")
         
@@ -591,15 +391,27 @@ def show_leaderboard_tab():
     """Bestenliste im Admin-Panel"""
     t = get_theme()
     
-    st.markdown("<div class='admin-header'>", unsafe_allow_html=True)
-    st.markdown("<div class='admin-title'>🏆 Bestenliste</div>", unsafe_allow_html=True)
-    st.markdown("<div class='admin-subtitle'>Übersicht der besten Ergebnisse</div>", unsafe_allow_html=True)
-    st.markdown("</div>", unsafe_allow_html=True)
+    render_html("<div class='admin-header'>")
+    render_html("<div class='admin-title'>🏆 Bestenliste</div>")
+    render_html("<div class='admin-subtitle'>Übersicht der besten Ergebnisse</div>")
+    render_html("</div>")
     
-    leaderboard = get_leaderboard()
+    # Pro Quiz (Ergebnisse verschiedener Quizze sind nicht vergleichbar, vgl. main.py)
+    manifest = get_catalog().manifest()
+    titles = {info.quiz_id: info.title for info in manifest}
+    quiz_ids = list(titles) or [DEFAULT_QUIZ_ID]
+    quiz_id = st.selectbox(
+        "Quiz",
+        quiz_ids,
+        index=quiz_ids.index(DEFAULT_QUIZ_ID) if DEFAULT_QUIZ_ID in quiz_ids else 0,
+        format_func=lambda q: titles.get(q, q),
+        key="admin_leaderboard_quiz"
+    )
+    leaderboard = get_leaderboard(quiz_id)
     
     if not leaderboard:
         st.info("ℹ️ Noch keine Quiz-Ergebnisse vorhanden")
+        show_history_export()
         return
     
     # Top 3 hervorheben
@@ -609,7 +421,7 @@ def show_leaderboard_tab():
         with col1:
             if len(leaderboard) > 0:
                 user = leaderboard[0]
-                st.markdown(f'''
+                render_html(f'''
                 <div style="background: linear-gradient(135deg, {t['warning']}20, {t['accent']}20); 
                             border: 2px solid {t['warning']}; border-radius: 16px; padding: 2rem; text-align: center;">
                     <div style="font-size: 3rem;">🥇</div>
@@ -619,12 +431,12 @@ def show_leaderboard_tab():
                         {user['correct']}/{user['total']} • {format_time(user['time'])}
                     </div>
                 </div>
-                ''', unsafe_allow_html=True)
+                ''')
         
         with col2:
             if len(leaderboard) > 1:
                 user = leaderboard[1]
-                st.markdown(f'''
+                render_html(f'''
                 <div style="background: linear-gradient(135deg, {t['text_secondary']}20, {t['surface_light']}); 
                             border: 2px solid {t['text_secondary']}; border-radius: 16px; padding: 2rem; text-align: center;">
                     <div style="font-size: 3rem;">🥈</div>
@@ -634,12 +446,12 @@ def show_leaderboard_tab():
                         {user['correct']}/{user['total']} • {format_time(user['time'])}
                     </div>
                 </div>
-                ''', unsafe_allow_html=True)
+                ''')
         
         with col3:
             if len(leaderboard) > 2:
                 user = leaderboard[2]
-                st.markdown(f'''
+                render_html(f'''
                 <div style="background: linear-gradient(135deg, {t['warning']}15, {t['surface_light']}); 
                             border: 2px solid {t['warning']}80; border-radius: 16px; padding: 2rem; text-align: center;">
                     <div style="font-size: 3rem;">🥉</div>
@@ -649,7 +461,7 @@ def show_leaderboard_tab():
                         {user['correct']}/{user['total']} • {format_time(user['time'])}
                     </div>
                 </div>
-                ''', unsafe_allow_html=True)
+                ''')
     
     # Detaillierte Tabelle
     st.markdown("### 📊 Detaillierte Übersicht")
@@ -670,145 +482,692 @@ def show_leaderboard_tab():
     df = pd.DataFrame(table_data)
     st.dataframe(df, use_container_width=True, hide_index=True)
     
-    # Export-Button
-    if st.button("📥 Als CSV exportieren"):
-        csv = df.to_csv(index=False)
-        st.download_button(
-            label="📥 CSV herunterladen",
-            data=csv,
-            file_name="bestenliste.csv",
-            mime="text/csv"
+    # Export über core.export (Datei unter static/exports statt Bytes im Speicher)
+    show_export_link(
+        "leaderboard_export", "📥 Als CSV exportieren", (),
+        lambda: export.publish(
+            lambda sink: export.write_csv(sink, table_data, list(df.columns)), "bestenliste.csv"
+        )
+    )
+    
+    show_history_export()
+
+def show_export_link(key: str, label: str, signature, build):
+    """
+    Button erstellt die Datei (core.export.publish), danach bleibt der
+    Download-Link über Reruns stehen - bis sich signature (z.B. die Filter)
+    ändert oder der Export abläuft
+    """
+    if not st.get_option("server.enableStaticServing"):
+        st.error("❌ Downloads benötigen server.enableStaticServing (.streamlit/config.toml)")
+        return
+    if st.button(label, key=f"{key}_create", use_container_width=True):
+        try:
+            st.session_state[key] = (signature, build())
+        except (OSError, RuntimeError, ValueError) as e:
+            st.error(f"❌ Export fehlgeschlagen: {e}")
+            return
+    
+    saved_signature, published = st.session_state.get(key, (None, None))
+    if published is None or saved_signature != signature:
+        return
+    if time.time() - published.created > export.EXPORT_TTL:
+        st.session_state.pop(key, None)
+        return
+    size_mb = published.size / 1024 / 1024
+    if not published.servable:
+        st.warning(f"⚠️ Der Export ist {size_mb:.0f} MB groß und zu groß für den Download "
+                   f"(höchstens {export.MAX_SERVED_BYTES // 1024 // 1024} MB) - bitte die Filter einschränken.")
+        return
+    t = get_theme()
+    render_html(f"""
+        <a href="{html.escape(published.url)}" download="{html.escape(published.filename)}"
+           style="display: block; text-align: center; padding: 0.6rem; border-radius: 10px;
+                  background: {t['accent']}; color: white; text-decoration: none; font-weight: 600;">
+            📥 {html.escape(published.filename)} herunterladen ({size_mb:.1f} MB)
+        </a>
+    """)
+
+def show_history_export():
+    """Export der kompletten Historie (alle Runs bzw. Antworten) in Blöcken"""
+    st.markdown("### 📦 Komplette Historie exportieren")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        level = st.selectbox(
+            "Inhalt", export.LEVELS,
+            format_func=lambda x: "Alle Durchläufe" if x == "runs" else "Alle Antworten",
+            key="export_level"
         )
+    with col2:
+        fmt = st.selectbox("Format", export.FORMATS, format_func=str.upper, key="export_format")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        quiz = st.text_input("Quiz-ID", placeholder="alle", key="export_quiz")
+    with col2:
+        user = st.text_input("Benutzer", placeholder="alle", key="export_user")
+    with col3:
+        since = st.date_input("Von", value=None, key="export_since")
+    with col4:
+        until = st.date_input("Bis", value=None, key="export_until")
+    
+    try:
+        export.require_format(fmt)
+    except RuntimeError as e:
+        st.error(f"❌ {e}")
+        return
+    filters = dict(quiz=quiz.strip() or None, user=user.strip() or None, since=since, until=until)
+    
+    # Blockweise in eine Datei unter static/exports; Streamlit liefert sie in
+    # Blöcken aus, der Export liegt also nie komplett im Speicher
+    show_export_link(
+        "history_export", f"📦 {fmt.upper()}-Export erstellen", (level, fmt, tuple(filters.values())),
+        lambda: export.publish_export(fmt=fmt, level=level, **filters)
+    )
 
 # ---------------------- QUIZ-STATISTIKEN ----------------------
 def show_quiz_statistics():
     """Detaillierte Quiz-Statistiken"""
     t = get_theme()
     
-    st.markdown("<div class='admin-header'>", unsafe_allow_html=True)
-    st.markdown("<div class='admin-title'>📈 Quiz-Statistiken</div>", unsafe_allow_html=True)
-    st.markdown("<div class='admin-subtitle'>Detaillierte Analysen und Metriken</div>", unsafe_allow_html=True)
-    st.markdown("</div>", unsafe_allow_html=True)
+    render_html("<div class='admin-header'>")
+    render_html("<div class='admin-title'>📈 Quiz-Statistiken</div>")
+    render_html("<div class='admin-subtitle'>Detaillierte Analysen und Metriken</div>")
+    render_html("</div>")
     
-    if not os.path.exists(ANSWERS_DIR):
-        st.info("ℹ️ Noch keine Quiz-Daten vorhanden")
-        return
-    
-    # Alle Runs sammeln
-    all_runs = []
-    for filename in os.listdir(ANSWERS_DIR):
-        if filename.endswith(".json"):
-            user_data = load_user_data(filename[:-5])
-            all_runs.extend(user_data.get("runs", []))
+    show_distribution_stats()
+    show_timing_stats()
+    show_write_queue_metrics()
+    show_duplicate_cleanup()
     
-    if not all_runs:
+    # Durchläufe aus dem ResultsStore, archivierte über die Zusammenfassung des
+    # Archivs; Mittelwerte aus den Sketches (enthalten das Archiv, nur gewertete Läufe)
+    results = get_results_store().all()
+    archive = get_archive()
+    archived = archive.runs_by_quiz()
+    total_runs = len(results) + archive.archived_runs
+    if not total_runs:
         st.info("ℹ️ Noch keine Quiz-Versuche vorhanden")
         return
     
-    # Statistiken berechnen
-    total_runs = len(all_runs)
-    avg_score = sum(run.get("percentage", 0) for run in all_runs) / total_runs
-    avg_time = sum(run.get("time_seconds", 0) for run in all_runs) / total_runs
-    total_questions = sum(run.get("total", 0) for run in all_runs)
-    total_correct = sum(run.get("correct", 0) for run in all_runs)
+    sketches = get_sketch_store()
+    avg_score = sketches.query("percentage").sketch.mean
+    avg_time = sketches.query("time_taken").sketch.mean
+    participants = {r.get("username") for r in results} | set(archive.attempts_by_user())
     
     # Quiz-Verteilung
-    quiz_distribution = {}
-    for run in all_runs:
-        quiz_name = run.get("quiz_name", "Unbekannt")
-        quiz_distribution[quiz_name] = quiz_distribution.get(quiz_name, 0) + 1
+    quiz_distribution = dict(archived)
+    for result in results:
+        quiz_distribution[quiz_id_of(result)] = quiz_distribution.get(quiz_id_of(result), 0) + 1
+    titles = {info.quiz_id: info.title for info in get_catalog().manifest(include_invalid=True)}
     
     # Statistiken anzeigen
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.markdown(f'''
+        render_html(f'''
         <div class="stats-card">
             <div class="stats-label">Gesamt Versuche</div>
             <div class="stats-value">{total_runs}</div>
         </div>
-        ''', unsafe_allow_html=True)
+        ''')
     
     with col2:
-        st.markdown(f'''
+        render_html(f'''
         <div class="stats-card">
             <div class="stats-label">Ø Ergebnis</div>
-            <div class="stats-value">{avg_score:.1f}%</div>
+            <div class="stats-value">{f"{avg_score:.1f}%" if avg_score is not None else "–"}</div>
         </div>
-        ''', unsafe_allow_html=True)
+        ''')
     
     with col3:
-        st.markdown(f'''
+        render_html(f'''
         <div class="stats-card">
             <div class="stats-label">Ø Zeit</div>
-            <div class="stats-value" style="font-size: 1.8rem;">{format_time(avg_time)}</div>
+            <div class="stats-value" style="font-size: 1.8rem;">{format_time(avg_time) if avg_time is not None else "–"}</div>
         </div>
-        ''', unsafe_allow_html=True)
+        ''')
     
     with col4:
-        st.markdown(f'''
+        render_html(f'''
         <div class="stats-card">
-            <div class="stats-label">Richtige Antworten</div>
-            <div class="stats-value">{total_correct}</div>
+            <div class="stats-label">Teilnehmer</div>
+            <div class="stats-value">{len(participants)}</div>
         </div>
-        ''', unsafe_allow_html=True)
+        ''')
     
     # Quiz-Verteilung
     st.markdown("### 📊 Quiz-Verteilung")
     
     quiz_data = []
-    for quiz_name, count in quiz_distribution.items():
-        quiz_runs = [r for r in all_runs if r.get("quiz_name") == quiz_name]
-        avg_quiz_score = sum(r.get("percentage", 0) for r in quiz_runs) / len(quiz_runs) if quiz_runs else 0
+    for quiz_id, count in sorted(quiz_distribution.items(), key=lambda item: -item[1]):
+        avg_quiz_score = sketches.query("percentage", quizzes=[quiz_id]).sketch.mean
         quiz_data.append({
-            "Quiz": quiz_name,
+            "Quiz": titles.get(quiz_id, quiz_id),
             "Versuche": count,
-            "Ø Ergebnis": f"{avg_quiz_score:.1f}%"
+            "davon archiviert": archived.get(quiz_id, 0),
+            "Ø Ergebnis": f"{avg_quiz_score:.1f}%" if avg_quiz_score is not None else "–"
         })
     
     quiz_df = pd.DataFrame(quiz_data)
     st.dataframe(quiz_df, use_container_width=True, hide_index=True)
     
-    # Letzte Aktivitäten
+    # Letzte Aktivitäten (archivierte Durchläufe sind per Definition älter)
     st.markdown("### 📅 Letzte Aktivitäten")
     
-    # Sortiere nach Zeitstempel
-    recent_runs = sorted(all_runs, key=lambda x: x.get("timestamp", ""), reverse=True)[:10]
+    recent_runs = sorted(results, key=lambda x: x.get("timestamp", ""), reverse=True)[:10]
     
     for run in recent_runs:
         timestamp = run.get("timestamp", "")[:19]
-        username = "Unbekannt"
-        # Username aus Dateiname ermitteln
-        for filename in os.listdir(ANSWERS_DIR):
-            if filename.endswith(".json"):
-                user_data = load_user_data(filename[:-5])
-                if run in user_data.get("runs", []):
-                    username = filename[:-5]
-                    break
-        
+        quiz_name = titles.get(quiz_id_of(run), quiz_id_of(run))
         st.markdown(f"""
-        **{username}** - {run.get('quiz_name', 'Unbekannt')}  
-        ⭐ {run.get('percentage', 0):.1f}% ({run.get('correct', 0)}/{run.get('total', 0)})  
-        ⏱️ {format_time(run.get('time_seconds', 0))} • 📅 {timestamp}
+        **{run.get('username', 'Unbekannt')}** - {quiz_name}  
+        ⭐ {run.get('percentage', 0):.1f}% ({run.get('score', 0)}/{run.get('total', 0)})  
+        ⏱️ {format_time(run.get('time_taken', 0))} • 📅 {timestamp}
         """)
         st.markdown("---")
 
+def show_distribution_stats():
+    """Perzentile und Histogramme aus den gespeicherten Sketches"""
+    t = get_theme()
+    store = get_sketch_store()
+    quizzes = store.quizzes()
+    if not quizzes:
+        return
+    
+    st.markdown("### 📐 Verteilungen")
+    first_day, last_day = store.window_range()
+    col1, col2 = st.columns([2, 2])
+    with col1:
+        selected = st.multiselect("Quiz", quizzes, default=quizzes, key="dist_quizzes")
+    with col2:
+        period = st.date_input("Zeitraum", value=(first_day, last_day), key="dist_period")
+    since, until = (period + (None, None))[:2] if isinstance(period, tuple) else (period, period)
+    
+    labels = {
+        "percentage": ("Ergebnis", "%"),
+        "time_taken": ("Gesamtzeit", "s"),
+        "avg_time_per_question": ("Ø Zeit pro Frage", "s"),
+    }
+    for metric, (label, unit) in labels.items():
+        summary = store.query(metric, quizzes=selected, since=since, until=until)
+        if not summary.sketch.count:
+            continue
+        st.markdown(f"**{label}** ({summary.sketch.count} Versuche)")
+        cols = st.columns(4)
+        values = {"Ø": summary.sketch.mean, **summary.percentiles()}
+        for col, (name, value) in zip(cols, values.items()):
+            with col:
+                render_html(f'''
+                <div class="stats-card">
+                    <div class="stats-label">{name}</div>
+                    <div class="stats-value" style="font-size: 1.8rem;">{value:.1f}{unit}</div>
+                </div>
+                ''')
+        st.bar_chart(
+            pd.DataFrame({"Versuche": summary.hist.counts}, index=summary.hist.labels()),
+            color=t['accent']
+        )
+
+def show_timing_stats():
+    """Denkzeit der Spieler und Renderzeit des Servers pro Frage"""
+    t = get_theme()
+    stats = get_timing_stats()
+    quizzes = stats.quizzes()
+    if not quizzes:
+        return
+    
+    st.markdown("### ⏱️ Antwortzeiten")
+    quiz_id = st.selectbox("Quiz", quizzes, key="timing_quiz")
+    labels = {"think": "Denkzeit (Spieler)", "render": "Renderzeit (Server)"}
+    
+    cols = st.columns(2)
+    for col, (kind, label) in zip(cols, labels.items()):
+        summary = stats.query(quiz_id, kind)
+        with col:
+            if not summary.sketch.count:
+                st.caption(f"{label}: noch keine Messwerte")
+                continue
+            unit = UNITS[kind]
+            p50, p90, p99 = (summary.sketch.quantile(q) for q in (0.5, 0.9, 0.99))
+            st.markdown(f"**{label}** · p50 {p50:.1f} {unit} · p90 {p90:.1f} {unit} · "
+                        f"p99 {p99:.1f} {unit} ({summary.sketch.count} Messungen)")
+            st.bar_chart(
+                pd.DataFrame({"Antworten": summary.hist.counts}, index=summary.hist.labels()),
+                color=t['accent']
+            )
+    
+    # Pro Frage: langsame Fragen (Denkzeit) vs. langsamer Server (Renderzeit)
+    # Fragen, die nicht mehr im Quiz stehen, kommen ans Ende
+    quiz = get_catalog().get(quiz_id)
+    positioned = [
+        (quiz.position(key) if quiz else None, kinds)
+        for key, kinds in stats.per_question(quiz_id).items()
+    ]
+    positioned.sort(key=lambda entry: (entry[0] is None, entry[0] or 0))
+    rows = []
+    for qid, kinds in positioned:
+        think, render = kinds.get("think"), kinds.get("render")
+        rows.append({
+            "Nr.": qid + 1 if qid is not None else None,
+            "Frage": quiz.questions[qid] if qid is not None else "(nicht mehr im Quiz)",
+            "Antworten": think.sketch.count if think else 0,
+            "Denkzeit p50 (s)": round(think.sketch.quantile(0.5), 1) if think else None,
+            "Denkzeit p90 (s)": round(think.sketch.quantile(0.9), 1) if think else None,
+            "Render p50 (ms)": round(render.sketch.quantile(0.5), 1) if render else None,
+            "Render p90 (ms)": round(render.sketch.quantile(0.9), 1) if render else None,
+        })
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+def show_write_queue_metrics():
+    """Kennzahlen der Write-Behind-Queue für Ergebnisse"""
+    with st.expander("💾 Ergebnis-Schreibqueue"):
+        m = get_write_queue().metrics()
+        col1, col2, col3, col4 = st.columns(4)
+        cards = [
+            (col1, "Queue-Tiefe", m["queue_depth"]),
+            (col2, "Group Commits", m["commits"]),
+            (col3, "Ø Batch", f"{m['avg_batch']:.1f}"),
+            (col4, "Commit p99", f"{m['commit_ms_p99'] or 0:.1f} ms"),
+        ]
+        for col, label, value in cards:
+            with col:
+                render_html(f'''
+                <div class="stats-card">
+                    <div class="stats-label">{label}</div>
+                    <div class="stats-value" style="font-size: 1.8rem;">{value}</div>
+                </div>
+                ''')
+        st.caption(
+            f"Modus: **{m['durability']}** (settings.json → result_durability) • "
+            f"Bestätigung p50/p99: {m['ack_ms_p50'] or 0:.1f} / {m['ack_ms_p99'] or 0:.1f} ms • "
+            f"größter Batch: {m['max_batch']} • Fehler: {m['errors']}"
+        )
+
+def show_duplicate_cleanup():
+    """
+    Einmalige Bereinigung doppelt gespeicherter Durchläufe.
+
+    Die Suche liest alle Ergebnisse und läuft deshalb nur auf Klick. Nach dem
+    Löschen werden alle aus Ergebnissen abgeleiteten Daten neu aufgebaut:
+    Sketches, Perzentil-Rang, Frage-Schwierigkeiten und die Wiederholungspläne
+    der betroffenen Benutzer. Die Antwortzeiten (core.timing) bleiben, sie
+    werden beim Beantworten erfasst, nicht aus gespeicherten Ergebnissen - ein
+    doppelt gespeicherter Durchlauf wurde nur einmal beantwortet.
+    """
+    with st.expander("🧹 Doppelte Ergebnisse bereinigen"):
+        store = get_results_store()
+        if st.button("🔍 Prüfen", key="dedupe_check"):
+            st.session_state.dedupe_found = find_duplicate_runs(store.items())
+        
+        duplicates = st.session_state.get("dedupe_found")
+        if duplicates is None:
+            st.caption("Sucht in allen Ergebnissen nach doppelt gespeicherten Durchläufen.")
+            return
+        if not duplicates:
+            st.success("✅ Keine doppelten Ergebnisse gefunden")
+            return
+        
+        st.warning(f"⚠️ {len(duplicates)} doppelte Ergebnis-Dateien gefunden (das früheste Ergebnis bleibt erhalten)")
+        st.code("\n".join(duplicates[:50]) + ("\n..." if len(duplicates) > 50 else ""))
+        
+        if st.button("🧹 Duplikate löschen", key="dedupe_apply"):
+            # Journal leeren, sonst würden gelöschte Dateien beim Neustart wiederhergestellt
+            get_write_queue().flush(checkpoint=True)
+            by_name = dict(store.items())
+            removed = dedupe_answers_dir(apply=True)
+            affected = {by_name[name].get("username") for name in removed if name in by_name}
+            results = store.all()
+            get_sketch_store().rebuild(results, base=get_archive().sketches)
+            get_ranking().build(results, get_archive().rank_histogram())
+            get_item_bank().rebuild(results)
+            reviews = get_review_scheduler()
+            for username in affected:
+                reviews.rebuild(username)
+            st.session_state.pop("dedupe_found", None)
+            st.success(f"✅ {len(removed)} Duplikate entfernt")
+            st.rerun()
+
+# ---------------------- ARCHIV ----------------------
+def show_archive_tab():
+    """Archivierte Durchläufe: Bundles, Aufbewahrung und Abfrage bei Bedarf"""
+    render_html("<div class='admin-header'>")
+    render_html("<div class='admin-title'>🗄️ Archiv</div>")
+    render_html("<div class='admin-subtitle'>Alte Durchläufe in komprimierten Monats-Bundles</div>")
+    render_html("</div>")
+    
+    archive = get_archive()
+    bundles = archive.bundles()
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        render_html(f'''
+        <div class="stats-card">
+            <div class="stats-label">Archivierte Versuche</div>
+            <div class="stats-value">{archive.archived_runs}</div>
+        </div>
+        ''')
+    with col2:
+        render_html(f'''
+        <div class="stats-card">
+            <div class="stats-label">Bundles</div>
+            <div class="stats-value">{len(bundles)}</div>
+        </div>
+        ''')
+    with col3:
+        render_html(f'''
+        <div class="stats-card">
+            <div class="stats-label">Aktive Ergebnisse</div>
+            <div class="stats-value">{len(get_results_store().all())}</div>
+        </div>
+        ''')
+    
+    # Aufbewahrung
+    st.markdown("### ⏳ Aufbewahrung")
+    settings = load_app_settings()
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        days = st.number_input(
+            "Durchläufe archivieren nach (Tagen)", min_value=1, max_value=3650,
+            value=int(settings.get("retention_days") or DEFAULT_RETENTION_DAYS), key="retention_days"
+        )
+    with col2:
+        st.write("")
+        st.write("")
+        if st.button("🗄️ Jetzt archivieren", use_container_width=True):
+            settings["retention_days"] = int(days)
+            save_app_settings(settings)
+            with st.spinner("Archiviere..."):
+                archived = run_retention(int(days))
+            st.success(f"✅ {archived} Durchläufe archiviert")
+    
+    if bundles:
+        st.dataframe(
+            pd.DataFrame([
+                {"Bundle": b["name"], "Monat": b["month"], "Größe": f"{b['size'] / 1024:.1f} KB"}
+                for b in bundles
+            ]),
+            use_container_width=True, hide_index=True
+        )
+    
+    # Abfrage bei Bedarf
+    st.markdown("### 🔍 Archiv durchsuchen")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        user = st.text_input("Benutzer", placeholder="alle", key="archive_user")
+    with col2:
+        quiz = st.text_input("Quiz-ID", placeholder="alle", key="archive_quiz")
+    with col3:
+        since = st.date_input("Von", value=None, key="archive_since")
+    with col4:
+        until = st.date_input("Bis", value=None, key="archive_until")
+    
+    if st.button("🔍 Suchen", key="archive_search"):
+        limit = 500
+        rows = []
+        for result in archive.iter_runs(quiz=quiz.strip() or None, user=user.strip() or None, since=since, until=until):
+            rows.append({
+                "Benutzer": result.get("username"),
+                "Quiz": result.get("quiz_id", "hinduismus"),
+                "Punkte": f"{result.get('score', 0)}/{result.get('total', 0)}",
+                "Prozent": f"{result.get('percentage', 0):.1f}%",
+                "Zeit": format_time(result.get("time_taken", 0)),
+                "Datum": result.get("timestamp", "")[:19],
+            })
+            if len(rows) >= limit:
+                break
+        if rows:
+            st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+            if len(rows) >= limit:
+                st.caption(f"Nur die ersten {limit} Treffer werden angezeigt")
+        else:
+            st.info("ℹ️ Keine archivierten Durchläufe gefunden")
+
+def show_pdf_import_tab():
+    """PDF-Quellen im Hintergrund extrahieren und Fragen-Entwürfe prüfen/übernehmen"""
+    render_html("<div class='admin-header'>")
+    render_html("<div class='admin-title'>📄 PDF-Import</div>")
+    render_html("<div class='admin-subtitle'>Fragen-Entwürfe aus den PDF-Quellen in ./data</div>")
+    render_html("</div>")
+    
+    pipeline = get_pdf_pipeline()
+    sources = pipeline.sources()
+    if not sources:
+        st.info("ℹ️ Keine PDF-Dateien in ./data gefunden")
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("▶️ Extraktion starten", use_container_width=True, key="pdf_start"):
+            pipeline.submit_all()
+    with col2:
+        if st.button("🔄 Alles neu extrahieren", use_container_width=True, key="pdf_force"):
+            pipeline.submit_all(force=True)
+    
+    jobs = {job.path: job for job in pipeline.jobs()}
+    rows = []
+    for path in sources:
+        job = jobs.get(path)
+        rows.append({
+            "Datei": os.path.basename(path),
+            "Größe": f"{os.path.getsize(path) / 1024:.0f} KB",
+            "Status": job.state if job else ("aktuell" if pipeline.is_current(path) else "neu/geändert"),
+            "Seiten": f"{job.pages_done}/{job.pages_total}" if job and job.pages_total else "",
+            "aus Cache": job.pages_cached if job and job.pages_total else "",
+            "Fragen": job.questions if job and job.questions else "",
+            "Fehler": job.error if job and job.error else "",
+        })
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    if any(job.state in ("wartet", "läuft") for job in jobs.values()):
+        st.caption("⏳ Extraktion läuft im Hintergrund - Seite neu laden für den aktuellen Stand")
+    
+    # Entwürfe prüfen und übernehmen
+    drafts = pipeline.drafts()
+    if not drafts:
+        return
+    st.markdown("### 📝 Entwürfe")
+    draft_path = st.selectbox("Entwurf", drafts, format_func=os.path.basename, key="pdf_draft")
+    try:
+        with open(draft_path, "r", encoding="utf-8") as f:
+            draft = json.load(f)
+    except (OSError, ValueError) as e:
+        st.error(f"❌ Entwurf nicht lesbar: {e}")
+        return
+    
+    st.caption(draft.get("description", ""))
+    st.dataframe(
+        pd.DataFrame([
+            {"Frage": q["question"], "Antwort": q["answer"],
+             "Falsche Optionen": " | ".join(o for o in q["options"] if o != q["answer"])}
+            for q in draft.get("questions", [])
+        ]),
+        use_container_width=True, hide_index=True
+    )
+    st.download_button(
+        "📥 Entwurf herunterladen (zum Bearbeiten)",
+        data=json.dumps(draft, ensure_ascii=False, indent=4),
+        file_name=os.path.basename(draft_path),
+        mime="application/json",
+        key="pdf_draft_download"
+    )
+    
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        quiz_id = st.text_input("Quiz-ID für die Übernahme", key="pdf_quiz_id",
+                                value=os.path.splitext(os.path.basename(draft_path))[0])
+    with col2:
+        st.write("")
+        st.write("")
+        if st.button("✅ Als Quiz übernehmen", use_container_width=True, key="pdf_publish"):
+            try:
+                target = pipeline.publish(draft_path, quiz_id.strip())
+                st.success(f"✅ Übernommen als {target}")
+            except ValueError as e:
+                st.error(f"❌ {e}")
+
+def show_question_search_tab():
+    """Volltextsuche über alle Fragen - vor dem Schreiben neuer Fragen nach Dubletten suchen"""
+    render_html("<div class='admin-header'>")
+    render_html("<div class='admin-title'>🔎 Fragensuche</div>")
+    render_html("<div class='admin-subtitle'>Frage- und Antworttexte aller Quizze durchsuchen</div>")
+    render_html("</div>")
+    
+    index = get_question_index()
+    query = st.text_input("Suchbegriffe", placeholder="z.B. heilige Kuh", key="question_search")
+    
+    started = time.perf_counter()
+    hits = index.search(query, limit=50) if query.strip() else []
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    stats = index.stats()
+    st.caption(f"{stats['questions']} Fragen aus {stats['quizzes']} Quizzen · "
+               f"{stats['terms']} Begriffe im Index · Suche: {elapsed_ms:.1f} ms")
+    
+    if not query.strip():
+        return
+    if not hits:
+        st.info("ℹ️ Keine passenden Fragen gefunden")
+        return
+    
+    st.dataframe(
+        pd.DataFrame([
+            {"Quiz": hit.quiz_title, "Nr.": hit.question_id + 1, "Frage": hit.question,
+             "Antwort": hit.answer, "Relevanz": hit.score}
+            for hit in hits
+        ]),
+        use_container_width=True, hide_index=True
+    )
+
+# ---------------------- DIAGNOSE ----------------------
+def format_bytes(size) -> str:
+    if size is None:
+        return "–"
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+def show_diagnostics_tab():
+    """Speicher pro Session und Rerun-Profiler - zum Abschätzen der Servergröße"""
+    render_html("<div class='admin-header'>")
+    render_html("<div class='admin-title'>🩺 Diagnose</div>")
+    render_html("<div class='admin-subtitle'>Speicherbedarf der Sessions und Laufzeit der Reruns</div>")
+    render_html("</div>")
+    
+    st.markdown("### ⏱️ Rerun-Profiler")
+    show_rerun_profiler()
+    st.markdown("### 🧠 Speicher pro Session")
+    show_session_memory()
+
+def show_rerun_profiler():
+    """Abschnitte der letzten Reruns pro Seite (Ringpuffer, siehe core.profiler)"""
+    profiler = get_profiler()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        profiler.enabled = st.toggle("Profiler aktiv (alle Sessions)", value=profiler.enabled, key="profiler_enabled")
+    with col2:
+        st.toggle("Overlay in meiner Session", key="profiler_overlay",
+                  help="Zeigt auf jeder Seite unten rechts die Abschnitte des aktuellen Reruns")
+    with col3:
+        if st.button("🗑️ Puffer leeren", key="profiler_clear"):
+            profiler.clear()
+    
+    pages = profiler.pages()
+    if not pages:
+        st.info("ℹ️ Noch keine Reruns aufgezeichnet")
+        return
+    page = st.selectbox("Seite", pages, key="profiler_page")
+    profiles = profiler.profiles(page)
+    totals = sorted(p.total_ms for p in profiles)
+    st.caption(f"{len(profiles)} Reruns im Puffer • Ø {sum(totals) / len(totals):.1f} ms • "
+               f"p95 {totals[min(len(totals) - 1, int(len(totals) * 0.95))]:.1f} ms • "
+               f"Abschnitte inklusiv gemessen (markdown in theme zählt in beiden)")
+    st.dataframe(pd.DataFrame([
+        {"Abschnitt": name, "Reruns": count, "Ø ms": round(mean, 2), "p95 ms": round(p95, 2),
+         "Anteil %": round(share, 1)}
+        for name, count, mean, p95, share in profiler.breakdown(page)
+    ]), use_container_width=True, hide_index=True)
+    
+    st.markdown("#### Langsamste Reruns")
+    st.dataframe(pd.DataFrame([
+        {"Zeit": datetime.fromtimestamp(p.started).strftime('%H:%M:%S'), "Seite": p.page, "Benutzer": p.user,
+         "Gesamt ms": round(p.total_ms, 1), "abgebrochen": "ja" if p.aborted else "",
+         "Abschnitte": ", ".join(f"{name} {ms:.0f}" for name, (ms, _) in
+                                 sorted(p.sections.items(), key=lambda item: -item[1][0])[:4])}
+        for p in profiler.slowest()
+    ]), use_container_width=True, hide_index=True)
+
+def show_session_memory():
+    """Speicher pro verbundener Session"""
+    # Messen läuft über alle Sessions - nur auf Knopfdruck, nicht bei jedem Rerun
+    if st.button("🔍 Sessions messen", key="memory_measure"):
+        started = time.perf_counter()
+        st.session_state.memory_report = collect_memory()
+        st.session_state.memory_report_ms = (time.perf_counter() - started) * 1000
+    report = st.session_state.get("memory_report")
+    if report is None:
+        st.info("ℹ️ Noch keine Messung")
+        return
+    
+    count = len(report.sessions)
+    col1, col2, col3, col4 = st.columns(4)
+    cards = [
+        (col1, "Sessions", count),
+        (col2, "Session-State gesamt", format_bytes(report.total)),
+        (col3, "Ø pro Session", format_bytes(report.total / count) if count else "–"),
+        (col4, "Prozess-RSS", format_bytes(report.rss)),
+    ]
+    for col, label, value in cards:
+        with col:
+            render_html(f'''
+            <div class="stats-card">
+                <div class="stats-label">{label}</div>
+                <div class="stats-value" style="font-size: 1.8rem;">{value}</div>
+            </div>
+            ''')
+    st.caption(
+        f"RSS: {report.rss_source} • Messung: {st.session_state.memory_report_ms:.0f} ms"
+        + (f" • {report.skipped} Session(s) übersprungen (Zustand änderte sich)" if report.skipped else "")
+        + " • Kompilierte Quizze und Live-Räume gehören allen Sessions und zählen nicht mit"
+    )
+    if not count:
+        return
+    
+    for session_id, key, size in report.flagged()[:10]:
+        user = next(s.user for s in report.sessions if s.session_id == session_id)
+        st.warning(f"⚠️ `{key}` belegt {format_bytes(size)} in der Session von {user}")
+    
+    st.markdown("#### Nach Key")
+    st.dataframe(pd.DataFrame([
+        {"Key": key, "Summe": format_bytes(total), "Ø": format_bytes(total / sessions),
+         "Max": format_bytes(largest), "Sessions": sessions, "Anteil %": round(total / report.total * 100, 1)}
+        for key, total, largest, sessions in report.largest_keys(limit=25)
+    ]), use_container_width=True, hide_index=True)
+    
+    st.markdown("#### Nach Session")
+    st.dataframe(pd.DataFrame([
+        {"Benutzer": session.user, "Session": session.session_id[:8], "Größe": format_bytes(session.total),
+         "Größter Key": max(session.keys, key=session.keys.get) if session.keys else "–"}
+        for session in report.sessions
+    ]), use_container_width=True, hide_index=True)
+
 # ---------------------- SIDEBAR ----------------------
 def show_sidebar():
     """Sidebar mit Navigation"""
     with st.sidebar:
         t = get_theme()
         
-        st.markdown("""
+        render_html("""
         <div style='text-align: center; margin-bottom: 2rem;'>
             <h1 style='color: #3b82f6; margin-bottom: 0.5rem;'>⚙️</h1>
             <h2 style='color: white; margin: 0;'>Admin Panel</h2>
             <p style='color: #a0a0a0; margin: 0;'>Control Center</p>
         </div>
-        """, unsafe_allow_html=True)
+        """)
         
         if st.session_state.get("logged_in", False):
-            st.markdown(f"""
+            render_html(f"""
             <div style='background: {t['card_bg']}; border: 1px solid {t['border']}; 
                         border-radius: 12px; padding: 1rem; margin-bottom: 1rem;'>
                 <div style='font-weight: 600; color: {t['text']};'>👤 {st.session_state.username}</div>
@@ -816,7 +1175,7 @@ def show_sidebar():
                     Administrator
                 </div>
             </div>
-            """, unsafe_allow_html=True)
+            """)
         
         st.markdown("---")
         
@@ -866,7 +1225,10 @@ def main():
     current_admin = st.session_state.username
     
     # Tabs für verschiedene Bereiche
-    tab1, tab2, tab3 = st.tabs(["👥 Benutzer", "🏆 Bestenliste", "📈 Statistiken"])
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs(
+        ["👥 Benutzer", "🏆 Bestenliste", "📈 Statistiken", "🗄️ Archiv", "📄 PDF-Import", "🔎 Fragensuche",
+         "🩺 Diagnose"]
+    )
     
     with tab1:
         show_user_management(current_admin)
@@ -876,6 +1238,20 @@ def main():
     
     with tab3:
         show_quiz_statistics()
+    
+    with tab4:
+        show_archive_tab()
+    
+    with tab5:
+        show_pdf_import_tab()
+    
+    with tab6:
+        show_question_search_tab()
+    
+    with tab7:
+        show_diagnostics_tab()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with PROFILER.finishing():
+        main()
+        show_profiler_overlay()
\ No newline at end of file
@@ -4,239 +4,33 @@ import random
 import time
 import json
 import os
+import uuid
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List
-import pandas as pd
+from typing import Dict, List, Optional
 
 # Import der Auth-Funktionen
 import sys
 sys.path.append('.')
 from pages.auth import AuthManager
-
-# Quiz Daten
-HINDUISMUS_QUIZ = {
-    "title": "Kleidung und Tiere im Hinduismus",
-    "questions": [
-        {
-            "question": "Welche Bedeutung hat Kleidung im Hinduismus?",
-            "options": [
-                "Sie steht für Respekt gegenüber Gott und Tradition",
-                "Sie ist nur für religiöse Führer wichtig",
-                "Sie hat keine religiöse Bedeutung",
-                "Sie muss immer weiß sein"
-            ],
-            "answer": "Sie steht für Respekt gegenüber Gott und Tradition"
-        },
-        {
-            "question": "Wann spielt Kleidung im Hinduismus eine besonders wichtige Rolle?",
-            "options": [
-                "Bei Festen und in Tempeln",
-                "Nur bei Hochzeiten",
-                "Nur beim Gebet zu Hause",
-                "Nie, Kleidung ist unwichtig"
-            ],
-            "answer": "Bei Festen und in Tempeln"
-        },
-        {
-            "question": "Gibt es im Hinduismus feste Kleidungsvorschriften?",
-            "options": [
-                "Nein, es gibt keine festen Vorschriften",
-                "Ja, alle müssen Weiß tragen",
-                "Ja, nur Männer tragen traditionelle Kleidung",
-                "Ja, Kleidung ist streng vorgeschrieben"
-            ],
-            "answer": "Nein, es gibt keine festen Vorschriften"
-        },
-        {
-            "question": "Was ist ein Sari?",
-            "options": [
-                "Ein ca. 6m langer Stoffstreifen, mehrfach um den Körper gewickelt",
-                "Ein weites Hemd für Männer",
-                "Eine Kombination aus Hose und Oberteil",
-                "Ein langes Jackett mit Stehkragen"
-            ],
-            "answer": "Ein ca. 6m langer Stoffstreifen, mehrfach um den Körper gewickelt"
-        },
-        {
-            "question": "Was kann ein Sari über die Trägerin verraten?",
-            "options": [
-                "Die Herkunft der Frau",
-                "Ihr Alter",
-                "Ihren Familienstand",
-                "Ihre Religion"
-            ],
-            "answer": "Die Herkunft der Frau"
-        },
-        {
-            "question": "Was gehört oft zu einem Nasenpiercing im Hinduismus?",
-            "options": [
-                "Eine Kette, die mit einem Ohrring verbunden ist",
-                "Ein Armband",
-                "Ein Stirnband",
-                "Ein Ring am Finger"
-            ],
-            "answer": "Eine Kette, die mit einem Ohrring verbunden ist"
-        },
-        {
-            "question": "Was ist ein Kurta?",
-            "options": [
-                "Ein weites, langes Hemd für Männer ohne Kragen",
-                "Ein Tuch für den Kopf",
-                "Ein Rock für Frauen",
-                "Eine kurze Jacke"
-            ],
-            "answer": "Ein weites, langes Hemd für Männer ohne Kragen"
-        },
-        {
-            "question": "Wie lang ist ein typischer Kurta?",
-            "options": [
-                "Er reicht bis zum Knie",
-                "Er reicht bis zur Hüfte",
-                "Er reicht bis zum Boden",
-                "Er endet an der Taille"
-            ],
-            "answer": "Er reicht bis zum Knie"
-        },
-        {
-            "question": "Was ist ein Salwar Kameez?",
-            "options": [
-                "Eine Kombination aus Hose und langem Oberteil",
-                "Ein Stoffstreifen für Frauen",
-                "Ein Hemd für Männer",
-                "Eine Jacke mit Kragen"
-            ],
-            "answer": "Eine Kombination aus Hose und langem Oberteil"
-        },
-        {
-            "question": "Was ist ein Dhoti?",
-            "options": [
-                "Ein langes Stück Stoff, in der Taille zusammengeknotet",
-                "Ein Sari für Männer",
-                "Eine Kombination aus Hose und Jacke",
-                "Ein Stirntuch"
-            ],
-            "answer": "Ein langes Stück Stoff, in der Taille zusammengeknotet"
-        },
-        {
-            "question": "Was ist ein Sherwani?",
-            "options": [
-                "Ein langes Jackett mit Stehkragen, das über dem Dhoti getragen wird",
-                "Ein leichter Sommermantel",
-                "Ein traditioneller Hut",
-                "Ein religiöser Schal"
-            ],
-            "answer": "Ein langes Jackett mit Stehkragen, das über dem Dhoti getragen wird"
-        },
-        {
-            "question": "Welche Rolle spielen Tiere im Hinduismus?",
-            "options": [
-                "Sie gelten als heilig und werden verehrt",
-                "Sie werden geopfert",
-                "Sie sind bedeutungslos",
-                "Sie dienen nur als Arbeitstiere"
-            ],
-            "answer": "Sie gelten als heilig und werden verehrt"
-        },
-        {
-            "question": "Warum werden Tiere im Hinduismus verehrt?",
-            "options": [
-                "Weil sie symbolische und religiöse Bedeutung haben",
-                "Weil sie selten sind",
-                "Weil sie gefährlich sind",
-                "Weil sie schön aussehen"
-            ],
-            "answer": "Weil sie symbolische und religiöse Bedeutung haben"
-        },
-        {
-            "question": "Was wird im Hinduismus NICHT mit Tieren gemacht?",
-            "options": [
-                "Sie werden getötet oder gegessen",
-                "Sie werden verehrt",
-                "Sie gelten als heilig",
-                "Sie haben religiöse Bedeutung"
-            ],
-            "answer": "Sie werden getötet oder gegessen"
-        },
-        {
-            "question": "Welche fünf Gaben liefert die heilige Kuh?",
-            "options": [
-                "Ghee, Lassi, Mist, Pflanzendünger, Urin",
-                "Milch, Butter, Käse, Joghurt, Sahne",
-                "Honig, Öl, Milch, Wasser, Salz",
-                "Fleisch, Leder, Knochen, Fell, Milch"
-            ],
-            "answer": "Ghee, Lassi, Mist, Pflanzendünger, Urin"
-        },
-        {
-            "question": "Für welchen Gott steht der Elefant?",
-            "options": [
-                "Ganesha - Symbol für Glück, Weisheit und Neubeginn",
-                "Shiva - Symbol für Kraft und Ewigkeit",
-                "Vishnu - Symbol für Schutz",
-                "Brahma - Symbol für Schöpfung"
-            ],
-            "answer": "Ganesha - Symbol für Glück, Weisheit und Neubeginn"
-        },
-        {
-            "question": "Für welchen Gott steht die Schlange?",
-            "options": [
-                "Shiva - Symbol für Kraft und Ewigkeit",
-                "Ganesha - Symbol für Glück und Neubeginn",
-                "Vishnu - Symbol für Schutz",
-                "Seraswati - Symbol für Schönheit"
-            ],
-            "answer": "Shiva - Symbol für Kraft und Ewigkeit"
-        },
-        {
-            "question": "Für welchen Gott steht der Pfau?",
-            "options": [
-                "Seraswati - Symbol für Stolz und Schönheit",
-                "Ganesha - Symbol für Glück und Neubeginn",
-                "Shiva - Symbol für Kraft",
-                "Vishnu - Symbol für Schutz"
-            ],
-            "answer": "Seraswati - Symbol für Stolz und Schönheit"
-        }
-    ]
-}
-
-# Themes
-THEMES: Dict[str, Dict[str, str]] = {
-    "Purple Dream": {
-        "name": "Purple Dream",
-        "bg": "linear-gradient(135deg, #0f0c29 0%, #302b63 50%, #24243e 100%)",
-        "surface": "rgba(255,255,255,0.05)",
-        "border": "rgba(255,255,255,0.1)",
-        "text": "#ffffff",
-        "text_secondary": "rgba(255,255,255,0.7)",
-        "accent": "#667eea",
-        "accent_hover": "#764ba2",
-        "card_gradient": "linear-gradient(135deg, #667eea 0%, #764ba2 100%)",
-    },
-    "Ocean Blue": {
-        "name": "Ocean Blue",
-        "bg": "linear-gradient(135deg, #0a192f 0%, #112240 50%, #1a365d 100%)",
-        "surface": "rgba(255,255,255,0.05)",
-        "border": "rgba(255,255,255,0.1)",
-        "text": "#ffffff",
-        "text_secondary": "rgba(255,255,255,0.7)",
-        "accent": "#3b82f6",
-        "accent_hover": "#60a5fa",
-        "card_gradient": "linear-gradient(135deg, #3b82f6 0%, #2563eb 100%)",
-    },
-    "Dark Minimal": {
-        "name": "Dark Minimal",
-        "bg": "linear-gradient(135deg, #0a0a0a 0%, #1a1a1a 50%, #0a0a0a 100%)",
-        "surface": "rgba(255,255,255,0.05)",
-        "border": "rgba(255,255,255,0.1)",
-        "text": "#ffffff",
-        "text_secondary": "rgba(255,255,255,0.6)",
-        "accent": "#ffffff",
-        "accent_hover": "#e5e5e5",
-        "card_gradient": "linear-gradient(135deg, #2a2a2a 0%, #1a1a1a 100%)",
-    },
-}
+from components.markup import render_html
+from components.profiler_overlay import show_profiler_overlay
+from components.stylesheet import use_stylesheet
+from components.quiz_client import quiz_client
+from core.results import DEFAULT_QUIZ_ID, get_results_store, is_ranked, quiz_id_of
+from core.review import get_review_scheduler
+from core.adaptive import ADAPTIVE_LENGTH, get_item_bank, update_ability
+from core.catalog import get_catalog
+from core.profiler import get_profiler, profiled, profiled_fragment, section
+from core.quiz_run import QuizRun
+from core.ranking import get_ranking
+from core.retention import get_archive
+from core.rooms import FINISHED, LOBBY, QUESTION, QUESTION_SECONDS, REVEAL, get_room_hub
+from core.sketches import get_sketch_store
+from core.themes import get_theme
+from core import timing
+from core.timing import get_timing_stats
+from core.write_queue import get_write_queue
 
 # Page config
 st.set_page_config(
@@ -254,6 +48,7 @@ def get_auth_manager():
 auth_manager = get_auth_manager()
 
 # Helper functions for settings
+@profiled("settings")
 def load_settings() -> Dict:
     """Lädt die Theme-Einstellungen aus main.py"""
     settings_file = Path("./data/settings.json")
@@ -265,6 +60,21 @@ def load_settings() -> Dict:
             pass
     return {"current_theme": "Purple Dream", "custom_theme": None}
 
+def new_quiz_run(quiz_id: str = DEFAULT_QUIZ_ID, started: bool = True, mode: str = 'server') -> QuizRun:
+    """
+    Neuer Quiz-Durchlauf; jeder Versuch bekommt eine eigene run_id
+    
+    mode: 'server' (ein Rerun pro Antwort), 'client' (Durchlauf im Browser, siehe
+    components.quiz_client), 'adaptive' (nächste Frage passend zur Fähigkeit, siehe core.adaptive)
+    oder 'review' (fällige Fragen aus dem Wiederholungsplan, siehe core.review)
+    
+    Ein gestarteter Durchlauf hält die Quiz-Fassung, mit der er begonnen hat
+    (run.quiz); wird die Datei währenddessen geändert, spielt er darauf weiter
+    und nur neue Durchläufe bekommen die neue Version.
+    """
+    quiz = get_catalog().get(quiz_id) if started else None
+    return QuizRun(quiz_id, quiz, mode=mode, start_time=time.time() if started else None)
+
 # Session State Initialisierung
 def initialize_session_state():
     """Initialisiert alle benötigten Session-State-Variablen"""
@@ -274,15 +84,14 @@ def initialize_session_state():
         st.session_state.theme = settings.get('current_theme', 'Purple Dream')
     
     # Quiz-spezifische Daten
-    if 'quiz_data' not in st.session_state:
-        st.session_state.quiz_data = {
-            'current_question': 0,
-            'score': 0,
-            'answers': [],
-            'start_time': None,
-            'question_start_time': None,
-            'shuffled_options': []
-        }
+    if 'quiz_run' not in st.session_state:
+        st.session_state.quiz_run = new_quiz_run(started=False)
+    
+    # Gewähltes Quiz aus dem Katalog
+    if 'quiz_id' not in st.session_state:
+        st.session_state.quiz_id = DEFAULT_QUIZ_ID
+    if 'quiz_mode' not in st.session_state:
+        st.session_state.quiz_mode = 'server'
     
     # Aktuelle Seite
     if 'page' not in st.session_state:
@@ -298,154 +107,109 @@ def initialize_session_state():
             st.session_state.username = None
 
 # Helper functions
-def save_result(username: str, score: int, total: int, time_taken: float, answers: List[Dict]):
-    """Speichert die Quiz-Ergebnisse"""
-    data_dir = Path("./data/answers")
-    data_dir.mkdir(parents=True, exist_ok=True)
+@profiled("save_result")
+def save_result(username: str, score: int, total: int, time_taken: float, answers: List[Dict],
+                run_id: Optional[str] = None, quiz_id: str = DEFAULT_QUIZ_ID,
+                ability: Optional[float] = None, quiz_version: Optional[str] = None,
+                mode: str = 'server') -> str:
+    """
+    Speichert die Quiz-Ergebnisse über die Write-Behind-Queue.
+    
+    Idempotent pro run_id: ist der Durchlauf schon gespeichert, passiert nichts.
+    Gibt den Dateinamen des (bestehenden oder neuen) Ergebnisses zurück.
+    """
+    run_id = run_id or uuid.uuid4().hex
+    # Vor dem Eintragen holen: ein evtl. nötiger Neuaufbau enthält dieses Ergebnis noch nicht
+    sketches = get_sketch_store()
+    ranking = get_ranking()
+    item_bank = get_item_bank()
+    reviews = get_review_scheduler()
+    reviews.load_user(username)
+    durability = load_settings().get('result_durability', 'fsync')
+    write_queue = get_write_queue(durability)
     
     result = {
         "username": username,
+        "quiz_id": quiz_id,
+        "quiz_version": quiz_version,
         "score": score,
         "total": total,
         "percentage": round((score / total) * 100, 2),
         "time_taken": round(time_taken, 2),
         "avg_time_per_question": round(time_taken / total, 2),
         "timestamp": datetime.now().isoformat(),
+        "run_id": run_id,
+        "mode": mode,
         "answers": answers
     }
+    if ability is not None:
+        result["ability"] = round(ability, 3)
+    
+    filename = f"{username}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{run_id[:8]}.json"
+    
+    # run_id sofort belegen, damit ein zweiter Aufruf (Rerun, Reconnect) nicht doppelt speichert
+    store = get_results_store()
+    existing = store.claim_run(run_id, filename, result)
+    if existing is not None:
+        return existing
     
-    filename = data_dir / f"{username}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
+    def on_commit(error: Optional[BaseException]) -> None:
+        # Läuft im Writer-Thread: Statistiken erst fortschreiben, wenn das Ergebnis
+        # im Journal steht; die Sketches werden mit dem Group Commit gespeichert
+        if error is not None:
+            store.release_run(run_id, filename)
+            return
+        sketches.record(result, persist=False)
+        ranking.insert(result)
+        item_bank.record(result, persist=False)
+        reviews.record(username, result)
+    
+    # Je nach Modus wartet submit() auf den Group Commit (fsync) oder nicht;
+    # ein Schreibfehler kommt im fsync-Modus hier als Exception an
+    write_queue.submit(filename, result, on_commit=on_commit)
+    return filename
 
 def load_all_results() -> List[Dict]:
     """Lädt alle gespeicherten Ergebnisse"""
-    data_dir = Path("./data/answers")
-    if not data_dir.exists():
-        return []
+    store = get_results_store()
+    if store.loaded:
+        return store.all()
     
-    results = []
-    for file in data_dir.glob("*.json"):
-        try:
-            with open(file, 'r', encoding='utf-8') as f:
-                results.append(json.load(f))
-        except:
-            continue
+    # Kaltstart: Dateien werden parallel gelesen, Fortschritt wird angezeigt
+    progress_bar = st.progress(0.0, text="Lade Ergebnisse...")
+    
+    def report(done: int, total: int):
+        progress_bar.progress(done / total if total else 1.0, text=f"Lade Ergebnisse... {done}/{total}")
+    
+    results = store.all(progress=report)
+    progress_bar.empty()
     return results
 
-def get_leaderboard_data() -> pd.DataFrame:
-    """Erstellt Leaderboard-Daten"""
-    results = load_all_results()
-    if not results:
-        return pd.DataFrame()
-    
-    df = pd.DataFrame(results)
-    # Gruppiere nach Benutzername und nehme bestes Ergebnis
-    leaderboard = df.loc[df.groupby('username')['score'].idxmax()]
-    leaderboard = leaderboard.sort_values(['score', 'time_taken'], ascending=[False, True])
-    return leaderboard[['username', 'score', 'percentage', 'time_taken', 'avg_time_per_question']]
+@profiled("leaderboard")
+def get_leaderboard_data(quiz_id: str) -> List[Dict]:
+    """Leaderboard eines Quiz: bestes Ergebnis pro Benutzer (ohne pandas, nur für Markdown)"""
+    # Archivierte Durchläufe zählen über ihr voraggregiertes Bestergebnis mit
+    results = [r for r in load_all_results() if quiz_id_of(r) == quiz_id and is_ranked(r)]
+    results += get_archive().leaderboard_entries(quiz=quiz_id)
+    best: Dict[str, Dict] = {}
+    for result in sorted(results, key=lambda r: (-r['percentage'], r['time_taken'])):
+        best.setdefault(result['username'], result)
+    leaderboard = list(best.values())
+    columns = ('username', 'score', 'percentage', 'time_taken', 'avg_time_per_question')
+    return [{column: result[column] for column in columns} for result in leaderboard]
 
+@profiled("theme")
 def apply_theme(theme_name: str):
-    """Wendet das gewählte Theme an"""
-    theme = THEMES[theme_name]
-    st.markdown(f"""
-        <style>
-        .stApp {{
-            background: {theme['bg']};
-        }}
-        
-        .main-title {{
-            font-size: 3rem;
-            font-weight: 800;
-            text-align: center;
-            color: {theme['text']};
-            margin-bottom: 2rem;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        }}
-        
-        .question-card {{
-            background: {theme['surface']};
-            border: 2px solid {theme['border']};
-            border-radius: 20px;
-            padding: 2.5rem;
-            margin: 2rem 0;
-            backdrop-filter: blur(10px);
-        }}
-        
-        .question-text {{
-            font-size: 1.8rem;
-            font-weight: 600;
-            color: {theme['text']};
-            margin-bottom: 2rem;
-            text-align: center;
-        }}
-        
-        .stats-card {{
-            background: {theme['surface']};
-            border: 2px solid {theme['border']};
-            border-radius: 15px;
-            padding: 1.5rem;
-            text-align: center;
-            backdrop-filter: blur(10px);
-        }}
-        
-        .stat-value {{
-            font-size: 2.5rem;
-            font-weight: 800;
-            color: {theme['accent']};
-        }}
-        
-        .stat-label {{
-            font-size: 1rem;
-            color: {theme['text_secondary']};
-            margin-top: 0.5rem;
-        }}
-        
-        .stButton > button {{
-            border-radius: 15px;
-            border: 2px solid {theme['border']};
-            background: {theme['surface']};
-            color: {theme['text']};
-            transition: all 0.3s ease;
-            font-weight: 600;
-            padding: 1.5rem 1rem;
-            font-size: 1.1rem;
-            height: auto;
-            min-height: 80px;
-            white-space: normal;
-            word-wrap: break-word;
-        }}
-        
-        .stButton > button:hover {{
-            background: {theme['card_gradient']};
-            transform: translateY(-2px);
-            box-shadow: 0 5px 15px rgba(0,0,0,0.3);
-        }}
-        
-        .result-card {{
-            background: {theme['card_gradient']};
-            border-radius: 20px;
-            padding: 3rem;
-            text-align: center;
-            margin: 2rem 0;
-            box-shadow: 0 20px 60px rgba(0,0,0,0.4);
-        }}
-        
-        .result-score {{
-            font-size: 5rem;
-            font-weight: 900;
-            color: {theme['text']};
-        }}
-        </style>
-    """, unsafe_allow_html=True)
+    """Wendet das gewählte Theme an (CSS aus core.styles)"""
+    use_stylesheet("quizzes", get_theme(theme_name))
 
 # Unauthorized Page
 def show_unauthorized_page():
-    st.markdown('<h1 class="main-title">🔒 Nicht autorisiert</h1>', unsafe_allow_html=True)
+    render_html('<h1 class="main-title">🔒 Nicht autorisiert</h1>')
     
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        st.markdown("""
+        render_html("""
             <div class="question-card">
                 <h2 style="text-align: center; color: white; margin-bottom: 2rem;">
                     Bitte melde dich zuerst an
@@ -454,7 +218,7 @@ def show_unauthorized_page():
                     Du musst dich auf der Hauptseite anmelden, um das Quiz spielen zu können.
                 </p>
             </div>
-        """, unsafe_allow_html=True)
+        """)
         
         if st.button("Zur Hauptseite", key="go_main_btn", use_container_width=True):
             # Zur Hauptseite navigieren
@@ -462,30 +226,66 @@ def show_unauthorized_page():
 
 # Start Page
 def show_start_page():
-    st.markdown('<h1 class="main-title">🕉️ Hinduismus Quiz</h1>', unsafe_allow_html=True)
+    render_html('<h1 class="main-title">🕉️ Hinduismus Quiz</h1>')
     
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        st.markdown('<div class="question-card">', unsafe_allow_html=True)
+        render_html('<div class="question-card">')
         
         # Zeige angemeldeten Benutzer an
         st.info(f"Angemeldet als: **{st.session_state.username}**")
         
-        st.markdown("</div>", unsafe_allow_html=True)
+        # Quiz-Auswahl aus dem Manifest (die Fragen selbst werden erst beim Start geladen)
+        manifest = get_catalog().manifest()
+        quiz_ids = [info.quiz_id for info in manifest]
+        if st.session_state.quiz_id not in quiz_ids and quiz_ids:
+            st.session_state.quiz_id = quiz_ids[0]
+        
+        if quiz_ids:
+            titles = {info.quiz_id: info for info in manifest}
+            st.session_state.quiz_id = st.selectbox(
+                "Quiz auswählen",
+                quiz_ids,
+                index=quiz_ids.index(st.session_state.quiz_id),
+                format_func=lambda quiz_id: f"{titles[quiz_id].title} ({titles[quiz_id].label})",
+                key="quiz_select"
+            )
+            if titles[st.session_state.quiz_id].description:
+                st.caption(titles[st.session_state.quiz_id].description)
+        else:
+            st.warning("Keine Quizze in ./data/quizzes gefunden.")
+        
+        modes = {
+            'server': "Normal",
+            'client': "⚡ Schnellmodus",
+            'adaptive': "🎯 Adaptiv",
+        }
+        st.session_state.quiz_mode = st.radio(
+            "Modus",
+            list(modes),
+            index=list(modes).index(st.session_state.quiz_mode),
+            format_func=modes.get,
+            horizontal=True,
+            key="quiz_mode_select",
+            help="Schnellmodus: Antworten werden erst am Ende gesendet. "
+                 "Adaptiv: die nächste Frage richtet sich nach deinen bisherigen Antworten."
+        )
+        
+        render_html("</div>")
         
-        if st.button("Quiz starten", key="start_btn", use_container_width=True):
+        if st.button("Quiz starten", key="start_btn", use_container_width=True, disabled=not quiz_ids):
             # Quiz-Daten zurücksetzen
-            st.session_state.quiz_data = {
-                'current_question': 0,
-                'score': 0,
-                'answers': [],
-                'start_time': time.time(),
-                'question_start_time': None,
-                'shuffled_options': []
-            }
+            st.session_state.quiz_run = new_quiz_run(st.session_state.quiz_id, mode=st.session_state.quiz_mode)
             st.session_state.page = 'quiz'
             st.rerun()
         
+        if quiz_ids:
+            show_review_button()
+        
+        if st.button("🎮 Live-Quiz", key="live_btn", use_container_width=True):
+            st.session_state.page = 'live'
+            st.rerun()
+        
         if st.button("Leaderboard ansehen", key="leaderboard_btn", use_container_width=True):
             st.session_state.page = 'leaderboard'
             st.rerun()
@@ -493,112 +293,403 @@ def show_start_page():
         if st.button("Zurück zur Hauptseite", key="back_main_btn", use_container_width=True):
             st.switch_page("main.py")
 
+def show_review_button():
+    """Startet eine Wiederholungsrunde mit den fälligen Fragen des gewählten Quiz"""
+    reviews = get_review_scheduler()
+    quiz_id = st.session_state.quiz_id
+    is_due, next_due, pending = reviews.status(st.session_state.username, quiz_id)
+    
+    if st.button("🔁 Wiederholen", key="review_btn", use_container_width=True, disabled=not is_due):
+        run = new_quiz_run(quiz_id, mode='review')
+        run.review_qids.extend(reviews.next_session(st.session_state.username, quiz_id))
+        if run.review_qids:
+            st.session_state.quiz_run = run
+            st.session_state.page = 'quiz'
+            st.rerun()
+    
+    if not is_due and next_due is not None:
+        st.caption(f"{pending} Fragen im Wiederholungsplan · nächste fällig am "
+                   f"{datetime.fromtimestamp(next_due).strftime('%d.%m. %H:%M')}")
+
 # Quiz Page
 def show_quiz_page():
-    questions = HINDUISMUS_QUIZ['questions']
-    current_q = st.session_state.quiz_data['current_question']
+    run = st.session_state.quiz_run
+    quiz = run.quiz
+    if quiz is None:
+        st.error("Dieses Quiz ist nicht mehr verfügbar.")
+        st.session_state.page = 'start'
+        if st.button("Zurück zur Auswahl", key="missing_quiz_btn", use_container_width=True):
+            st.rerun()
+        return
+    # Fragen dieses Durchlaufs - nur der Seed liegt in der Session; im adaptiven
+    # Modus wird jede Frage erst gewählt, wenn sie dran ist
+    adaptive = run.mode == 'adaptive'
+    if adaptive:
+        qids = None
+    elif run.mode == 'review':
+        qids = [qid for qid in run.review_qids if qid < len(quiz)]
+    else:
+        qids = quiz.draw(run.seed)
+    total = adaptive_length(quiz) if adaptive else len(qids)
+    
+    if run.mode == 'client':
+        show_client_quiz(quiz, qids)
+        return
     
-    if current_q >= len(questions):
+    if run.position >= total:
         st.session_state.page = 'result'
         st.rerun()
         return
     
-    question = questions[current_q]
-    
-    # Initialize question timer
-    if st.session_state.quiz_data['question_start_time'] is None:
-        st.session_state.quiz_data['question_start_time'] = time.time()
-    
-    # Shuffle options once per question
-    if not st.session_state.quiz_data['shuffled_options'] or len(st.session_state.quiz_data['shuffled_options']) != len(question['options']):
-        st.session_state.quiz_data['shuffled_options'] = question['options'].copy()
-        random.shuffle(st.session_state.quiz_data['shuffled_options'])
-    
-    # Progress bar
-    progress = (current_q + 1) / len(questions)
-    st.progress(progress)
-    
-    # Stats
-    col1, col2, col3 = st.columns(3)
+    # Stats - Werte, die sich während des Durchlaufs nicht ändern; Fortschritt
+    # und Punkte stehen im Fragment, damit eine Antwort keinen vollen Rerun braucht
+    col1, col2 = st.columns(2)
     with col1:
-        st.markdown(f"""
+        render_html(f"""
             <div class="stats-card">
-                <div class="stat-value">{current_q + 1}/{len(questions)}</div>
-                <div class="stat-label">Frage</div>
+                <div class="stat-value">{total}</div>
+                <div class="stat-label">Fragen</div>
             </div>
-        """, unsafe_allow_html=True)
+        """)
     with col2:
-        st.markdown(f"""
-            <div class="stats-card">
-                <div class="stat-value">{st.session_state.quiz_data['score']}</div>
-                <div class="stat-label">Punkte</div>
-            </div>
-        """, unsafe_allow_html=True)
-    with col3:
-        elapsed = int(time.time() - st.session_state.quiz_data['start_time'])
-        st.markdown(f"""
+        started = datetime.fromtimestamp(run.start_time).strftime('%H:%M')
+        render_html(f"""
             <div class="stats-card">
-                <div class="stat-value">{elapsed}s</div>
-                <div class="stat-label">Zeit</div>
+                <div class="stat-value">{started}</div>
+                <div class="stat-label">Gestartet</div>
             </div>
-        """, unsafe_allow_html=True)
+        """)
+    
+    show_question_fragment(quiz, qids, total)
+
+def adaptive_length(quiz) -> int:
+    """Fragen pro adaptivem Durchlauf: sample_size des Quiz oder ADAPTIVE_LENGTH"""
+    return min(quiz.sample_size or ADAPTIVE_LENGTH, len(quiz))
+
+def next_adaptive_question(quiz, run: QuizRun) -> Optional[int]:
+    """Wählt die nächste Frage einmal pro Position (bleibt über Reruns stabil)"""
+    if run.current_qid is None:
+        rng = random.Random(f"{run.seed}:{run.position}")
+        run.current_qid = get_item_bank().next_item(quiz, run.theta, run.answered(), rng=rng)
+    return run.current_qid
+
+@st.fragment
+@profiled_fragment("quizzes")
+def show_question_fragment(quiz, qids: Optional[List[int]], total: int):
+    """
+    Frage und Antwort-Buttons als Fragment: ein Klick führt nur diese Funktion
+    erneut aus (kein initialize_session_state, check_user_status, apply_theme)
+    """
+    run = st.session_state.quiz_run
+    position = run.position
+    qid = None
+    if position < total:
+        qid = qids[position] if qids is not None else next_adaptive_question(quiz, run)
+    if qid is None:
+        # Letzte Frage beantwortet: voller Rerun für die Ergebnisseite
+        if run.end_time is None:
+            run.end_time = timing.now()
+        st.session_state.page = 'result'
+        st.rerun()
+    
+    # Progress bar
+    elapsed = int(timing.now() - run.started)
+    st.progress(
+        (position + 1) / total,
+        text=f"Frage {position + 1}/{total} · {run.score} Punkte · {elapsed}s"
+    )
     
     # Question
-    st.markdown(f"""
+    render_html(f"""
         <div class="question-card">
-            <div class="question-text">{question['question']}</div>
+            <div class="question-text">{quiz.questions[qid]}</div>
         </div>
-    """, unsafe_allow_html=True)
+    """)
     
-    # Answer buttons in 2x2 grid - größere Buttons
+    # Answer buttons in 2x2 grid - größere Buttons, Reihenfolge folgt aus dem Seed
     col1, col2 = st.columns(2)
-    options = st.session_state.quiz_data['shuffled_options']
+    options = quiz.options[qid]
     
-    for idx, option in enumerate(options):
+    for idx, choice in enumerate(quiz.option_order(run.seed, qid)):
         col = col1 if idx % 2 == 0 else col2
         with col:
-            if st.button(option, key=f"answer_{idx}", use_container_width=True):
-                question_time = time.time() - st.session_state.quiz_data['question_start_time']
-                is_correct = option == question['answer']
-                
-                if is_correct:
-                    st.session_state.quiz_data['score'] += 1
-                
-                st.session_state.quiz_data['answers'].append({
-                    "question": question['question'],
-                    "selected": option,
-                    "correct": question['answer'],
-                    "is_correct": is_correct,
-                    "time": round(question_time, 2)
-                })
-                
-                st.session_state.quiz_data['current_question'] += 1
-                st.session_state.quiz_data['question_start_time'] = None
-                st.session_state.quiz_data['shuffled_options'] = []
+            # Callback statt if-Block: die Antwort ist vor dem Rendern verbucht,
+            # ein Klick kostet so genau einen Fragment-Lauf
+            st.button(options[choice], key=f"answer_{idx}", use_container_width=True,
+                      on_click=record_answer, args=(quiz, total, position, qid, choice))
+    
+    # Frage steht: ab hier läuft die Denkzeit. Spätere Reruns derselben Frage
+    # (z.B. Theme-Wechsel) setzen sie nicht zurück
+    if run.question_shown is None:
+        run.question_shown = timing.now()
+        get_timing_stats().record_render(quiz.quiz_id, quiz.keys[qid], run.question_shown - run.render_started)
+
+def record_answer(quiz, total: int, position: int, qid: int, choice: int):
+    """Button-Callback: bewertet die Antwort und schaltet zur nächsten Frage"""
+    run = st.session_state.quiz_run
+    if run.position != position:
+        # Doppelklick auf eine schon beantwortete Frage
+        return
+    # Denkzeit: fertig gerenderte Frage bis Eingang der Antwort (ohne Rerun)
+    answered = timing.now()
+    think_time = round(answered - run.question_shown, 2)
+    correct = run.record(qid, choice, think_time)
+    get_timing_stats().record_think(quiz.quiz_id, quiz.keys[qid], think_time)
+    
+    if run.mode == 'adaptive':
+        difficulty = get_item_bank().difficulty(quiz, qid)
+        run.theta = update_ability(run.theta, difficulty, correct)
+        run.current_qid = None
+    
+    run.question_shown = None
+    run.render_started = answered
+    if run.position >= total:
+        run.end_time = answered
+
+def show_client_quiz(quiz, qids: List[int]):
+    """Client-Modus: der ganze Durchlauf läuft im Browser und kommt mit einem Aufruf zurück"""
+    run = st.session_state.quiz_run
+    submission = quiz_client(quiz, qids, run.seed, run.run_id, get_theme(st.session_state.theme))
+    if not submission or submission.get('run_id') != run.run_id or run.position:
+        return
+    
+    end_time = timing.now()
+    try:
+        _, answers = quiz.grade_submission(submission, elapsed=end_time - run.started, qids=qids)
+    except ValueError as e:
+        st.error(f"Antworten konnten nicht ausgewertet werden: {e}")
+        return
+    # Im Browser gemessen (performance.now): nur Denkzeit, keine Renderzeit des Servers
+    stats = get_timing_stats()
+    for answer in answers:
+        stats.record_think(quiz.quiz_id, quiz.keys[answer['q']], answer['t'])
+    
+    run.load_answers(answers)
+    run.end_time = end_time
+    st.session_state.page = 'result'
+    st.rerun()
+
+# Live Page
+def show_live_page(can_host: bool):
+    """Live-Quiz: Raum eröffnen (Admins) oder per Code beitreten"""
+    render_html('<h1 class="main-title">🎮 Live-Quiz</h1>')
+    hub = get_room_hub()
+    live = st.session_state.get('live')
+    room = hub.get(live['code']) if live else None
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col2:
+        if room is None:
+            st.session_state.pop('live', None)
+            show_live_join(can_host)
+            return
+        
+        render_html(f"""
+            <div class="stats-card">
+                <div class="stat-value">{room.code}</div>
+                <div class="stat-label">{room.quiz.title} · Raum-Code</div>
+            </div>
+        """)
+        show_live_fragment(room, live['host'])
+        
+        if st.button("Raum verlassen", key="live_leave_btn", use_container_width=True):
+            if live['host']:
+                hub.close(room.code)
+            else:
+                room.leave(st.session_state.username)
+            st.session_state.pop('live', None)
+            st.session_state.page = 'start'
+            st.rerun()
+
+def show_live_join(can_host: bool):
+    username = st.session_state.username
+    code = st.text_input("Raum-Code", max_chars=5, key="live_code", placeholder="z.B. K7M2Q")
+    if st.button("Beitreten", key="live_join_btn", use_container_width=True, disabled=not code.strip()):
+        room = get_room_hub().get(code)
+        if room is None or room.snapshot.state == FINISHED:
+            st.error("Kein offener Raum mit diesem Code.")
+        else:
+            room.join(username)
+            st.session_state.live = {'code': room.code, 'host': False, 'sub': room.subscribe(username)}
+            st.rerun()
+    
+    if can_host:
+        st.markdown("### Raum eröffnen")
+        quiz = get_catalog().get(st.session_state.quiz_id)
+        if quiz is None:
+            st.warning("Bitte zuerst auf der Startseite ein Quiz auswählen.")
+        else:
+            st.caption(f"Quiz: {quiz.title} · {quiz.attempt_length} Fragen")
+            seconds = st.slider("Sekunden pro Frage", 10, 60, QUESTION_SECONDS, step=5, key="live_seconds")
+            if st.button("Raum eröffnen", key="live_create_btn", use_container_width=True):
+                room = get_room_hub().create(quiz, username, seconds, on_finish=save_live_results)
+                st.session_state.live = {'code': room.code, 'host': True, 'sub': room.subscribe(username)}
                 st.rerun()
+    
+    if st.button("Zurück", key="live_back_btn", use_container_width=True):
+        st.session_state.page = 'start'
+        st.rerun()
+
+@st.fragment(run_every=1)
+@profiled_fragment("quizzes")
+def show_live_fragment(room, host: bool):
+    """
+    Läuft jede Sekunde neu, liest aber nur den Raum im Speicher: der Snapshot
+    wird beim Zustandswechsel einmal gebaut und von allen Teilnehmern geteilt
+    """
+    username = st.session_state.username
+    subscription = st.session_state.live['sub']
+    subscription.poll()
+    snapshot = subscription.snapshot
+    participant = room.participants.get(username)
+    
+    if snapshot.state == LOBBY:
+        names = ", ".join(sorted(room.participants)) or "noch niemand"
+        st.info(f"👥 {len(room.participants)} Teilnehmer: {names}")
+        if host:
+            st.button("Quiz starten", key="live_start_btn", use_container_width=True,
+                      disabled=not room.participants, on_click=room.start)
+        else:
+            st.caption("Warte auf den Start...")
+        return
+    
+    if snapshot.state in (QUESTION, REVEAL):
+        remaining = max(0, int(snapshot.deadline - time.monotonic() + 0.999)) if snapshot.state == QUESTION else 0
+        st.progress(
+            (snapshot.position + 1) / snapshot.total,
+            text=f"Frage {snapshot.position + 1}/{snapshot.total} · {remaining}s · "
+                 f"{room.answered}/{len(room.participants)} beantwortet"
+        )
+        render_html(f"""
+            <div class="question-card">
+                <div class="question-text">{snapshot.question}</div>
+            </div>
+        """)
+    
+    if snapshot.state == QUESTION:
+        if host:
+            for _, text in snapshot.options:
+                st.markdown(f"- {text}")
+            st.button("Auflösen", key="live_reveal_btn", use_container_width=True, on_click=room.advance)
+        elif participant is not None and participant.answered_position == snapshot.position:
+            st.info("✅ Antwort gespeichert - warte auf die anderen")
+        elif participant is not None:
+            col1, col2 = st.columns(2)
+            for idx, (choice, text) in enumerate(snapshot.options):
+                with col1 if idx % 2 == 0 else col2:
+                    st.button(text, key=f"live_answer_{snapshot.position}_{idx}", use_container_width=True,
+                              on_click=room.answer, args=(username, snapshot.position, choice))
+        return
+    
+    if snapshot.state == REVEAL:
+        for choice, text in snapshot.options:
+            st.markdown(f"- {'✅' if choice == snapshot.correct else '▫️'} {text}")
+        if participant is not None:
+            last = participant.answers[-1] if participant.answered_position == snapshot.position else None
+            verdict = "Richtig! 🎉" if last and last['c'] else "Leider falsch" if last else "Keine Antwort"
+            st.markdown(f"**{verdict}** · {participant.points} Punkte · Platz {room.rank(username)}")
+    else:
+        st.markdown("### 🏁 Endstand")
+        if participant is not None:
+            st.success(f"Platz {room.rank(username)} mit {participant.points} Punkten "
+                       f"({participant.correct}/{snapshot.total} richtig)")
+        if host and not room.results_saved:
+            st.warning("Die Ergebnisse konnten noch nicht gespeichert werden.")
+            st.button("Erneut speichern", key="live_save_btn", use_container_width=True, on_click=room.save_results)
+    
+    st.dataframe(
+        [{"Spieler": name, "Punkte": points} for name, points in snapshot.scoreboard],
+        use_container_width=True, hide_index=True
+    )
+    if host and snapshot.state == REVEAL:
+        last_question = snapshot.position + 1 >= snapshot.total
+        st.button("Endstand zeigen" if last_question else "Nächste Frage", key="live_next_btn",
+                  use_container_width=True, on_click=room.advance)
+
+def save_live_results(room, total: int, results):
+    """
+    on_finish eines Live-Raums: speichert die Ergebnisse aller Teilnehmer
+    (mode 'live', zählt nicht für Bestenlisten), bei vorzeitig geschlossenen
+    Räumen die bis dahin gestellten Fragen. Wiederholbar, da save_result pro
+    run_id idempotent ist.
+    """
+    for participant in results:
+        save_result(
+            participant.name,
+            participant.correct,
+            total,
+            sum(answer['t'] for answer in participant.answers),
+            list(participant.answers),
+            run_id=uuid.uuid5(uuid.UUID(room.run_id), participant.name).hex,
+            quiz_id=room.quiz.quiz_id,
+            quiz_version=room.quiz.version,
+            mode='live'
+        )
 
 # Result Page
 def show_result_page():
-    total_time = time.time() - st.session_state.quiz_data['start_time']
-    total_questions = len(HINDUISMUS_QUIZ['questions'])
-    percentage = (st.session_state.quiz_data['score'] / total_questions) * 100
-    
-    # Save result
-    save_result(
-        st.session_state.username,
-        st.session_state.quiz_data['score'],
-        total_questions,
-        total_time,
-        st.session_state.quiz_data['answers']
-    )
+    run = st.session_state.quiz_run
+    if run.end_time is None:
+        run.end_time = timing.now()
+    # Gesamtzeit = Summe der Denkzeiten: Reruns, Netzwerk-Wartezeit zwischen den
+    # Fragen und Uhrsprünge zählen nicht mit
+    total_time = run.think_time
+    total_questions = run.position
+    if total_questions == 0:
+        st.session_state.page = 'start'
+        st.rerun()
+        return
+    percentage = (run.score / total_questions) * 100
+    review = run.mode == 'review'
+    
+    # Save result - nur einmal pro Durchlauf, auch bei Reruns/Reconnects.
+    # Wiederholungsrunden aktualisieren nur den Plan, nicht Leaderboard/Statistik.
+    # Erst hier werden die Antworten ins gespeicherte Format gebracht
+    if review and not run.saved:
+        get_review_scheduler().record(
+            st.session_state.username,
+            {"quiz_id": run.quiz_id, "quiz_version": run.version, "answers": run.answers()},
+        )
+        run.saved = True
+    elif not run.saved:
+        try:
+            save_result(
+                st.session_state.username,
+                run.score,
+                total_questions,
+                total_time,
+                run.answers(),
+                run_id=run.run_id,
+                quiz_id=run.quiz_id,
+                ability=run.theta if run.mode == 'adaptive' else None,
+                quiz_version=run.version,
+                mode=run.mode
+            )
+            run.saved = True
+        except (OSError, TimeoutError, TypeError, ValueError) as e:
+            # run.saved bleibt False: der nächste Rerun versucht es noch einmal
+            st.error(f"❌ Ergebnis konnte nicht gespeichert werden: {e}")
+    
+    # Perzentil-Rang einmal pro Durchlauf bestimmen (bisect, kein Scan)
+    if not review and run.mode != 'adaptive' and run.better_than is None:
+        run.better_than = get_ranking().better_than(
+            run.quiz_id, round(percentage, 2), round(total_time, 2)
+        )
+    
+    render_html('<h1 class="main-title">Quiz abgeschlossen! 🎉</h1>')
     
-    st.markdown('<h1 class="main-title">Quiz abgeschlossen! 🎉</h1>', unsafe_allow_html=True)
+    rank_html = ""
+    if run.better_than is not None:
+        rank_html = f"""
+                <div class="stat-label" style="font-size: 1.3rem; margin-top: 1rem;">
+                    🏅 Besser als {run.better_than:.0f}% aller Durchläufe
+                </div>"""
     
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        st.markdown(f"""
+        render_html(f"""
             <div class="result-card">
-                <div class="result-score">{st.session_state.quiz_data['score']}/{total_questions}</div>
+                <div class="result-score">{run.score}/{total_questions}</div>
                 <div class="stat-label" style="font-size: 1.5rem; margin-top: 1rem;">
                     {percentage:.1f}% richtig
                 </div>
@@ -608,21 +699,19 @@ def show_result_page():
                 <div class="stat-label" style="font-size: 1.2rem;">
                     📊 Durchschnitt: {total_time/total_questions:.1f}s pro Frage
                 </div>
+                {rank_html}
             </div>
-        """, unsafe_allow_html=True)
+        """)
         
         col1, col2, col3 = st.columns([1, 1, 1])
         with col1:
             if st.button("Nochmal spielen", key="retry_btn", use_container_width=True):
-                st.session_state.quiz_data = {
-                    'current_question': 0,
-                    'score': 0,
-                    'answers': [],
-                    'start_time': time.time(),
-                    'question_start_time': None,
-                    'shuffled_options': []
-                }
-                st.session_state.page = 'quiz'
+                if review:
+                    # Die nächste Wiederholungsrunde wird auf der Startseite gebildet
+                    st.session_state.page = 'start'
+                else:
+                    st.session_state.quiz_run = new_quiz_run(run.quiz_id, mode=run.mode)
+                    st.session_state.page = 'quiz'
                 st.rerun()
         
         with col2:
@@ -636,17 +725,20 @@ def show_result_page():
 
 # Leaderboard Page
 def show_leaderboard_page():
-    st.markdown('<h1 class="main-title">🏆 Leaderboard</h1>', unsafe_allow_html=True)
+    render_html('<h1 class="main-title">🏆 Leaderboard</h1>')
     
-    leaderboard = get_leaderboard_data()
+    # Nur Ergebnisse des gewählten Quiz sind vergleichbar
+    info = get_catalog().info(st.session_state.quiz_id)
+    st.caption(f"Quiz: {info.title if info else st.session_state.quiz_id}")
+    leaderboard = get_leaderboard_data(st.session_state.quiz_id)
     
-    if leaderboard.empty:
+    if not leaderboard:
         st.info("Noch keine Ergebnisse vorhanden. Sei der Erste!")
     else:
         # Top 3
-        for idx, row in leaderboard.head(3).iterrows():
-            medal = ["🥇", "🥈", "🥉"][idx] if idx < 3 else "🏅"
-            st.markdown(f"""
+        for idx, row in enumerate(leaderboard[:3]):
+            medal = ["🥇", "🥈", "🥉"][idx]
+            render_html(f"""
                 <div class="stats-card" style="margin: 1rem 0; padding: 2rem;">
                     <h2 style="font-size: 2rem; margin-bottom: 1rem;">{medal} {row['username']}</h2>
                     <div style="display: flex; justify-content: space-around; flex-wrap: wrap;">
@@ -668,19 +760,19 @@ def show_leaderboard_page():
                         </div>
                     </div>
                 </div>
-            """, unsafe_allow_html=True)
+            """)
         
         # Rest of leaderboard
         if len(leaderboard) > 3:
             st.markdown("### Weitere Spieler")
-            for idx, row in leaderboard.iloc[3:].iterrows():
-                st.markdown(f"""
+            for row in leaderboard[3:]:
+                render_html(f"""
                     <div class="stats-card" style="margin: 0.5rem 0;">
                         <strong>{row['username']}</strong> - 
                         {row['score']} Punkte ({row['percentage']:.1f}%) - 
                         {row['time_taken']:.1f}s
                     </div>
-                """, unsafe_allow_html=True)
+                """)
     
     if st.button("Zurück zum Quiz", key="back_quiz_btn", use_container_width=True):
         st.session_state.page = 'start'
@@ -697,7 +789,8 @@ def main():
         return
     
     # Session Validation bei jedem Aufruf
-    status = auth_manager.check_user_status(st.session_state.username)
+    with section("session"):
+        status = auth_manager.check_user_status(st.session_state.username)
     if status["should_logout"]:
         st.error(f"🔒 {status['message']}")
         time.sleep(2)
@@ -718,6 +811,12 @@ def main():
         show_result_page()
     elif st.session_state.page == 'leaderboard':
         show_leaderboard_page()
+    elif st.session_state.page == 'live':
+        show_live_page(can_host=status["role"] == "admin")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    PROFILER = get_profiler()
+    PROFILER.start("quizzes", st.session_state.get("username"))
+    with PROFILER.finishing():
+        main()
+        show_profiler_overlay()
\ No newline at end of file
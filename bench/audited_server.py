@@ -0,0 +1,68 @@
+"""
+Startet Streamlit mit Zählern für Datei-Zugriffe und CPU-Zeit
+
+Wird von streamlit_client.AppServer(audit=True) statt `python -m streamlit`
+aufgerufen (gleiche Argumente). Ein Audit-Hook (sys.addaudithook) zählt jedes
+open() im Serverprozess, getrennt nach lesend/schreibend und danach, ob die
+Datei unter ./data liegt. Auf SIGUSR1 schreibt der Prozess die Zähler und
+seine CPU-Zeit (os.times) nach $AUDIT_FILE; der Client liest sie vor und nach
+jedem Schritt und bildet die Differenz.
+"""
+
+import json
+import os
+import signal
+import sys
+import threading
+
+DATA_DIR = os.path.abspath("data") + os.sep
+AUDIT_FILE = os.environ.get("AUDIT_FILE", "audit.json")
+_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_APPEND | os.O_CREAT
+
+counts = {"data_read": 0, "data_write": 0, "other_read": 0, "other_write": 0}
+_lock = threading.RLock()    # der Signal-Handler läuft im selben Thread wie der Hook
+_seq = 0
+
+
+def _is_write(mode, flags) -> bool:
+    if isinstance(mode, str):
+        return any(c in mode for c in "wax+")
+    return isinstance(flags, int) and bool(flags & _WRITE_FLAGS)
+
+
+def audit(event: str, args: tuple) -> None:
+    if event != "open" or not args or not isinstance(args[0], (str, bytes, os.PathLike)):
+        return
+    path = os.fsdecode(args[0])
+    where = "data" if os.path.abspath(path).startswith(DATA_DIR) else "other"
+    kind = "write" if _is_write(args[1] if len(args) > 1 else None, args[2] if len(args) > 2 else None) else "read"
+    with _lock:
+        counts[f"{where}_{kind}"] += 1
+
+
+def dump(*_) -> None:
+    global _seq
+    _seq += 1
+    times = os.times()
+    with _lock:
+        data = dict(counts, seq=_seq, cpu_user=times.user, cpu_system=times.system)
+    temp_file = f"{AUDIT_FILE}.tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(temp_file, AUDIT_FILE)
+    # Die Dump-Datei selbst nicht mitzählen
+    with _lock:
+        counts["other_write"] -= 1
+
+
+def main() -> None:
+    from streamlit.web import cli
+
+    sys.addaudithook(audit)
+    signal.signal(signal.SIGUSR1, dump)
+    sys.argv = ["streamlit"] + sys.argv[1:]
+    sys.exit(cli.main())
+
+
+if __name__ == "__main__":
+    main()
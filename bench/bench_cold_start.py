@@ -0,0 +1,119 @@
+"""
+Benchmark: serieller vs. paralleler Kaltstart von ./data/answers
+
+Erzeugt synthetische Ergebnis-Dateien (Format wie save_result in quizzes.py)
+in einem temporären Verzeichnis und misst beide Ladevarianten.
+
+Aufruf (aus dem Repo-Root):
+    python bench/bench_cold_start.py                # 10k und 100k Dateien
+    python bench/bench_cold_start.py --sizes 5000   # eigene Größen
+    python bench/bench_cold_start.py --workers 8 16 32
+
+Hinweis: Zwischen den Läufen wird der OS-Page-Cache nicht geleert. Für echte
+Kaltstart-Zahlen vorher als root `sync; echo 3 > /proc/sys/vm/drop_caches`
+ausführen (--drop-caches).
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+from core.results import MAX_WORKERS, load_results_parallel, load_results_serial  # noqa: E402
+
+QUESTIONS = 18
+
+
+def make_result(rng: random.Random, username: str, ts: datetime) -> dict:
+    answers = []
+    score = 0
+    total_time = 0.0
+    for q in range(QUESTIONS):
+        is_correct = rng.random() < 0.7
+        score += is_correct
+        t = round(rng.uniform(2, 20), 2)
+        total_time += t
+        answers.append({
+            "question": f"Frage {q + 1}: Welche Bedeutung hat Kleidung im Hinduismus?",
+            "selected": "Sie steht für Respekt gegenüber Gott und Tradition",
+            "correct": "Sie steht für Respekt gegenüber Gott und Tradition",
+            "is_correct": is_correct,
+            "time": t,
+        })
+    return {
+        "username": username,
+        "score": score,
+        "total": QUESTIONS,
+        "percentage": round(score / QUESTIONS * 100, 2),
+        "time_taken": round(total_time, 2),
+        "avg_time_per_question": round(total_time / QUESTIONS, 2),
+        "timestamp": ts.isoformat(),
+        "answers": answers,
+    }
+
+
+def generate(data_dir: str, count: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    for i in range(count):
+        username = f"user{i % 500:03d}"
+        ts = start + timedelta(seconds=i * 37)
+        path = os.path.join(data_dir, f"{username}_{ts.strftime('%Y%m%d_%H%M%S')}_{i}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(make_result(rng, username, ts), f, ensure_ascii=False, indent=2)
+
+
+def drop_caches() -> None:
+    try:
+        subprocess.run(["sync"], check=False)
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("3\n")
+    except OSError:
+        print("  (drop_caches nicht möglich - Messung mit warmem Page-Cache)")
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return time.perf_counter() - t0, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--workers", type=int, nargs="+", default=[4, MAX_WORKERS])
+    parser.add_argument("--drop-caches", action="store_true")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        tmp = tempfile.mkdtemp(prefix="bench_answers_")
+        try:
+            print(f"\n== {size} Dateien ==")
+            t_gen, _ = timed(generate, tmp, size)
+            print(f"  erzeugt in {t_gen:.1f}s")
+
+            if args.drop_caches:
+                drop_caches()
+            t_serial, serial = timed(load_results_serial, tmp)
+            print(f"  seriell:            {t_serial:7.2f}s  ({len(serial)} Ergebnisse)")
+
+            for workers in args.workers:
+                if args.drop_caches:
+                    drop_caches()
+                t_par, par = timed(load_results_parallel, tmp, max_workers=workers)
+                assert len(par) == len(serial)
+                print(f"  parallel ({workers:2d} Threads): {t_par:7.2f}s  Speedup x{t_serial / t_par:.2f}")
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
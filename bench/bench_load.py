@@ -0,0 +1,190 @@
+"""
+Lasttest: N gleichzeitige Benutzer über alle drei Seiten
+
+Startet die App als echten Streamlit-Server (Kopie von ./data, siehe
+streamlit_client.AppServer) und legt dort N Testbenutzer an. Jeder simulierte
+Benutzer spricht über einen eigenen Websocket das Browser-Protokoll und
+durchläuft:
+
+    login        main.py: Login-Formular ausfüllen, Anmelden (PBKDF2!)
+    quiz         Dashboard -> quizzes.py, Quiz starten, alle Fragen beantworten
+                 (Fragment-Klicks), Ergebnisseite speichert den Durchlauf
+    leaderboard  Bestenliste von der Ergebnisseite aus
+    admin        admin.py öffnen (nur die ersten --admins Benutzer)
+    logout       zurück zu main.py, Abmelden
+
+Die Schritte laufen im Gleichschritt: alle Benutzer führen denselben Schritt
+gleichzeitig aus, erst dann beginnt der nächste. So lassen sich CPU-Zeit und
+Datei-Zugriffe des Servers (audited_server.py) pro Schritt zuordnen.
+
+Ausgabe pro Schritt: Reruns, Latenz p50/p95/p99 pro Rerun, Reruns/s,
+CPU-Zeit des Servers pro Benutzer und open()-Aufrufe pro Benutzer (unter
+./data lesend/schreibend, sonstige). Dazu der Durchsatz des ganzen Laufs.
+
+Aufruf (aus dem Repo-Root, benötigt streamlit und websockets; Linux/macOS):
+    python bench/bench_load.py --users 10
+    python bench/bench_load.py --users 50 --admins 2
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import secrets
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from streamlit_client import AppServer, RunStats, SessionClient, find_button, find_input  # noqa: E402
+
+STEPS = ("login", "quiz", "leaderboard", "admin", "logout")
+PASSWORD = "lasttest-passwort"
+
+
+def add_users(data_dir: str, names: List[str], admins: int) -> None:
+    """Legt die Testbenutzer in der Kopie von users.json an (Hash wie AuthManager.hash_password)"""
+    path = os.path.join(data_dir, "users.json")
+    users = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            users = json.load(f) or {}
+    for i, name in enumerate(names):
+        salt = secrets.token_hex(16)
+        users[name] = {
+            "password_hash": hashlib.pbkdf2_hmac("sha256", PASSWORD.encode(), salt.encode(), 100_000).hex(),
+            "role": "admin" if i < admins else "user",
+            "active": True,
+            "created_at": datetime.now().isoformat(),
+            "last_login": None,
+            "using_default": False,
+            "salt": salt,
+            "failed_attempts": 0,
+            "locked_until": None,
+        }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(users, f, indent=2)
+
+
+class User:
+    """Ein simulierter Benutzer mit eigener Session"""
+
+    def __init__(self, server: AppServer, name: str, admin: bool):
+        self.client = SessionClient(server)
+        self.name = name
+        self.admin = admin
+        self.last: Optional[RunStats] = None
+        self.samples: Dict[str, List[float]] = {step: [] for step in STEPS}
+
+    async def _rerun(self, step: str, **kwargs) -> RunStats:
+        self.last = await self.client.rerun(**kwargs)
+        self.samples[step].append(self.last.seconds)
+        return self.last
+
+    def _button(self, label: str = "", key: str = "") -> str:
+        widget_id = find_button(self.last, label=label, key=key)
+        if widget_id is None:
+            raise RuntimeError(f"{self.name}: Button '{label or key}' nicht gefunden (Seite {self.client.page})")
+        return widget_id
+
+    async def login(self) -> None:
+        await self.client.connect()
+        await self._rerun("login", page="main")
+        values = {find_input(self.last, "Benutzername"): self.name, find_input(self.last, "Passwort"): PASSWORD}
+        await self._rerun("login", trigger=self._button(label="Anmelden"), values=values)
+        self._button(key="btn_quiz")   # Dashboard erreicht?
+
+    async def quiz(self) -> None:
+        await self._rerun("quiz", trigger=self._button(key="btn_quiz"))
+        await self._rerun("quiz", trigger=self._button(key="start_btn"))
+        while True:
+            answer = find_button(self.last, key="answer_0")
+            if answer is None:
+                break
+            await self._rerun("quiz", trigger=answer, fragment_id=self.last.fragment_ids.get(answer, ""))
+        self._button(key="result_leaderboard_btn")
+
+    async def leaderboard(self) -> None:
+        await self._rerun("leaderboard", trigger=self._button(key="result_leaderboard_btn"))
+
+    async def admin_panel(self) -> None:
+        if self.admin:
+            await self._rerun("admin", page="admin")
+
+    async def logout(self) -> None:
+        await self._rerun("logout", page="main")
+        await self._rerun("logout", trigger=self._button(key="btn_logout"))
+        await self.client.close()
+
+
+def percentile(samples: List[float], q: float) -> float:
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[q - 1]
+
+
+async def run(server: AppServer, names: List[str], admins: int) -> dict:
+    users = [User(server, name, i < admins) for i, name in enumerate(names)]
+    actions = {
+        "login": User.login, "quiz": User.quiz, "leaderboard": User.leaderboard,
+        "admin": User.admin_panel, "logout": User.logout,
+    }
+    steps = {}
+    started = time.perf_counter()
+    for step in STEPS:
+        before = server.counters()
+        t = time.perf_counter()
+        await asyncio.gather(*(actions[step](user) for user in users))
+        wall = time.perf_counter() - t
+        after = server.counters()
+        steps[step] = {
+            "wall": wall,
+            "users": admins if step == "admin" else len(users),
+            "samples": [s for user in users for s in user.samples[step]],
+            "delta": {key: after[key] - before[key] for key in after if key != "seq"},
+        }
+    return {"wall": time.perf_counter() - started, "steps": steps}
+
+
+def report(result: dict, users: int) -> None:
+    total_reruns = 0
+    print(f"{'Schritt':12s} {'Reruns':>6s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'Reruns/s':>9s} "
+          f"{'CPU ms/Ben.':>11s} {'data r/Ben.':>11s} {'data w/Ben.':>11s} {'sonst/Ben.':>10s}")
+    cpu_total = 0.0
+    for step, data in result["steps"].items():
+        samples = [s * 1000 for s in data["samples"]]
+        if not samples:
+            continue
+        total_reruns += len(samples)
+        delta, n = data["delta"], max(data["users"], 1)
+        cpu = delta["cpu_user"] + delta["cpu_system"]
+        cpu_total += cpu
+        print(f"{step:12s} {len(samples):6d} {percentile(samples, 50):8.1f} {percentile(samples, 95):8.1f} "
+              f"{percentile(samples, 99):8.1f} {len(samples) / data['wall']:9.1f} {cpu / n * 1000:11.1f} "
+              f"{delta['data_read'] / n:11.1f} {delta['data_write'] / n:11.1f} "
+              f"{(delta['other_read'] + delta['other_write']) / n:10.1f}")
+    wall = result["wall"]
+    print(f"\n{users} Benutzer in {wall:.1f} s: {users / wall * 60:.1f} Durchläufe/min, "
+          f"{total_reruns / wall:.1f} Reruns/s, Server-CPU {cpu_total:.1f} s "
+          f"({cpu_total / wall * 100:.0f}% eines Kerns)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--admins", type=int, default=1, help="so viele Benutzer öffnen zusätzlich admin.py")
+    args = parser.parse_args()
+
+    names = [f"last{i:03d}" for i in range(args.users)]
+    admins = min(args.admins, args.users)
+    with AppServer(prepare=lambda data_dir: add_users(data_dir, names, admins), audit=True) as server:
+        result = asyncio.run(run(server, names, admins))
+    report(result, args.users)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Benchmark: Kaltstart und erster Render pro Seite (main, quizzes, admin)
+
+Pro Seite und Wiederholung läuft ein frischer Python-Prozess (nichts aus
+einem früheren Lauf in sys.modules) in einer Kopie von ./data:
+
+    import     import streamlit + AppTest
+    first      erster Skriptlauf der Seite (AppTest) - enthält alle Imports
+               der Seite (core.*, pandas, ...) und das erste Rendern
+    warm       zweiter Skriptlauf derselben Session (Module sind geladen)
+    modules    wie viele Module der erste Lauf nachgeladen hat, und ob
+               pandas/pyarrow darunter waren
+
+Mit --server zusätzlich gegen einen echten Server (streamlit_client): Zeit
+bis /_stcore/health antwortet und bis der erste Lauf jeder Seite fertig ist.
+admin.py braucht dort einen Login; der erste Lauf von admin.py kommt also
+nach main.py.
+
+Aufruf (aus dem Repo-Root, benötigt streamlit):
+    python bench/bench_page_start.py
+    python bench/bench_page_start.py --repeat 5 --server
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+APP_DIR = os.path.join(REPO_ROOT, "app")
+PAGES = {"main": "main.py", "quizzes": "pages/quizzes.py", "admin": "pages/admin.py"}
+HEAVY = ("pandas", "pyarrow", "numpy")
+
+
+def child(page: str) -> None:
+    """Läuft im frischen Prozess: misst eine Seite und gibt JSON aus"""
+    started = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    imported = time.perf_counter() - started
+
+    sys.path.insert(0, APP_DIR)
+    at = AppTest.from_file(os.path.join(APP_DIR, PAGES[page]), default_timeout=120)
+    if page == "quizzes":
+        at.query_params["user"] = "admin"
+    elif page == "admin":
+        from pages.auth import UserRole
+        at.session_state.logged_in = True
+        at.session_state.username = "admin"
+        at.session_state.role = UserRole.ADMIN
+    before = set(sys.modules)
+    heavy_before = [name for name in HEAVY if name in sys.modules]
+
+    t = time.perf_counter()
+    at.run()
+    first = time.perf_counter() - t
+    t = time.perf_counter()
+    at.run()
+    warm = time.perf_counter() - t
+    if at.exception:
+        sys.exit(f"{page}: {at.exception[0].message}")
+
+    loaded = set(sys.modules) - before
+    print(json.dumps({
+        "import": imported, "first": first, "warm": warm, "modules": len(loaded),
+        "heavy": [name for name in HEAVY if name in loaded and name not in heavy_before],
+    }))
+
+
+def data_copy() -> str:
+    workdir = tempfile.mkdtemp(prefix="bench_pages_")
+    shutil.copytree(os.path.join(REPO_ROOT, "data"), os.path.join(workdir, "data"),
+                    ignore=shutil.ignore_patterns("journal", "archive", "*.pdf"))
+    return workdir
+
+
+def measure(page: str, repeat: int) -> list:
+    samples = []
+    for _ in range(repeat):
+        workdir = data_copy()
+        try:
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", page],
+                cwd=workdir, capture_output=True, text=True, check=True,
+            ).stdout
+        except subprocess.CalledProcessError as e:
+            sys.exit(e.stderr.strip().splitlines()[-1])
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        samples.append(json.loads(out.strip().splitlines()[-1]))
+    return samples
+
+
+async def server_first_renders() -> dict:
+    sys.path.insert(0, BENCH_DIR)
+    from bench_load import PASSWORD, add_users
+    from streamlit_client import AppServer, SessionClient, find_button, find_input
+
+    timings = {}
+    started = time.perf_counter()
+    with AppServer(prepare=lambda data_dir: add_users(data_dir, ["pagestart"], admins=1)) as server:
+        timings["health"] = time.perf_counter() - started
+        client = SessionClient(server)
+        await client.connect()
+        run = await client.rerun(page="main")
+        timings["main"] = run.seconds
+        values = {find_input(run, "Benutzername"): "pagestart", find_input(run, "Passwort"): PASSWORD}
+        await client.rerun(trigger=find_button(run, label="Anmelden"), values=values)
+        for page in ("quizzes", "admin"):
+            timings[page] = (await client.rerun(page=page)).seconds
+        await client.close()
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", nargs="+", choices=PAGES, default=list(PAGES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--server", action="store_true", help="zusätzlich gegen einen echten Server messen")
+    parser.add_argument("--child", choices=PAGES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+
+    print(f"AppTest, frischer Prozess pro Lauf, Median aus {args.repeat}")
+    for page in args.pages:
+        samples = measure(page, args.repeat)
+        med = {key: statistics.median(s[key] for s in samples) for key in ("import", "first", "warm", "modules")}
+        heavy = ", ".join(samples[0]["heavy"]) or "-"
+        print(f"  {page:8s} import {med['import'] * 1000:6.0f} ms | first {med['first'] * 1000:6.0f} ms | "
+              f"warm {med['warm'] * 1000:6.0f} ms | {med['modules']:4.0f} Module nachgeladen (schwer: {heavy})")
+
+    if args.server:
+        timings = asyncio.run(server_first_renders())
+        print("Server (erster Lauf jeder Seite in einer Session)")
+        print(f"  Start bis health {timings.pop('health') * 1000:6.0f} ms")
+        for page, seconds in timings.items():
+            print(f"  {page:8s} first {seconds * 1000:6.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
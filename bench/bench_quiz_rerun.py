@@ -0,0 +1,79 @@
+"""
+Benchmark: Rerun-Kosten pro beantworteter Frage (voller Rerun vs. Fragment)
+
+Startet die App als echten Streamlit-Server (mit einer Kopie von ./data),
+meldet sich über ?user=... an, startet ein Quiz und beantwortet jede Frage
+über das Websocket-Protokoll. Gemessen werden pro Antwort die Zeit bis
+script_finished und die Bytes, die der Server schickt.
+
+    full:     Klick ohne fragment_id - so wie vor der Umstellung, das ganze
+              Skript (Session-Prüfung, Theme-CSS, Stats) läuft erneut
+    fragment: Klick mit fragment_id - nur show_question_fragment läuft
+
+Aufruf (aus dem Repo-Root, benötigt streamlit):
+    python bench/bench_quiz_rerun.py --user admin
+    python bench/bench_quiz_rerun.py --user admin --modes fragment --rounds 5
+
+Der letzte Klick eines Durchlaufs wechselt in beiden Modi per vollem Rerun zur
+Ergebnisseite und wird deshalb nicht mitgezählt.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from streamlit_client import AppServer, SessionClient, find_button  # noqa: E402
+
+
+async def play(server: AppServer, user: str, mode: str) -> list:
+    client = SessionClient(server, query_string=f"user={user}")
+    await client.connect()
+    try:
+        start = await client.rerun(page="quizzes")
+        start_btn = find_button(start, label="Quiz starten")
+        if start_btn is None:
+            raise RuntimeError(f"Startseite nicht erreicht - ist '{user}' ein aktiver Benutzer?")
+        run = await client.rerun(trigger=start_btn)
+
+        samples = []
+        while True:
+            answer_btn = find_button(run, key="answer_0")
+            if answer_btn is None:
+                break
+            fragment_id = run.fragment_ids.get(answer_btn, "") if mode == "fragment" else ""
+            run = await client.rerun(trigger=answer_btn, fragment_id=fragment_id)
+            samples.append((run.seconds, run.bytes))
+        return samples[:-1]
+    finally:
+        await client.close()
+
+
+def report(mode: str, samples: list) -> None:
+    times = [s * 1000 for s, _ in samples]
+    sizes = [b for _, b in samples]
+    print(f"  {mode:8s} {len(samples):3d} Antworten | "
+          f"Zeit p50 {statistics.median(times):7.1f} ms, max {max(times):7.1f} ms | "
+          f"Bytes p50 {int(statistics.median(sizes)):7d}, Ø {sum(sizes) / len(sizes):9.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", default="admin", help="aktiver Benutzer aus data/users.json")
+    parser.add_argument("--modes", nargs="+", choices=("full", "fragment"), default=["full", "fragment"])
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    with AppServer() as server:
+        for mode in args.modes:
+            samples = []
+            for _ in range(args.rounds):
+                samples.extend(asyncio.run(play(server, args.user, mode)))
+            report(mode, samples)
+
+
+if __name__ == "__main__":
+    main()
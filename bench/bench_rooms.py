@@ -0,0 +1,165 @@
+"""
+Lasttest: Live-Räume mit 30-100 Teilnehmern (core.rooms)
+
+Läuft komplett im Prozess, ohne Streamlit-Server. Pro Raumgröße wird ein Raum
+eröffnet, alle Teilnehmer treten bei und abonnieren ihn, dann wird das ganze
+Quiz gespielt (jeder beantwortet jede Frage). Gemessen werden:
+
+    publish    Zustandswechsel inkl. Fan-out an alle Abos (Snapshot + Events)
+    wake       Zeit vom Wechsel, bis alle wartenden Abonnenten-Threads ihn sehen
+    answer     eine Antwort verbuchen
+    poll       Abfrage pro Session und Sekunde (das, was das Fragment jede Sekunde tut)
+    file-poll  zum Vergleich: denselben Zustand pro Session aus einer JSON-Datei lesen
+    memory     Speicher des Raums nach dem Spiel (tracemalloc), gesamt und pro Teilnehmer
+
+Aufruf (aus dem Repo-Root):
+    python bench/bench_rooms.py
+    python bench/bench_rooms.py --sizes 30 100 --quiz hinduismus
+"""
+
+import argparse
+import dataclasses
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+from core.catalog import get_catalog  # noqa: E402
+from core.rooms import RoomHub  # noqa: E402
+
+
+def micros(samples: list) -> str:
+    return f"p50 {statistics.median(samples) * 1e6:7.1f} µs, max {max(samples) * 1e6:8.1f} µs"
+
+
+def measure_wake(room, subscriptions: list) -> float:
+    """Startet einen Thread pro Abo, schaltet weiter und misst, bis alle geweckt sind"""
+    woken = threading.Barrier(len(subscriptions) + 1)
+    ready = threading.Barrier(len(subscriptions) + 1)
+
+    def waiter(subscription):
+        ready.wait()
+        subscription.wait(timeout=10)
+        woken.wait()
+
+    threads = [threading.Thread(target=waiter, args=(s,), daemon=True) for s in subscriptions]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+    time.sleep(0.01)
+    started = time.perf_counter()
+    room.advance()
+    woken.wait()
+    elapsed = time.perf_counter() - started
+    for thread in threads:
+        thread.join()
+    return elapsed
+
+
+def play(quiz, participants: int, rng: random.Random, wait_threads: bool = True):
+    """Spielt einen ganzen Raum durch, gibt (Raum, Abos, Messwerte) zurück"""
+    hub = RoomHub()
+    room = hub.create(quiz, "host", question_seconds=3600)
+    names = [f"spieler{i:03d}" for i in range(participants)]
+    subscriptions = []
+    for name in names:
+        room.join(name)
+        subscriptions.append(room.subscribe(name))
+
+    publish, answer, poll, wakes = [], [], [], []
+    started = time.perf_counter()
+    room.start()
+    publish.append(time.perf_counter() - started)
+
+    while True:
+        snapshot = room.snapshot
+        for subscription in subscriptions:
+            t = time.perf_counter()
+            subscription.poll()
+            poll.append(time.perf_counter() - t)
+        for name in names:
+            choice = rng.randrange(len(snapshot.options))
+            t = time.perf_counter()
+            room.answer(name, snapshot.position, snapshot.options[choice][0])
+            answer.append(time.perf_counter() - t)
+        # Alle haben geantwortet: der nächste Zugriff löst auf (tick -> publish)
+        t = time.perf_counter()
+        room.tick()
+        publish.append(time.perf_counter() - t)
+        if snapshot.position + 1 >= snapshot.total:
+            room.advance()
+            break
+        # Weiterschalten einmal mit wartenden Threads, sonst direkt
+        if snapshot.position == 0 and wait_threads:
+            wakes.append(measure_wake(room, subscriptions))
+        else:
+            t = time.perf_counter()
+            room.advance()
+            publish.append(time.perf_counter() - t)
+
+    return room, subscriptions, {"publish": publish, "wake": wakes, "answer": answer, "poll": poll}
+
+
+def run(quiz, participants: int, rng: random.Random) -> dict:
+    room, _, timings = play(quiz, participants, rng)
+
+    # Speicher in einem eigenen Durchlauf: tracemalloc verfälscht die Zeiten
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    measured = play(quiz, participants, rng, wait_threads=False)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    memory = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del measured
+
+    # Vergleich: jede Session liest den Zustand jede Sekunde aus einer Datei
+    state = dataclasses.asdict(room.snapshot)
+    state["participants"] = {p.name: p.points for p in room.participants.values()}
+    file_poll = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "room.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        for _ in range(participants):
+            t = time.perf_counter()
+            with open(path, "r", encoding="utf-8") as f:
+                json.load(f)
+            file_poll.append(time.perf_counter() - t)
+
+    return dict(timings, questions=room.snapshot.total, file_poll=file_poll, memory=memory)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[30, 50, 100])
+    parser.add_argument("--quiz", default="hinduismus")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    quiz = get_catalog().get(args.quiz)
+    if quiz is None:
+        sys.exit(f"Quiz '{args.quiz}' nicht gefunden")
+
+    rng = random.Random(args.seed)
+    for size in args.sizes:
+        result = run(quiz, size, rng)
+        print(f"{size} Teilnehmer, {result['questions']} Fragen")
+        print(f"  publish    {micros(result['publish'])}  (Snapshot + Fan-out an {size} Abos)")
+        print(f"  wake       {micros(result['wake'])}  (bis alle {size} wartenden Threads es sehen)")
+        print(f"  answer     {micros(result['answer'])}")
+        print(f"  poll       {micros(result['poll'])}  -> {sum(result['poll']) / result['questions'] * 1e3:.2f} ms "
+              f"pro Sekunde für den ganzen Raum")
+        print(f"  file-poll  {micros(result['file_poll'])}  (Vergleich: Zustand aus JSON-Datei)")
+        print(f"  memory     {result['memory'] / 1024:7.1f} KiB gesamt, "
+              f"{result['memory'] / size / 1024:5.2f} KiB pro Teilnehmer")
+
+
+if __name__ == "__main__":
+    main()
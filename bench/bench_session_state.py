@@ -0,0 +1,136 @@
+"""
+Speicherbedarf des Quiz-Zustands pro Session (st.session_state)
+
+Simuliert N Sessions, die ein Quiz vollständig beantwortet haben, und misst
+mit tracemalloc, wie viel Speicher ihr Zustand belegt. Das kompilierte Quiz
+wird von allen Sessions geteilt und zählt nicht mit. Verglichen werden:
+
+    text      ursprüngliches quiz_data: Antworten mit Frage-, Auswahl- und
+              Lösungstext, dazu die kopierte gemischte Optionsliste der
+              aktuellen Frage. Die Texte sind nur Referenzen auf die Strings
+              des Quiz (günstigster Fall, Kopien wären teurer).
+    compact   quiz_data seit der Kompilierung: Dict mit einer Liste kleiner
+              Antwort-Dicts {q, s, c, t}
+    run       core.quiz_run.QuizRun: __slots__ und Arrays
+
+Aufruf (aus dem Repo-Root):
+    python bench/bench_session_state.py
+    python bench/bench_session_state.py --sessions 1000 --quiz hinduismus
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+from core import timing  # noqa: E402
+from core.catalog import get_catalog  # noqa: E402
+from core.compiled import new_seed  # noqa: E402
+from core.quiz_run import QuizRun  # noqa: E402
+
+
+def text_state(quiz, qids, choices, times):
+    order = quiz.option_order(0, qids[-1])
+    return {
+        'run_id': uuid.uuid4().hex,
+        'quiz_id': quiz.quiz_id,
+        'current_question': len(qids),
+        'score': sum(quiz.grade(q, c) for q, c in zip(qids, choices)),
+        'answers': [{
+            "question": quiz.questions[q],
+            "selected": quiz.options[q][c],
+            "correct": quiz.options[q][quiz.answers[q]],
+            "is_correct": quiz.grade(q, c),
+            "time": round(t, 2),
+        } for q, c, t in zip(qids, choices, times)],
+        'start_time': time.time(),
+        'end_time': time.time(),
+        'question_start_time': None,
+        'shuffled_options': [quiz.options[qids[-1]][i] for i in order],
+        'saved': True,
+    }
+
+
+def compact_state(quiz, qids, choices, times):
+    return {
+        'run_id': uuid.uuid4().hex,
+        'quiz_id': quiz.quiz_id,
+        'quiz': quiz,
+        'version': quiz.version,
+        'mode': 'server',
+        'current_question': len(qids),
+        'score': sum(quiz.grade(q, c) for q, c in zip(qids, choices)),
+        'answers': [quiz.answer_record(q, c, t) for q, c, t in zip(qids, choices, times)],
+        'start_time': time.time(),
+        'started': timing.now(),
+        'end_time': timing.now(),
+        'render_started': timing.now(),
+        'question_shown': None,
+        'seed': new_seed(),
+        'theta': 0.0,
+        'current_qid': None,
+        'review_qids': [],
+        'saved': True,
+    }
+
+
+def run_state(quiz, qids, choices, times):
+    run = QuizRun(quiz.quiz_id, quiz, start_time=time.time())
+    for q, c, t in zip(qids, choices, times):
+        run.record(q, c, t)
+    run.end_time = timing.now()
+    run.saved = True
+    return run
+
+
+VARIANTS = {"text": text_state, "compact": compact_state, "run": run_state}
+
+
+def measure(build, quiz, plays) -> int:
+    """Bytes, die N Session-Zustände zusammen belegen"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    sessions = [build(quiz, *play) for play in plays]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del sessions
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--quiz", default="hinduismus")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    quiz = get_catalog().get(args.quiz)
+    if quiz is None:
+        sys.exit(f"Quiz '{args.quiz}' nicht gefunden")
+
+    # Alle Varianten bekommen dieselben Durchläufe (Fragen, Auswahl, Zeiten)
+    rng = random.Random(args.seed)
+    plays = []
+    for _ in range(args.sessions):
+        qids = quiz.draw(rng.getrandbits(32))
+        choices = [rng.randrange(len(quiz.options[q])) for q in qids]
+        times = [rng.uniform(1, 30) for _ in qids]
+        plays.append((qids, choices, times))
+
+    results = {name: measure(build, quiz, plays) for name, build in VARIANTS.items()}
+    baseline = results["text"]
+    print(f"{args.sessions} Sessions, je {len(plays[0][0])} beantwortete Fragen ('{args.quiz}')")
+    for name, size in results.items():
+        delta = (size / baseline - 1) * 100
+        print(f"  {name:8s} {size / 1024:9.1f} KiB gesamt, {size / args.sessions:7.0f} B pro Session"
+              f"  ({delta:+6.1f}% ggü. text)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Minimaler Streamlit-Websocket-Client für Benchmarks
+
+Startet die App als echten Server und spricht das Browser-Protokoll
+(BackMsg/ForwardMsg über /_stcore/stream). So lassen sich Rerun-Zeiten und die
+tatsächlich gesendeten Bytes messen, inklusive Fragment-Reruns.
+
+Benötigt neben streamlit (bringt protobuf mit) das Paket websockets.
+"""
+
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+import websockets
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN_SCRIPT = os.path.join(REPO_ROOT, "app", "main.py")
+AUDITED_SERVER = os.path.join(REPO_ROOT, "bench", "audited_server.py")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class AppServer:
+    """
+    Startet `streamlit run app/main.py` in einem temporären Arbeitsverzeichnis
+    mit einer Kopie von ./data, damit Benchmarks keine echten Ergebnisse schreiben.
+
+    prepare(data_dir) läuft nach dem Kopieren und vor dem Start (z.B. um
+    Testbenutzer anzulegen). Mit audit=True läuft der Server über
+    audited_server.py und counters() liefert Datei-Zugriffe und CPU-Zeit.
+    """
+
+    def __init__(self, port: Optional[int] = None, data_dir: str = os.path.join(REPO_ROOT, "data"),
+                 prepare: Optional[Callable[[str], None]] = None, audit: bool = False):
+        self.port = port or free_port()
+        self.data_dir = data_dir
+        self.prepare = prepare
+        self.audit = audit
+        self.workdir: Optional[str] = None
+        self.process: Optional[subprocess.Popen] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "AppServer":
+        self.workdir = tempfile.mkdtemp(prefix="bench_app_")
+        shutil.copytree(self.data_dir, os.path.join(self.workdir, "data"),
+                        ignore=shutil.ignore_patterns("answers", "journal", "archive", "*.pdf"))
+        os.makedirs(os.path.join(self.workdir, "data", "answers"), exist_ok=True)
+        if self.prepare is not None:
+            self.prepare(os.path.join(self.workdir, "data"))
+        launcher = [AUDITED_SERVER] if self.audit else ["-m", "streamlit"]
+        self.process = subprocess.Popen(
+            [sys.executable, *launcher, "run", MAIN_SCRIPT,
+             "--server.headless", "true", "--server.port", str(self.port),
+             "--browser.gatherUsageStats", "false", "--server.fileWatcherType", "none"],
+            cwd=self.workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            env=dict(os.environ, AUDIT_FILE=os.path.join(self.workdir, "audit.json")),
+        )
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            try:
+                with urllib.request.urlopen(f"{self.url}/_stcore/health", timeout=1):
+                    return self
+            except OSError:
+                time.sleep(0.2)
+        self.__exit__(None, None, None)
+        raise RuntimeError("Streamlit-Server ist nicht gestartet")
+
+    def counters(self, timeout: float = 5.0) -> Dict[str, float]:
+        """Datei-Zugriffe und CPU-Zeit des Servers seit dem Start (nur mit audit=True)"""
+        path = os.path.join(self.workdir, "audit.json")
+        previous = -1
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                previous = json.load(f)["seq"]
+        self.process.send_signal(signal.SIGUSR1)
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data["seq"] > previous:
+                    return data
+            except (OSError, ValueError):
+                pass
+            time.sleep(0.01)
+        raise RuntimeError("Server hat keine Zähler geschrieben")
+
+    def __exit__(self, *exc) -> None:
+        if self.process is not None:
+            self.process.terminate()
+            self.process.wait(timeout=10)
+        if self.workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+@dataclass
+class RunStats:
+    seconds: float
+    bytes: int
+    messages: int
+    buttons: Dict[str, str] = field(default_factory=dict)   # Widget-ID -> Label
+    inputs: Dict[str, str] = field(default_factory=dict)    # Widget-ID -> Label (Textfelder)
+    fragment_ids: Dict[str, str] = field(default_factory=dict)  # Widget-ID -> Fragment-ID
+    markdown: List[str] = field(default_factory=list)
+
+
+class SessionClient:
+    """Eine Browser-Session: schickt Reruns und sammelt die Antworten bis script_finished"""
+
+    def __init__(self, server: AppServer, query_string: str = ""):
+        self.server = server
+        self.query_string = query_string
+        self.pages: Dict[str, str] = {}
+        self.page = ""
+        self._ws = None
+
+    async def connect(self) -> None:
+        self._ws = await websockets.connect(f"ws://127.0.0.1:{self.server.port}/_stcore/stream", max_size=None)
+
+    async def close(self) -> None:
+        if self._ws is not None:
+            await self._ws.close()
+
+    def _follow(self, page_script_hash: str) -> None:
+        """Seitenwechsel durch den Server (st.switch_page) übernehmen"""
+        for name, script_hash in self.pages.items():
+            if script_hash == page_script_hash:
+                self.page = name
+
+    async def rerun(self, page: Optional[str] = None, trigger: Optional[str] = None,
+                    fragment_id: str = "", values: Optional[Dict[str, str]] = None) -> RunStats:
+        """
+        Löst einen Rerun aus und wartet auf script_finished.
+
+        Args:
+            page: Seitenname (z.B. "quizzes"); None = aktuelle Seite
+            trigger: Widget-ID eines Buttons, der als geklickt gemeldet wird
+            fragment_id: nur dieses Fragment neu ausführen
+            values: Widget-ID -> Text für Textfelder (z.B. Login)
+        """
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.query_string = self.query_string
+        if page is not None:
+            self.page = page
+        state.page_name = self.page
+        state.page_script_hash = self.pages.get(self.page, "")
+        for widget_id, value in (values or {}).items():
+            widget = state.widget_states.widgets.add()
+            widget.id = widget_id
+            widget.string_value = value
+        if trigger:
+            widget = state.widget_states.widgets.add()
+            widget.id = trigger
+            widget.trigger_value = True
+        if fragment_id:
+            state.fragment_id = fragment_id
+
+        started = time.perf_counter()
+        await self._ws.send(msg.SerializeToString())
+        stats = RunStats(seconds=0.0, bytes=0, messages=0)
+        while True:
+            raw = await self._ws.recv()
+            stats.bytes += len(raw)
+            stats.messages += 1
+            fwd = ForwardMsg()
+            fwd.ParseFromString(raw)
+            kind = fwd.WhichOneof("type")
+            if kind == "new_session":
+                if fwd.new_session.app_pages:
+                    self.pages = {p.page_name: p.page_script_hash for p in fwd.new_session.app_pages}
+                self._follow(fwd.new_session.page_script_hash)
+            elif kind == "navigation":
+                # neuere Streamlit-Versionen schicken die Seitenliste separat
+                self.pages = {p.page_name: p.page_script_hash for p in fwd.navigation.app_pages}
+                self._follow(fwd.navigation.page_script_hash)
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                which = element.WhichOneof("type")
+                if which == "button":
+                    stats.buttons[element.button.id] = element.button.label
+                    stats.fragment_ids[element.button.id] = fwd.delta.fragment_id
+                elif which == "text_input":
+                    stats.inputs[element.text_input.id] = element.text_input.label
+                elif which == "markdown":
+                    stats.markdown.append(element.markdown.body)
+            elif kind == "script_finished":
+                # 2 = FINISHED_EARLY_FOR_RERUN (st.rerun) - der Folgelauf kommt noch
+                if fwd.script_finished != 2:
+                    break
+                stats.buttons.clear()
+                stats.inputs.clear()
+                stats.fragment_ids.clear()
+                stats.markdown.clear()
+        stats.seconds = time.perf_counter() - started
+        return stats
+
+
+def find_input(stats: RunStats, label: str) -> Optional[str]:
+    """Widget-ID eines Textfelds über sein Label"""
+    for widget_id, text in stats.inputs.items():
+        if text == label:
+            return widget_id
+    return None
+
+
+def find_button(stats: RunStats, label: str = "", key: str = "") -> Optional[str]:
+    """Widget-ID eines Buttons über Label oder (Teil des) user keys"""
+    for widget_id, text in stats.buttons.items():
+        if (label and text == label) or (key and key in widget_id):
+            return widget_id
+    return None